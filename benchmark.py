@@ -0,0 +1,898 @@
+"""Benchmarks for the skill gap analyzer
+
+Usage:
+    python benchmark.py extraction [--descriptions 200] [--words 450]
+    python benchmark.py taxonomy [--skills 10000]
+    python benchmark.py analysis [--jobs 300000]
+    python benchmark.py parsing [--pages 400] [--workers 1,2,4,8]
+    python benchmark.py html [--fixtures DIR] [--pages 200]
+    python benchmark.py e2e [--fixtures DIR] [--latency 0.02] [--error-rate 0.0]
+    python benchmark.py startup [--runs 10] [--budget-ms 100]
+    python benchmark.py history [--weeks 520] [--skills 2000]
+    python benchmark.py sketch [--jobs 200000] [--skills 5000] [--locations 2000] [--shards 4]
+    python benchmark.py serve [--url URL] [--jobs 20000] [--requests 5000] [--concurrency 16]
+    python benchmark.py planner [--jobs 100000] [--threshold 0.5] [--verify-jobs 5000]
+    python benchmark.py corpus [--jobs 1000000]
+    python benchmark.py ingest [--mb 200] [--workers 1,2,4] [--no-signatures]
+    python benchmark.py extraction-cache [--descriptions 20000] [--changed 2]
+"""
+import os
+import json
+import asyncio
+import argparse
+import csv
+import itertools
+import math
+import random
+import tempfile
+import threading
+import subprocess
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+from aiohttp import web
+from bs4 import BeautifulSoup
+
+import skill_gap_analyzer as sga
+
+# Dependencies that only the scraping, analysis and reporting stages may load
+HEAVY_MODULES = ('aiohttp', 'bs4', 'lxml', 'numpy', 'scipy', 'pandas', 'matplotlib', 'fake_useragent')
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import skill_gap_analyzer
+elapsed = time.perf_counter() - started
+print(json.dumps({'import_s': elapsed, 'loaded': [name for name in %r if name in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+FILLER_WORDS = [
+    'we', 'are', 'looking', 'for', 'a', 'motivated', 'team', 'member', 'who', 'will',
+    'work', 'with', 'stakeholders', 'across', 'the', 'business', 'to', 'deliver',
+    'insights', 'and', 'build', 'reliable', 'pipelines', 'experience', 'in', 'our',
+    'customers', 'product', 'strong', 'knowledge', 'of', 'you', 'have', 'years',
+    'benefits', 'include', 'flexible', 'hours', 'remote', 'office', 'berlin', 'munich'
+]
+
+def legacy_extract_skills(text, skills):
+    """The original substring scan, kept as the baseline"""
+    found_skills = []
+    text_lower = text.lower()
+
+    for skill in skills:
+        if skill in text_lower:
+            found_skills.append(skill.title())
+
+    return list(set(found_skills))
+
+def synthetic_description(rng, skills, words):
+    """Build a description of roughly the given word count with a few skills mixed in"""
+    tokens = [rng.choice(FILLER_WORDS) for _ in range(words)]
+    for skill in rng.sample(skills, min(12, len(skills))):
+        tokens.insert(rng.randrange(len(tokens)), skill)
+    return ' '.join(tokens).capitalize() + '.'
+
+def synthetic_dictionary(size):
+    """Extend the real skill phrases with generated multi-word terms up to size"""
+    skills = list(sga.get_taxonomy()['aliases'])
+    extra = [f"skill{i} {FILLER_WORDS[i % len(FILLER_WORDS)]}" for i in range(max(0, size - len(skills)))]
+    return skills + extra
+
+def time_per_call(fn, items, repeat=3):
+    """Best-of-repeat mean time per call in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, (time.perf_counter() - started) / len(items))
+    return best
+
+def bench_extraction(args):
+    rng = random.Random(42)
+    print(f"{'terms':>7} {'chars':>7} {'compile ms':>11} {'legacy us':>10} {'matcher us':>11} {'speedup':>8}")
+
+    for size in (len(sga.get_taxonomy()['aliases']), 1000, 10000):
+        skills = synthetic_dictionary(size)
+        descriptions = [synthetic_description(rng, skills, args.words) for _ in range(args.descriptions)]
+
+        started = time.perf_counter()
+        matcher = sga.SkillMatcher({skill: skill.title() for skill in skills})
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        legacy = time_per_call(lambda text: legacy_extract_skills(text, skills), descriptions)
+        compiled = time_per_call(matcher.find, descriptions)
+        chars = sum(len(text) for text in descriptions) // len(descriptions)
+        print(f"{len(skills):>7} {chars:>7} {compile_ms:>11.1f} {legacy * 1e6:>10.1f} "
+              f"{compiled * 1e6:>11.1f} {legacy / compiled:>7.1f}x")
+
+def bench_taxonomy(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'taxonomy.json')
+        target = os.path.join(tmp, 'taxonomy.idx')
+        skills = [{'id': f"skill-{i}", 'name': f"Skill {i}", 'category': 'tech', 'aliases': [f"skill{i} alias"]}
+                  for i in range(args.skills)]
+        with open(source, 'w') as f:
+            json.dump({'version': 'bench', 'skills': skills}, f)
+
+        started = time.perf_counter()
+        sga.compile_taxonomy(source, target)
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        sga.load_taxonomy(source, target)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        print(f"{args.skills} skills: compile {compile_ms:.1f} ms, load prebuilt index {load_ms:.1f} ms "
+              f"({os.path.getsize(target) / 1024:.0f} KB)")
+
+def synthetic_job_page(rng, skills, words=450):
+    """Build a job page shaped like LinkedIn's, with navigation and scripts around the description"""
+    chrome = ''.join(f'<div class="nav-item"><a href="/jobs/{i}">Similar job {i}</a><span>{rng.choice(FILLER_WORDS)}</span></div>'
+                     for i in range(150))
+    paragraphs = ''.join(f'<p>{synthetic_description(rng, skills, words // 6)}</p>' for _ in range(6))
+    return (f'<!DOCTYPE html><html><head><title>Job</title><script>{"var x = 1;" * 500}</script></head><body>'
+            f'<header>{chrome}</header><section class="description"><div class="description__text">'
+            f'{paragraphs}</div></section><footer>{chrome}</footer></body></html>')
+
+def synthetic_listing_page(rng, start, jobs=sga.JOBS_PER_PAGE):
+    """Build a guest search results page with the card markup the scraper reads"""
+    cards = []
+    for i in range(start, start + jobs):
+        cards.append(
+            f'<li><div class="base-card relative base-search-card job-search-card" data-entity-urn="urn:li:jobPosting:{i}">'
+            f'<a class="base-card__full-link absolute" href="https://de.linkedin.com/jobs/view/analyst-{4000000000 + i}?refId=abc">'
+            f'<span class="sr-only">Analyst {i}</span></a><div class="base-search-card__info">'
+            f'<h3 class="base-search-card__title">\n Data Analyst {i}\n </h3>'
+            f'<h4 class="base-search-card__subtitle"><a href="/company/{i % 97}">Company {i % 97}</a></h4>'
+            f'<div class="base-search-card__metadata"><span class="job-search-card__location">{rng.choice(["Berlin", "Munich"])}, Germany</span>'
+            f'<time class="job-search-card__listdate" datetime="2026-10-{1 + i % 28:02d}">1 week ago</time></div></div></div></li>'
+        )
+    return ''.join(cards)
+
+def legacy_parse_job_cards(html):
+    """The original full-tree listing parse, kept as the baseline"""
+    soup = BeautifulSoup(html, 'html.parser')
+    cards = []
+    for job in soup.find_all('li'):
+        try:
+            meta = job.find('div', class_='base-search-card__metadata')
+            job_url = job.find('a', class_='base-card__full-link')['href']
+            cards.append({
+                'title': job.find('h3', class_='base-search-card__title').text.strip(),
+                'company': job.find('h4', class_='base-search-card__subtitle').text.strip(),
+                'location': job.find('span', class_='job-search-card__location').text.strip(),
+                'date': meta.find('time')['datetime'] if meta.find('time') else "N/A",
+                'url': job_url,
+                'job_id': sga.job_id_from_url(job_url)
+            })
+        except Exception:
+            continue
+    return cards
+
+def legacy_parse_job_description(html):
+    """The original full-tree description parse, kept as the baseline"""
+    soup = BeautifulSoup(html, 'html.parser')
+    description = soup.find('div', class_='description__text')
+    return description.get_text(separator=' ', strip=True) if description else ""
+
+def load_html_fixtures(directory):
+    """Split saved .html pages into listing and description pages"""
+    listings, descriptions = [], []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.html'):
+            with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+                html = f.read()
+            (listings if 'base-search-card' in html else descriptions).append(html)
+    return listings, descriptions
+
+def legacy_analyze_skill_gap(user_skills, job_market_data):
+    """The original Counter-based analysis, kept as the baseline"""
+    all_required_skills = []
+    for job in job_market_data:
+        all_required_skills.extend(job['skills'])
+
+    skill_frequency = Counter(all_required_skills)
+    total_jobs = len(job_market_data)
+    skill_demand = {skill: (count/total_jobs)*100 for skill, count in skill_frequency.items()}
+
+    user_skills_lower = [skill.lower() for skill in user_skills]
+    missing_skills = {skill: demand for skill, demand in skill_demand.items() if skill.lower() not in user_skills_lower}
+    missing_skills = dict(sorted(missing_skills.items(), key=lambda item: item[1], reverse=True))
+    gap_score = sum(missing_skills.values()) / len(missing_skills) if missing_skills else 0
+
+    return {'skill_demand': skill_demand, 'missing_skills': missing_skills, 'gap_score': gap_score}
+
+def iter_synthetic_corpus(jobs, seed=7):
+    """Generate posting records with a skewed skill distribution like real listings"""
+    rng = random.Random(seed)
+    skills = [skill['name'] for skill in sga.get_taxonomy()['skills']]
+    weights = [1 / (rank + 1) for rank in range(len(skills))]
+    roles = ['Data analyst', 'Web analyst', 'Machine Learning Engineer', 'Channel marketing']
+    locations = ['Berlin', 'Munich', 'Hamburg', 'Remote']
+
+    for i in range(jobs):
+        yield {
+            'title': f"Job {i}",
+            'company': f"Company {i % 5000}",
+            'location': rng.choice(locations),
+            'date': '2026-01-01',
+            'skills': list(set(rng.choices(skills, weights, k=rng.randint(2, 12)))),
+            'url': f"https://www.linkedin.com/jobs/view/{i}",
+            'job_id': str(i),
+            'role': rng.choice(roles)
+        }
+
+def synthetic_corpus(jobs, seed=7):
+    return list(iter_synthetic_corpus(jobs, seed))
+
+def bench_analysis(args):
+    job_data = synthetic_corpus(args.jobs)
+    user_skills = ['Python', 'SQL', 'Tableau']
+
+    started = time.perf_counter()
+    legacy_analyze_skill_gap(user_skills, job_data)
+    legacy_s = time.perf_counter() - started
+
+    sga.SkillMatrix.from_jobs([])  # Import SciPy outside the timings
+    started = time.perf_counter()
+    market = sga.SkillMatrix.from_jobs(job_data)
+    build_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    sga.analyze_skill_gap(user_skills, market)
+    analyze_s = time.perf_counter() - started
+
+    print(f"{args.jobs} postings: legacy analysis {legacy_s * 1000:.0f} ms, "
+          f"matrix build {build_s * 1000:.0f} ms + vectorized analysis incl. role/location breakdowns "
+          f"{analyze_s * 1000:.1f} ms = {(build_s + analyze_s) * 1000:.0f} ms end to end")
+
+def bench_parsing(args):
+    rng = random.Random(3)
+    skills = list(sga.get_taxonomy()['aliases'])
+    pages = [synthetic_job_page(rng, skills) for _ in range(args.pages)]
+
+    started = time.perf_counter()
+    serial = [sga.extract_job_record(page) for page in pages]
+    serial_s = time.perf_counter() - started
+    print(f"{args.pages} pages of ~{sum(map(len, pages)) // len(pages) // 1024} KB")
+    print(f"serial: {args.pages / serial_s:.0f} pages/s")
+
+    for workers in (int(n) for n in args.workers.split(',')):
+        with ProcessPoolExecutor(workers) as pool:
+            list(pool.map(sga.extract_job_record, pages[:workers]))  # warm up the workers
+            started = time.perf_counter()
+            parallel = list(pool.map(sga.extract_job_record, pages, chunksize=4))
+            parallel_s = time.perf_counter() - started
+        assert parallel == serial, "process pool output differs from the serial path"
+        print(f"{workers} workers: {args.pages / parallel_s:.0f} pages/s ({serial_s / parallel_s:.1f}x)")
+
+def bench_html(args):
+    if args.fixtures:
+        listings, descriptions = load_html_fixtures(args.fixtures)
+    else:
+        rng = random.Random(5)
+        skills = list(sga.get_taxonomy()['aliases'])
+        listings = [synthetic_listing_page(rng, page * sga.JOBS_PER_PAGE) for page in range(max(1, args.pages // 10))]
+        descriptions = [synthetic_job_page(rng, skills) for _ in range(args.pages)]
+    print(f"{len(listings)} listing pages, {len(descriptions)} description pages")
+
+    for kind, pages, legacy, parse in (
+        ('listing', listings, legacy_parse_job_cards, sga.parse_job_cards),
+        ('description', descriptions, legacy_parse_job_description, sga.parse_job_description)
+    ):
+        if not pages:
+            continue
+        expected = [legacy(page) for page in pages]
+        baseline = time_per_call(legacy, pages, repeat=1)
+        print(f"  {kind:<12} full tree html.parser {baseline * 1000:>7.2f} ms/page")
+        for backend in ('html.parser', 'lxml'):
+            assert [parse(page, backend) for page in pages] == expected, f"{backend} output differs on {kind} pages"
+            elapsed = time_per_call(lambda page: parse(page, backend), pages, repeat=1)
+            print(f"  {kind:<12} targeted {backend:<11} {elapsed * 1000:>7.2f} ms/page ({baseline / elapsed:.1f}x)")
+
+def write_synthetic_fixtures(fixture_dir, job_roles, location, max_pages):
+    """Write a replayable fixture corpus with the same layout as a recorded run"""
+    rng = random.Random(11)
+    skills = list(sga.get_taxonomy()['aliases'])
+    for r, job_role in enumerate(job_roles):
+        for page in range(max_pages):
+            listing = synthetic_listing_page(rng, (r * max_pages + page) * sga.JOBS_PER_PAGE)
+            sga.record_response(fixture_dir, sga.build_search_url(job_role, location, page), listing)
+            for card in sga.parse_job_cards(listing):
+                sga.record_response(fixture_dir, card['url'], synthetic_job_page(rng, skills))
+    return fixture_dir
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+def bench_e2e(args):
+    config = sga.load_config() if args.fixtures else sga.DEFAULT_CONFIG
+    job_roles, location, max_pages = config['job_roles'], config['location'], config['max_pages']
+    stages = {}
+
+    def timed(stage, func, *func_args, **func_kwargs):
+        started = time.perf_counter()
+        result = func(*func_args, **func_kwargs)
+        stages[stage] = time.perf_counter() - started
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = args.fixtures or write_synthetic_fixtures(os.path.join(tmp, 'fixtures'), job_roles, location, max_pages)
+        server = sga.make_replay_server(fixtures, latency=args.latency, error_rate=args.error_rate)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        # Measure the pipeline, not politeness: the limiter starts fast against the local server
+        settings = {**sga.DEFAULT_CONFIG['scraper'], 'base_url': f"http://127.0.0.1:{server.server_port}"}
+        limiter = sga.AdaptiveRateLimiter({'initial_rate': args.rate, 'max_rate': args.rate, 'burst': args.rate})
+        try:
+            job_data = timed('scrape', sga.scrape_linkedin_jobs, job_roles, location, max_pages, settings, limiter)
+        finally:
+            server.shutdown()
+
+        _, descriptions = load_html_fixtures(fixtures)
+        texts = [sga.parse_job_description(html) for html in descriptions]
+        timed('extract_skills_from_text', lambda: [sga.extract_skills_from_text(text) for text in texts])
+        gap_analysis = timed('analyze_skill_gap', sga.analyze_skill_gap, config['user_skills'], job_data)
+        recommendations = timed('generate_learning_recommendations', sga.generate_learning_recommendations,
+                                gap_analysis['top_missing_skills'], config['platforms'])
+        timed('generate_report', sga.generate_report, config, gap_analysis, recommendations, os.path.join(tmp, 'report'))
+
+    result = {
+        'commit': current_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'params': {'fixtures': args.fixtures or 'synthetic', 'latency': args.latency, 'error_rate': args.error_rate,
+                   'rate': args.rate},
+        'postings': len(job_data),
+        'postings_per_s': len(job_data) / stages['scrape'] if stages['scrape'] else 0,
+        'stages': stages
+    }
+
+    # Compare against the last run with the same parameters to flag regressions
+    previous = None
+    if os.path.exists(args.history):
+        with open(args.history, 'r') as f:
+            runs = [json.loads(line) for line in f if line.strip()]
+        previous = next((run for run in reversed(runs) if run['params'] == result['params']), None)
+
+    print(f"{result['postings']} postings, {result['postings_per_s']:.1f} postings/s (commit {result['commit']})")
+    for stage, elapsed in stages.items():
+        line = f"  {stage:<36} {elapsed * 1000:>9.1f} ms"
+        if previous and stage in previous['stages']:
+            before = previous['stages'][stage]
+            change = (elapsed - before) / before * 100 if before else 0
+            flag = "  REGRESSION" if change > args.threshold and elapsed - before > 0.005 else ""
+            line += f"  {change:+6.1f}% vs {previous['commit']}{flag}"
+        print(line)
+
+    os.makedirs(os.path.dirname(args.history) or '.', exist_ok=True)
+    with open(args.history, 'a') as f:
+        f.write(json.dumps(result) + "\n")
+
+def bench_history(args):
+    rng = random.Random(5)
+    skills = [f"skill {i}" for i in range(args.skills)]
+    week = 7 * 86400
+    started_at = time.time() - args.weeks * week
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'skill_history.npz')
+        history = sga.SkillHistory(path)
+        started = time.perf_counter()
+        for w in range(args.weeks):
+            demand = {skill: rng.uniform(0, 60) for skill in rng.sample(skills, args.skills // 2)}
+            history.append({'skill_demand': demand, 'missing_skills': demand, 'gap_score': rng.uniform(10, 50),
+                            'total_jobs_analyzed': 250}, started_at + w * week)
+        build_s = time.perf_counter() - started
+        history.save()
+        size_mb = os.path.getsize(path) / 1024 / 1024
+
+        timings = {}
+        for name, query in (
+            ('load', lambda: sga.SkillHistory(path)),
+            ('week_over_week', history.week_over_week),
+            ('rising + falling', lambda: (history.rising(), history.falling())),
+            ('moving_average', history.moving_average),
+            ('trend_series', history.trend_series)
+        ):
+            timings[name] = time_per_call(lambda _: query(), range(5))
+
+    print(f"{args.weeks} weekly snapshots × {args.skills} skills: {size_mb:.2f} MB on disk, "
+          f"appended in {build_s:.2f} s")
+    for name, elapsed in timings.items():
+        print(f"  {name:<20} {elapsed * 1000:>8.2f} ms")
+
+def iter_skewed_postings(jobs, skills, locations, repeat_rate, seed=11):
+    """Stream postings with Zipf-distributed skills and locations, reposting some earlier job IDs"""
+    rng = random.Random(seed)
+    skill_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(skills))))
+    location_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(locations))))
+    roles = ['Data analyst', 'Web analyst', 'Machine Learning Engineer', 'Channel marketing']
+    for i in range(jobs):
+        job_id = rng.randrange(i) if i and rng.random() < repeat_rate else i
+        yield {
+            'job_id': str(job_id),
+            'company': f"Company {job_id % (jobs // 20 or 1)}",
+            'role': roles[job_id % len(roles)],
+            'location': rng.choices(locations, cum_weights=location_weights)[0],
+            'skills': list(set(rng.choices(skills, cum_weights=skill_weights, k=rng.randint(2, 12))))
+        }
+
+def build_market(market, jobs):
+    """Feed postings into an aggregator, returning its build time and traced peak memory"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    for job in jobs:
+        market.add(job)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+def bench_sketch(args):
+    skills = [f"skill {i}" for i in range(args.skills)]
+    locations = [f"City {i}" for i in range(args.locations)]
+    postings = lambda: iter_skewed_postings(args.jobs, skills, locations, args.repeat_rate)
+    settings = {'epsilon': args.epsilon, 'heavy_hitters': args.heavy_hitters}
+
+    exact = sga.SkillAggregator()
+    exact_s, exact_peak = build_market(exact, postings())
+    sketch = sga.SketchAggregator(settings)
+    sketch_s, sketch_peak = build_market(sketch, postings())
+    # What a run with sketch.enabled does: exact counting until min_counters keys, then sketches
+    config = {'sketch': {**settings, 'enabled': True, 'min_counters': args.min_counters}}
+    tracemalloc.start()
+    started = time.perf_counter()
+    switched = sga.market_aggregator(config)
+    for job in postings():
+        switched.add(job)
+        switched = sga.sketch_if_large(switched, config)
+    switched_s = time.perf_counter() - started
+    switched_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # The same stream split round-robin across shards, sketched separately and merged
+    shards = [sga.SketchAggregator(settings) for _ in range(args.shards)]
+    for i, job in enumerate(postings()):
+        shards[i % args.shards].add(job)
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(shard)
+
+    true_demand = dict(zip(exact.skills, exact.demand()))
+    top_exact = sorted(true_demand, key=true_demand.get, reverse=True)[:args.top]
+    distinct_postings = len({job['job_id'] for job in postings()})
+    distinct_companies = len({job['company'] for job in postings()})
+    user_skills = ['skill 0', 'skill 3', 'skill 10']
+    exact_missing = list(sga.analyze_skill_gap(user_skills, exact)['top_missing_skills'])
+
+    print(f"{args.jobs} postings, {args.skills} skills, {args.locations} locations, "
+          f"{args.repeat_rate:.0%} repeated job IDs")
+    print(f"  exact counters   {exact_s:6.2f} s, peak {exact_peak / 1024 / 1024:7.1f} MB "
+          f"({exact.counters()} counters)")
+    print(f"  sketches         {sketch_s:6.2f} s, peak {sketch_peak / 1024 / 1024:7.1f} MB "
+          f"({sketch.nbytes / 1024:.0f} KB of sketch tables)")
+    print(f"  exact, then sketches past {args.min_counters} counters "
+          f"{switched_s:6.2f} s, peak {switched_peak / 1024 / 1024:7.1f} MB")
+    for name, market in (('single sketch', sketch), (f"{args.shards} merged shards", merged),
+                         ('exact, then sketches', switched)):
+        demand = dict(zip(market.skills, market.demand()))
+        errors = [abs(demand.get(skill, 0) - true_demand[skill]) for skill in top_exact]
+        recall = len(set(top_exact) & set(market.skills[:args.top])) / len(top_exact)
+        missing = list(sga.analyze_skill_gap(user_skills, market)['top_missing_skills'])
+        print(f"  {name}:")
+        print(f"    top {args.top} skills recalled    {recall:.0%}")
+        print(f"    demand error (top {args.top})     max {max(errors):.3f} pts, mean {statistics.mean(errors):.3f} pts, "
+              f"bound {market.demand_error_bound():.3f} pts")
+        print(f"    distinct postings        {market.distinct_postings()} vs {distinct_postings} "
+              f"({market.distinct_postings() / distinct_postings - 1:+.2%})")
+        print(f"    distinct companies       {market.companies.count()} vs {distinct_companies} "
+              f"({market.companies.count() / distinct_companies - 1:+.2%})")
+        print(f"    top missing skills       {sum(a == b for a, b in zip(missing, exact_missing))} of "
+              f"{len(exact_missing)} in the exact order")
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def start_query_server(config):
+    """Run the query server on its own event loop thread, returning its base URL"""
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(sga.make_query_app(config))
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+async def load_test(url, profiles, requests, concurrency):
+    """POST profiles round-robin from concurrent clients, returning client latencies, server times and wall time"""
+    latencies, server_ms = [], []
+    sent = iter(range(requests))
+
+    async def client(session):
+        for i in sent:
+            started = time.perf_counter()
+            async with session.post(f"{url}/analyze", json={'user_skills': profiles[i % len(profiles)]}) as response:
+                await response.read()
+                response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+            server_ms.append(float(response.headers['X-Analysis-Ms']))
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*[client(session) for _ in range(concurrency)])
+        return latencies, server_ms, time.perf_counter() - started
+
+def bench_serve(args):
+    rng = random.Random(3)
+    skills = [skill['name'] for skill in sga.get_taxonomy()['skills']]
+    profiles = [rng.sample(skills, rng.randint(1, 8)) for _ in range(200)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url and args.url.rstrip('/')
+        if not url:
+            job_data = synthetic_corpus(args.jobs)
+            store = sga.JobStore({'path': os.path.join(tmp, 'jobs.sqlite3')})
+            for job in job_data:
+                store.add({**job, 'signature': b''}, '')
+            store.close()
+            config = {**sga.DEFAULT_CONFIG, 'job_roles': sorted({job['role'] for job in job_data}),
+                      'store': {'path': os.path.join(tmp, 'jobs.sqlite3')},
+                      'serve': {'marker': os.path.join(tmp, 'last_scrape.json')}}
+            started = time.perf_counter()
+            url = start_query_server(config)
+            print(f"Indexed {args.jobs} postings in {time.perf_counter() - started:.2f} s")
+
+            # The server must answer exactly what the batch analysis computes
+            expected = sga.analyze_skill_gap(profiles[0], job_data)
+            answer = asyncio.run(fetch_analysis(url, profiles[0]))['gap_analysis']
+            assert list(answer['missing_skills']) == list(expected['missing_skills']), "missing skill order differs"
+            assert abs(answer['gap_score'] - expected['gap_score']) < 1e-9, "gap score differs"
+            assert answer['role_breakdown'] == expected['role_breakdown'], "role breakdown differs"
+            print("Server answers match analyze_skill_gap")
+
+        asyncio.run(load_test(url, profiles, min(200, args.requests), args.concurrency))
+        latencies, server_ms, wall = asyncio.run(load_test(url, profiles, args.requests, args.concurrency))
+
+    print(f"{args.requests} requests from {args.concurrency} concurrent clients: {args.requests / wall:.0f} requests/s")
+    print(f"  client latency   p50 {percentile(latencies, 0.5) * 1000:7.2f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms   max {max(latencies) * 1000:7.2f} ms")
+    print(f"  server handling  p50 {percentile(server_ms, 0.5):7.3f} ms   p99 {percentile(server_ms, 0.99):7.3f} ms")
+
+async def fetch_analysis(url, user_skills):
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{url}/analyze", json={'user_skills': user_skills}) as response:
+            response.raise_for_status()
+            return await response.json()
+
+def naive_learning_plan(job_data, user_skills, steps, threshold, lookahead):
+    """The greedy plan computed posting by posting, to check the bitset planner against"""
+    owned = {sga.canonical_skill(skill).lower() for skill in user_skills}
+    jobs = [{sga.canonical_skill(skill) for skill in job['skills']} for job in job_data]
+    jobs = [skills for skills in jobs if skills]
+    demand = Counter(skill for skills in jobs for skill in skills)
+    deficits = [math.ceil(threshold * len(skills) - 1e-9) - sum(skill.lower() in owned for skill in skills)
+                for skills in jobs]
+    candidates = [skill for skill in demand if skill.lower() not in owned]
+    plan = []
+    for _ in range(min(steps, len(candidates))):
+        gains = {skill: [0] * lookahead for skill in candidates}
+        for skills, deficit in zip(jobs, deficits):
+            if 1 <= deficit <= lookahead:
+                for skill in skills:
+                    if skill in gains:
+                        gains[skill][deficit - 1] += 1
+        best = min(candidates, key=lambda skill: ([-gain for gain in gains[skill]], -demand[skill], skill))
+        candidates.remove(best)
+        deficits = [deficit - (best in skills) for skills, deficit in zip(jobs, deficits)]
+        plan.append((best, gains[best][0]))
+    return plan
+
+def bench_planner(args):
+    job_data = synthetic_corpus(args.jobs)
+    rng = random.Random(9)
+    skills = [skill['name'] for skill in sga.get_taxonomy()['skills']]
+    profiles = [rng.sample(skills, rng.randint(1, 6)) for _ in range(20)]
+
+    started = time.perf_counter()
+    index = sga.DemandIndex(job_data)
+    build_s = time.perf_counter() - started
+    plan_s = time_per_call(lambda profile: index.learning_plan(profile, args.steps, args.threshold), profiles)
+
+    plan = index.learning_plan(profiles[0], args.steps, args.threshold)
+    by_demand = list(index.analyze(profiles[0])['top_missing_skills'])[:args.steps]
+    print(f"{args.jobs} postings: index built in {build_s:.2f} s, "
+          f"{args.steps}-step plan in {plan_s * 1000:.1f} ms per profile")
+    print(f"  profile {', '.join(profiles[0])}: {plan['qualified_before']} postings matched at "
+          f"{args.threshold:.0%} of their skills")
+    for step, skill in zip(plan['steps'], by_demand):
+        print(f"    {step['skill']:<24} +{step['new_jobs']:<6} {step['coverage']:5.1f}% matched   "
+              f"(by demand: {skill})")
+
+    # Same plan as the posting-by-posting greedy on a subset
+    subset = job_data[:args.verify_jobs]
+    subset_index = sga.DemandIndex(subset)
+    for profile in profiles[:5]:
+        expected = naive_learning_plan(subset, profile, args.steps, args.threshold, 3)
+        actual = [(step['skill'], step['new_jobs']) for step in subset_index.learning_plan(profile, args.steps, args.threshold)['steps']]
+        assert actual == expected, f"plans differ for {profile}: {actual} != {expected}"
+    print(f"Bitset plans match the posting-by-posting greedy on {len(subset)} postings")
+
+def traced(build):
+    """Run build under tracemalloc, returning its result, seconds taken and bytes still allocated"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, size
+
+def bench_corpus(args):
+    # Parse the skill taxonomy before tracing so it is not counted against either representation
+    sga.get_taxonomy()
+    rows = []
+    job_data, dict_s, dict_bytes = traced(lambda: synthetic_corpus(args.jobs))
+    rows.append(('list of dicts', dict_s, dict_bytes))
+    del job_data
+    batch, batch_s, batch_bytes = traced(lambda: sga.PostingBatch.from_jobs(iter_synthetic_corpus(args.jobs)))
+    rows.append(('PostingBatch', batch_s, batch_bytes))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'corpus.bin')
+        started = time.perf_counter()
+        batch.save(path)
+        save_s = time.perf_counter() - started
+        loaded, load_s, load_bytes = traced(lambda: sga.PostingBatch.load(path))
+        rows.append(('memory-mapped file', load_s, load_bytes))
+
+        print(f"{args.jobs} synthetic postings")
+        for name, elapsed, size in rows:
+            print(f"  {name:<20} {size / args.jobs:8.1f} bytes/posting   {size / 1024 / 1024:8.1f} MB   "
+                  f"built in {elapsed:6.2f} s")
+        print(f"  {dict_bytes / batch_bytes:.1f}x smaller in memory; saved {os.path.getsize(path) / 1024 / 1024:.1f} MB "
+              f"in {save_s:.2f} s")
+
+        sga.SkillMatrix.from_jobs(sga.PostingBatch())  # Import SciPy outside the timings
+        for name, corpus in (('in memory', batch), ('memory-mapped', loaded)):
+            started = time.perf_counter()
+            market = sga.SkillMatrix.from_jobs(corpus)
+            matrix_s = time.perf_counter() - started
+            started = time.perf_counter()
+            sga.analyze_skill_gap(['Python', 'SQL'], market)
+            print(f"  {name:<20} skill matrix in {matrix_s * 1000:.0f} ms, "
+                  f"gap analysis in {(time.perf_counter() - started) * 1000:.0f} ms")
+        del loaded, market
+
+def write_synthetic_dumps(directory, size_mb, seed=5):
+    """Write the same synthetic postings as a JSONL dump and a CSV dump of about size_mb each"""
+    rng = random.Random(seed)
+    skills = list(sga.get_taxonomy()['aliases'])
+    fields = ['job_id', 'title', 'company', 'location', 'date', 'url', 'role', 'description']
+    paths = os.path.join(directory, 'dump.jsonl'), os.path.join(directory, 'dump.csv')
+    with open(paths[0], 'w') as jsonl, open(paths[1], 'w', newline='') as dump:
+        writer = csv.DictWriter(dump, fieldnames=fields)
+        writer.writeheader()
+        i = 0
+        while jsonl.tell() < size_mb * 1024 * 1024:
+            # Paragraph breaks and quotes exercise CSV fields that span lines
+            description = synthetic_description(rng, skills, 450).replace(' and ', ' and\n', 2) + ' "Apply now"'
+            row = {'job_id': str(i), 'title': f"Engineer {i}", 'company': f"Company {i % 997}",
+                   'location': f"City {i % 53}", 'date': '2024-01-01', 'url': f"https://example.com/jobs/{i}",
+                   'role': rng.choice(['data scientist', 'data engineer', 'ml engineer']), 'description': description}
+            jsonl.write(json.dumps(row) + '\n')
+            writer.writerow(row)
+            i += 1
+    return paths, i
+
+def bench_ingest(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths, jobs = write_synthetic_dumps(tmp, args.mb)
+        print(f"{jobs} synthetic postings")
+        results = {}
+        for path in paths:
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            for workers in (int(n) for n in args.workers.split(',')):
+                settings = {'workers': workers, 'chunk_mb': args.chunk_mb, 'signatures': not args.no_signatures}
+                # The CLI default goes through the extraction cache: a first ingest fills it, a repeat reads it
+                cache = {**sga.DEFAULT_CONFIG['extraction_cache'],
+                         'path': os.path.join(tmp, f"extractions-{os.path.basename(path)}-{workers}.sqlite3")}
+                for name, extraction_settings in (('no cache', None), ('cold cache', cache), ('warm cache', cache)):
+                    started = time.perf_counter()
+                    postings = list(sga.iter_dump_postings(path, settings, extraction_settings=extraction_settings))
+                    elapsed = time.perf_counter() - started
+                    assert len(postings) == jobs, f"{path} yielded {len(postings)} of {jobs} postings"
+                    results.setdefault(path, postings)
+                    assert all({**a, 'skills': sorted(a['skills'])} == {**b, 'skills': sorted(b['skills'])}
+                               for a, b in zip(postings, results[path])), \
+                        f"{path} with {name} differs from extraction without the cache"
+                    print(f"  {os.path.basename(path):<10} {workers} workers, {name:<10}: {size_mb / elapsed:6.1f} MB/s "
+                          f"({size_mb / elapsed / workers:.1f} MB/s per worker), {jobs / elapsed:.0f} postings/s")
+        jsonl, dump = results.values()
+        assert all({**a, 'skills': sorted(a['skills'])} == {**b, 'skills': sorted(b['skills'])} for a, b in zip(jsonl, dump)), \
+            "JSONL and CSV dumps produced different posting records"
+        print("JSONL and CSV dumps produce identical posting records")
+
+def tweak_vocabulary(changed):
+    """Swap in a taxonomy with the first changed aliases renamed and one new phrase, returning the original"""
+    original = sga.get_taxonomy()
+    aliases = dict(original['aliases'])
+    for phrase in list(aliases)[:changed]:
+        aliases[phrase] = f"{aliases[phrase]} (renamed)"
+    aliases['quantum annealing'] = 'Quantum Annealing'
+    sga.skill_taxonomy = {**original, 'aliases': aliases, 'matcher': sga.SkillMatcher(aliases)}
+    sga.skill_taxonomy.pop('vocabulary', None)
+    return original
+
+def bench_extraction_cache(args):
+    rng = random.Random(9)
+    skills = list(sga.get_taxonomy()['aliases'])
+    descriptions = [synthetic_description(rng, skills, args.words) for _ in range(args.descriptions)]
+    sga.minhash_signature('warm up')
+
+    started = time.perf_counter()
+    expected = [sga.description_record(description)[1:] for description in descriptions]
+    rows = [('no cache', time.perf_counter() - started, None)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = {'path': os.path.join(tmp, 'extractions.sqlite3')}
+        for name in ('cold cache', 'warm cache'):
+            cache = sga.ExtractionCache(settings)
+            started = time.perf_counter()
+            extracted = cache.extract_many(descriptions)
+            cache.close()
+            rows.append((name, time.perf_counter() - started, cache.summary()))
+            assert extracted == expected, f"{name} results differ from extraction"
+
+        original = tweak_vocabulary(args.changed)
+        try:
+            cache = sga.ExtractionCache(settings)
+            started = time.perf_counter()
+            extracted = cache.extract_many(descriptions)
+            cache.close()
+            rows.append((f"{args.changed + 1} phrases changed", time.perf_counter() - started, cache.summary()))
+            assert [sorted(skills) for skills, _ in extracted] == \
+                [sorted(sga.extract_skills_from_text(description)) for description in descriptions], \
+                "cached skills are stale after the vocabulary change"
+        finally:
+            sga.skill_taxonomy = original
+        print(f"{args.descriptions} descriptions, cache file {os.path.getsize(settings['path']) / 1024 / 1024:.1f} MB")
+
+    for name, elapsed, summary in rows:
+        print(f"  {name:<20} {elapsed * 1e6 / args.descriptions:8.1f} us/description"
+              + (f"   {summary}" if summary else ""))
+
+def bench_startup(args):
+    root = os.path.dirname(os.path.abspath(__file__))
+    imports, loaded = [], set()
+    interpreter, cli = [], []
+
+    for _ in range(args.runs):
+        probe = subprocess.run([sys.executable, '-c', IMPORT_PROBE], capture_output=True, text=True, cwd=root, check=True)
+        result = json.loads(probe.stdout)
+        imports.append(result['import_s'])
+        loaded.update(result['loaded'])
+
+        for timings, command in ((interpreter, ['-c', 'pass']), (cli, ['skill_gap_analyzer.py', '--help'])):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, *command], capture_output=True, cwd=root, check=True)
+            timings.append(time.perf_counter() - started)
+
+    import_ms = statistics.median(imports) * 1000
+    print(f"Median of {args.runs} runs")
+    print(f"  import skill_gap_analyzer          {import_ms:>8.1f} ms")
+    print(f"  python -c pass                     {statistics.median(interpreter) * 1000:>8.1f} ms")
+    print(f"  skill_gap_analyzer.py --help       {statistics.median(cli) * 1000:>8.1f} ms")
+    print(f"  heavy modules loaded on import: {', '.join(sorted(loaded)) or 'none'}")
+
+    if loaded or import_ms > args.budget_ms:
+        sys.exit(f"Startup regression: import took {import_ms:.1f} ms (budget {args.budget_ms:.0f} ms), "
+                 f"heavy modules loaded: {', '.join(sorted(loaded)) or 'none'}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    extraction = subparsers.add_parser('extraction', help="Compare the skill matcher with the substring scan")
+    extraction.add_argument('--descriptions', type=int, default=200)
+    extraction.add_argument('--words', type=int, default=450)
+    extraction.set_defaults(func=bench_extraction)
+
+    taxonomy = subparsers.add_parser('taxonomy', help="Time compiling a large taxonomy against loading its index")
+    taxonomy.add_argument('--skills', type=int, default=10000)
+    taxonomy.set_defaults(func=bench_taxonomy)
+
+    analysis = subparsers.add_parser('analysis', help="Compare vectorized analyze_skill_gap with the Counter version")
+    analysis.add_argument('--jobs', type=int, default=300000)
+    analysis.set_defaults(func=bench_analysis)
+
+    parsing = subparsers.add_parser('parsing', help="Scale page parsing and skill extraction across worker processes")
+    parsing.add_argument('--pages', type=int, default=400)
+    parsing.add_argument('--workers', default='1,2,4,8')
+    parsing.set_defaults(func=bench_parsing)
+
+    html = subparsers.add_parser('html', help="Compare HTML parser backends on saved or synthetic pages")
+    html.add_argument('--fixtures', help="Directory of saved .html pages (default: synthetic pages)")
+    html.add_argument('--pages', type=int, default=200)
+    html.set_defaults(func=bench_html)
+
+    e2e = subparsers.add_parser('e2e', help="Time every stage of a run against the local replay server")
+    e2e.add_argument('--fixtures', help="Recorded fixture corpus (default: synthetic fixtures for the default config)")
+    e2e.add_argument('--latency', type=float, default=0.02, help="Mean injected server latency in seconds")
+    e2e.add_argument('--error-rate', type=float, default=0.0, help="Fraction of injected 429 responses")
+    e2e.add_argument('--rate', type=float, default=500.0, help="Requests per second allowed by the rate limiter")
+    e2e.add_argument('--history', default=f"{sga.CACHE_DIR}/benchmark_history.jsonl")
+    e2e.add_argument('--threshold', type=float, default=15.0, help="Percent slowdown reported as a regression")
+    e2e.set_defaults(func=bench_e2e)
+
+    history = subparsers.add_parser('history', help="Time loading and querying years of weekly skill history")
+    history.add_argument('--weeks', type=int, default=520)
+    history.add_argument('--skills', type=int, default=2000)
+    history.set_defaults(func=bench_history)
+
+    sketch = subparsers.add_parser('sketch', help="Compare sketch aggregation with exact counters on a skewed corpus")
+    sketch.add_argument('--jobs', type=int, default=200000)
+    sketch.add_argument('--skills', type=int, default=5000)
+    sketch.add_argument('--locations', type=int, default=2000)
+    sketch.add_argument('--shards', type=int, default=4)
+    sketch.add_argument('--repeat-rate', type=float, default=0.1)
+    sketch.add_argument('--epsilon', type=float, default=sga.DEFAULT_CONFIG['sketch']['epsilon'])
+    sketch.add_argument('--heavy-hitters', type=int, default=sga.DEFAULT_CONFIG['sketch']['heavy_hitters'])
+    sketch.add_argument('--min-counters', type=int, default=sga.DEFAULT_CONFIG['sketch']['min_counters'],
+                        help="Exact counters after which the switching aggregator moves to sketches")
+    sketch.add_argument('--top', type=int, default=50, help="Number of most demanded skills to compare")
+    sketch.set_defaults(func=bench_sketch)
+
+    serve = subparsers.add_parser('serve', help="Load-test the gap analysis query server")
+    serve.add_argument('--url', help="Base URL of a running server (default: start one on a synthetic corpus)")
+    serve.add_argument('--jobs', type=int, default=20000)
+    serve.add_argument('--requests', type=int, default=5000)
+    serve.add_argument('--concurrency', type=int, default=16)
+    serve.set_defaults(func=bench_serve)
+
+    planner = subparsers.add_parser('planner', help="Time the bitset learning planner and check it against a naive greedy")
+    planner.add_argument('--jobs', type=int, default=100000)
+    planner.add_argument('--steps', type=int, default=10)
+    planner.add_argument('--threshold', type=float, default=0.5)
+    planner.add_argument('--verify-jobs', type=int, default=5000)
+    planner.set_defaults(func=bench_planner)
+
+    corpus = subparsers.add_parser('corpus', help="Measure memory per posting of dicts against the columnar corpus")
+    corpus.add_argument('--jobs', type=int, default=1000000)
+    corpus.set_defaults(func=bench_corpus)
+
+    ingest = subparsers.add_parser('ingest', help="Measure offline ingestion throughput of JSONL and CSV job dumps")
+    ingest.add_argument('--mb', type=float, default=200, help="Size of each synthetic dump")
+    ingest.add_argument('--workers', default='1,2,4')
+    ingest.add_argument('--chunk-mb', type=float, default=sga.DEFAULT_CONFIG['ingest']['chunk_mb'])
+    ingest.add_argument('--no-signatures', action='store_true', help="Skip MinHash signatures for near-duplicate detection")
+    ingest.set_defaults(func=bench_ingest)
+
+    extraction_cache = subparsers.add_parser('extraction-cache',
+                                             help="Time cold, warm and post-vocabulary-change extraction cache lookups")
+    extraction_cache.add_argument('--descriptions', type=int, default=20000)
+    extraction_cache.add_argument('--words', type=int, default=450)
+    extraction_cache.add_argument('--changed', type=int, default=2, help="Number of existing aliases to rename")
+    extraction_cache.set_defaults(func=bench_extraction_cache)
+
+    startup = subparsers.add_parser('startup', help="Time importing the module and starting the CLI in fresh interpreters")
+    startup.add_argument('--runs', type=int, default=10)
+    startup.add_argument('--budget-ms', type=float, default=100.0, help="Fail when the median import takes longer")
+    startup.set_defaults(func=bench_startup)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,79 @@
 import os
+import re
+import sys
+import gzip
 import json
+import string
+import pickle
+import hashlib
+import heapq
 import time
 import random
-import pandas as pd
-import requests
-import matplotlib.pyplot as plt
-from datetime import datetime
-from collections import Counter
-from bs4 import BeautifulSoup
-from urllib.parse import quote
-from fake_useragent import UserAgent
+import queue
+import threading
+import zlib
+import base64
+import itertools
+from array import array
+from datetime import datetime, timezone
+from contextlib import contextmanager
+from collections import Counter, defaultdict, deque
+from urllib.parse import quote, urlsplit
+# asyncio, aiohttp, the HTML parsers, numpy/scipy and matplotlib are imported by the stages
+# that use them, so importing this module and the non-scraping modes start quickly
 
 # Configuration
 CONFIG_FILE = "skill_config.json"
 REPORTS_DIR = "reports"
-os.makedirs(REPORTS_DIR, exist_ok=True)
+CACHE_DIR = ".cache"
+TAXONOMY_FILE = "skill_taxonomy.json"
+TAXONOMY_INDEX = f"{CACHE_DIR}/skill_taxonomy.idx"
+TAXONOMY_INDEX_FORMAT = 1
+# MinHash signatures are stored with postings, so changing these invalidates stored signatures
+MINHASH_PERMUTATIONS = 128
+SHINGLE_SIZE = 3
+SKILL_CATEGORIES = ("tech", "soft")
+# Bump when chart rendering changes so cached chart images are re-rendered
+CHART_RENDER_VERSION = 1
+HISTORY_FORMAT = 1
+PARTIAL_FORMAT = 3
+CORPUS_MAGIC = b"SGACORP1"
+SKETCH_BUFFER_SIZE = 8192
+# Bloom filter of description tokens kept with cached extractions; changing these invalidates the extraction cache
+TOKEN_FILTER_BITS = 4096
+TOKEN_FILTER_HASHES = 3
+# Beyond this many changed phrases, checking cached entries one by one costs more than re-extracting them
+MAX_REVALIDATED_PHRASES = 500
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+HASH_MASK = (1 << 64) - 1
+
+LINKEDIN_BASE_URL = "https://www.linkedin.com"
+LINKEDIN_SEARCH_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={}&location={}&start={}"
+LINKEDIN_URL_PATTERN = re.compile(r'https://(?:[a-z]{2,3}\.)?linkedin\.com')
+JOBS_PER_PAGE = 25
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Upper bounds in seconds of the request latency histogram in metrics.json
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float('inf'))
+STREAM_END = object()
+REPLAY_INDEX = "index.jsonl"
+# Ways to order recommended skills: by demand, or by how many new postings each one makes a match
+PLANNER_ORDERS = ('demand', 'coverage')
+# The description div, where description__text must be one of the class attribute's classes
+DESCRIPTION_PATTERN = re.compile(
+    r'<div\b[^>]*?\sclass\s*=\s*(?:"[^"]*?|\'[^\']*?|)(?<![\w-])description__text(?![\w-])', re.I)
+# Comments and elements whose content is plain text, which may contain "<div" without it being a tag
+RAW_TEXT_DELIMITERS = (('<!--', '-->'), ('<script', '</script'), ('<style', '</style'),
+                       ('<textarea', '</textarea'), ('<title', '</title'))
+# Div tags, skipping the same raw text. Textarea and title content is plain text too, but html.parser
+# reads tags in it: group 3 is unset when one of those holds markup
+DIV_TAG_PATTERN = re.compile(
+    r'<!--.*?(?:-->|$)|<(script|style)\b.*?(?:</\1\s*>|$)|<(textarea|title)\b[^>]*>[^<]*(</\2\s*>)?|<(/?)div\b',
+    re.I | re.S)
+# Sign-in walls and challenge pages served in place of results when LinkedIn blocks a client
+BLOCK_PAGE_PATTERN = re.compile(r'authwall|checkpoint/challenge|captcha', re.I)
+
+# Pads punctuation with spaces so str.split() yields words and single punctuation tokens
+PUNCTUATION_TABLE = str.maketrans({char: f" {char} " for char in string.punctuation + "•·–—‘’“”…"})
 
 # Default configuration
 DEFAULT_CONFIG = {
@@ -28,162 +87,2876 @@ DEFAULT_CONFIG = {
         "YouTube": "https://www.youtube.com/results?search_query={}",
         "Kaggle": "https://www.kaggle.com/search?q={}",
         "freeCodeCamp": "https://www.freecodecamp.org/news/search/?query={}"
+    },
+    "scraper": {
+        "max_concurrency": 10,
+        "per_host_concurrency": 4,
+        "request_timeout": 15,
+        "parse_workers": 0,
+        "parser": "lxml",
+        "base_url": LINKEDIN_BASE_URL,
+        "record_dir": None
+    },
+    "rate_limit": {
+        "initial_rate": 2.0,
+        "min_rate": 0.2,
+        "max_rate": 10.0,
+        "burst": 5,
+        "increase_step": 0.25,
+        "decrease_factor": 0.5,
+        "slow_factor": 0.9,
+        "target_latency": 3.0,
+        "max_retries": 4,
+        "backoff_base": 1.0,
+        "backoff_cap": 30.0,
+        "empty_page_retries": 1
+    },
+    "cache": {
+        "enabled": True,
+        "directory": f"{CACHE_DIR}/responses",
+        "ttl_days": 14,
+        "max_mb": 200
+    },
+    "store": {
+        "enabled": True,
+        "path": f"{CACHE_DIR}/jobs.sqlite3",
+        "active_days": 30
+    },
+    "extraction_cache": {
+        "enabled": True,
+        "path": f"{CACHE_DIR}/extractions.sqlite3",
+        "max_mb": 256
+    },
+    "pipeline": {
+        "queue_size": 100,
+        "progress_every": 100
+    },
+    "journal": {
+        "enabled": True,
+        "resume": True,
+        "path": f"{CACHE_DIR}/scrape_journal.jsonl",
+        "fsync_every": 25,
+        "fsync_seconds": 2.0,
+        "max_age_hours": 24
+    },
+    "dedup": {
+        "near_duplicates": True,
+        "threshold": 0.8,
+        "bands": 16,
+        # About 2 KB per indexed posting: 200k postings is ~400 MB, 2500 ~5 MB next to the sketches
+        "max_index_size": 200000,
+        "sketch_max_index_size": 2500
+    },
+    "history": {
+        "enabled": True,
+        "record": True,
+        "path": f"{REPORTS_DIR}/skill_history.npz",
+        "moving_average_weeks": 4,
+        "trend_weeks": 26,
+        "top_n": 6
+    },
+    "sketch": {
+        "enabled": False,
+        "epsilon": 0.0005,
+        "delta": 0.01,
+        "distinct_error": 0.01,
+        "heavy_hitters": 500,
+        "group_capacity": 50,
+        "group_heavy_hitters": 100,
+        "min_counters": 250000
+    },
+    "ingest": {
+        "workers": 0,
+        "chunk_mb": 8,
+        "signatures": True,
+        # Most extraction cache space one dump may fill, so a bulk ingest cannot churn the whole cache
+        "cache_write_mb": 64,
+        "role": None,
+        "fields": {
+            "job_id": ["job_id", "id", "jobId", "posting_id"],
+            "title": ["title", "job_title", "position"],
+            "company": ["company", "company_name", "employer"],
+            "location": ["location", "job_location", "city"],
+            "date": ["date", "posted_at", "date_posted", "listed_at"],
+            "url": ["url", "job_url", "link"],
+            "role": ["role", "search_term", "query"],
+            "description": ["description", "job_description", "text", "body"]
+        }
+    },
+    "planner": {
+        "order": "demand",
+        "match_threshold": 0.5,
+        "steps": 10,
+        "lookahead": 3
+    },
+    "serve": {
+        "host": "127.0.0.1",
+        "port": 8080,
+        "reload_seconds": 5,
+        "marker": f"{CACHE_DIR}/last_scrape.json",
+        "max_views": 256
+    },
+    "shard": {
+        "pages_per_unit": 0,
+        "partial_dir": f"{CACHE_DIR}/partials"
+    },
+    "report": {
+        "chart_format": "png",
+        "dpi": 100,
+        "chart_cache_dir": f"{CACHE_DIR}/charts",
+        "chart_cache_days": 60
     }
 }
 
-# Initialize user agent
-ua = UserAgent()
+# Current desktop browser user agents, rotated per request
+USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36 Edg/123.0.0.0",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.4; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+)
+
+# Loaded lazily by get_taxonomy
+skill_taxonomy = None
+
+# HTML parser backends by name, created by get_html_parser
+html_parsers = {}
+
+# MinHash permutation coefficients, created by minhash_signature
+minhash_params = None
+
+def load_config():
+    """Load or create configuration file"""
+    if os.path.exists(CONFIG_FILE):
+        with open(CONFIG_FILE, 'r') as f:
+            return json.load(f)
+    else:
+        with open(CONFIG_FILE, 'w') as f:
+            json.dump(DEFAULT_CONFIG, f, indent=2)
+        return DEFAULT_CONFIG
+
+def get_settings(config, section):
+    """Merge a configuration section over its defaults"""
+    return {**DEFAULT_CONFIG[section], **config.get(section, {})}
+
+def build_search_url(job_role, location, page, base_url=LINKEDIN_BASE_URL):
+    """Build the LinkedIn guest search URL for one listing page"""
+    search_query = f"{job_role} {location}"
+    return base_url + LINKEDIN_SEARCH_PATH.format(quote(search_query), quote(location), page * JOBS_PER_PAGE)
+
+def has_description_class(value):
+    """Match multi-valued class attributes while straining, before bs4 has split them"""
+    classes = value.split() if isinstance(value, str) else (value or [])
+    return 'description__text' in classes
+
+class SoupParser:
+    """BeautifulSoup html.parser backend that only builds the elements we read"""
+
+    def __init__(self):
+        from bs4 import BeautifulSoup, SoupStrainer
+        self.BeautifulSoup = BeautifulSoup
+        self.SoupStrainer = SoupStrainer
+
+    def parse_job_cards(self, html):
+        soup = self.BeautifulSoup(html, 'html.parser', parse_only=self.SoupStrainer('li'))
+        cards = []
+
+        for job in soup.find_all('li'):
+            try:
+                meta = job.find('div', class_='base-search-card__metadata')
+                job_url = job.find('a', class_='base-card__full-link')['href']
+                cards.append({
+                    'title': job.find('h3', class_='base-search-card__title').text.strip(),
+                    'company': job.find('h4', class_='base-search-card__subtitle').text.strip(),
+                    'location': job.find('span', class_='job-search-card__location').text.strip(),
+                    'date': meta.find('time')['datetime'] if meta.find('time') else "N/A",
+                    'url': job_url,
+                    'job_id': job_id_from_url(job_url)
+                })
+            except Exception as e:
+                print(f"  Error processing job: {str(e)}")
+
+        return cards
+
+    def parse_job_description(self, html):
+        soup = self.BeautifulSoup(html, 'html.parser',
+                                  parse_only=self.SoupStrainer('div', class_=has_description_class))
+        description = soup.find('div', class_='description__text')
+        return description.get_text(separator=' ', strip=True) if description else ""
+
+class LxmlParser:
+    """libxml2 backend that parses only the description element or the listing cards"""
+
+    def __init__(self):
+        from lxml import etree, html as lxml_html
+        self.etree = etree
+        self.lxml_html = lxml_html
+        self.find = {
+            name: etree.XPath(f".//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]")
+            for name, tag, css_class in (
+                ('title', 'h3', 'base-search-card__title'),
+                ('company', 'h4', 'base-search-card__subtitle'),
+                ('location', 'span', 'job-search-card__location'),
+                ('meta', 'div', 'base-search-card__metadata'),
+                ('link', 'a', 'base-card__full-link')
+            )
+        }
+
+    def first(self, name, element):
+        matches = self.find[name](element)
+        if not matches:
+            raise ValueError(f"missing {name} element")
+        return matches[0]
+
+    def parse_job_cards(self, html):
+        if not html.strip():
+            return []
+        cards = []
+
+        for job in self.lxml_html.fromstring(html).iter('li'):
+            try:
+                meta = self.first('meta', job)
+                time_element = meta.find('.//time')
+                job_url = self.first('link', job).get('href')
+                cards.append({
+                    'title': self.first('title', job).text_content().strip(),
+                    'company': self.first('company', job).text_content().strip(),
+                    'location': self.first('location', job).text_content().strip(),
+                    'date': time_element.get('datetime') if time_element is not None else "N/A",
+                    'url': job_url,
+                    'job_id': job_id_from_url(job_url)
+                })
+            except Exception as e:
+                print(f"  Error processing job: {str(e)}")
+
+        return cards
+
+    def parse_job_description(self, html):
+        # Slice out just the description div and parse that fragment instead of the whole page
+        start = description_start(html)
+        if start is None:
+            return ""
+        end = None
+        depth = 0
+        for tag in DIV_TAG_PATTERN.finditer(html, start):
+            if tag.group(2) and not tag.group(3):
+                break
+            if tag.group(4) is None:
+                continue
+            depth += -1 if tag.group(4) else 1
+            if depth == 0:
+                end = tag.end()
+                break
+        if end is None:
+            # Unbalanced markup, or markup inside a textarea or title: only a full parse reads it as html.parser does
+            return get_html_parser('html.parser').parse_job_description(html)
+
+        description = self.lxml_html.fragment_fromstring(html[start:end], create_parent='div')[0]
+
+        # Same text as bs4's get_text(separator=' ', strip=True): no script, style or comment content
+        texts = []
+        for event, element in self.etree.iterwalk(description, events=('start', 'end', 'comment', 'pi')):
+            if event == 'start':
+                if element.tag not in ('script', 'style') and isinstance(element.tag, str) and element.text:
+                    texts.append(element.text)
+            elif element is not description and element.tail:
+                texts.append(element.tail)
+        return ' '.join(text.strip() for text in texts if text.strip())
+
+def description_start(html):
+    """Offset of the description div's start tag, skipping decoys in comments, raw text and other attributes"""
+    lower = None
+    position = html.find('description__text')
+    while position >= 0:
+        tag = html.rfind('<', 0, position)
+        if tag >= 0 and DESCRIPTION_PATTERN.match(html, tag):
+            lower = lower or html.lower()
+            if not inside_raw_text(lower, tag):
+                return tag
+        position = html.find('description__text', position + 1)
+    return None
+
+def inside_raw_text(lower, position):
+    """Whether position falls inside a comment or a script, style, textarea or title element"""
+    for opener, closer in RAW_TEXT_DELIMITERS:
+        opened = lower.rfind(opener, 0, position)
+        if opened >= 0 and lower.find(closer, opened, position) < 0:
+            return True
+    return False
+
+def get_html_parser(backend=None):
+    """Return the parser backend by name, falling back to html.parser when lxml is unavailable"""
+    backend = backend or DEFAULT_CONFIG['scraper']['parser']
+    if backend not in html_parsers:
+        if backend == 'lxml':
+            try:
+                html_parsers[backend] = LxmlParser()
+            except ImportError:
+                print("lxml is not installed, falling back to html.parser")
+                html_parsers[backend] = get_html_parser('html.parser')
+        elif backend == 'html.parser':
+            html_parsers[backend] = SoupParser()
+        else:
+            raise ValueError(f"Unknown HTML parser backend: {backend}")
+    return html_parsers[backend]
+
+def parse_job_cards(html, backend=None):
+    """Parse job cards from a LinkedIn listing page"""
+    return get_html_parser(backend).parse_job_cards(html)
+
+def parse_job_description(html, backend=None):
+    """Extract the description text from a LinkedIn job page"""
+    return get_html_parser(backend).parse_job_description(html)
+
+def extract_job_record(html, backend=None):
+    """Parse a job page into a compact (description hash, skills, MinHash signature) record"""
+    return description_record(parse_job_description(html, backend))
+
+def description_record(description):
+    """(description hash, skills, MinHash signature) record of a job description"""
+    return (description_hash(description), extract_skills_from_text(description), minhash_signature(description))
+
+def description_hash(description):
+    return hashlib.sha256(description.encode()).hexdigest()
+
+def minhash_signature(text, tokens=None):
+    """MinHash signature of the text's word shingles as packed uint32 values, or b'' for empty text"""
+    import numpy as np
+    global minhash_params
+    if minhash_params is None:
+        # Fixed seed: signatures from other processes and earlier runs must be comparable
+        rng = np.random.RandomState(17)
+        minhash_params = (np.frombuffer(rng.bytes(8 * MINHASH_PERMUTATIONS), dtype=np.uint64) | np.uint64(1),
+                          np.frombuffer(rng.bytes(8 * MINHASH_PERMUTATIONS), dtype=np.uint64))
+
+    tokens = tokenize(text) if tokens is None else tokens
+    if not tokens:
+        return b''
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = {' '.join(tokens)}
+    else:
+        # zip over shifted token lists builds the shingles without a Python-level loop per position
+        shingles = set(map(' '.join, zip(*(tokens[i:] for i in range(SHINGLE_SIZE)))))
+    hashes = np.fromiter(map(zlib.crc32, map(str.encode, shingles)), dtype=np.uint64, count=len(shingles))
+    a, b = minhash_params
+    # Multiply-shift hashing: the high 32 bits of a * x + b (mod 2^64) for a random odd a.
+    # The shift is monotonic, so take the minimum first and shift only one value per permutation
+    products = np.multiply.outer(hashes, a)
+    products += b
+    return (products.min(axis=0) >> np.uint64(32)).astype(np.uint32).tobytes()
+
+class TokenBucket:
+    """Token bucket for one host whose refill rate can be adjusted on the fly"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self):
+        """Take a token and return how many seconds the caller must wait for it"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+class AdaptiveRateLimiter:
+    """Per-host token buckets that speed up while the server is healthy and back off on throttling"""
+
+    def __init__(self, settings=None):
+        self.settings = {**DEFAULT_CONFIG['rate_limit'], **(settings or {})}
+        self.buckets = {}
+
+    def bucket(self, host):
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.settings['initial_rate'], self.settings['burst'])
+        return self.buckets[host]
+
+    async def acquire(self, host):
+        """Wait until a request to host is allowed and return the time spent waiting"""
+        import asyncio
+        wait = self.bucket(host).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return max(wait, 0.0)
+
+    def record(self, host, status, latency, retry_after=None):
+        """Adjust the host's rate from an observed response (status None means a network failure)"""
+        bucket = self.bucket(host)
+        settings = self.settings
+
+        if status is None or status in RETRYABLE_STATUSES:
+            # Multiplicative decrease on throttling and transient failures
+            bucket.rate = max(settings['min_rate'], bucket.rate * settings['decrease_factor'])
+            delay = parse_retry_after(retry_after)
+            if delay:
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+        elif latency > settings['target_latency']:
+            # Slow responses are an early sign of overload
+            bucket.rate = max(settings['min_rate'], bucket.rate * settings['slow_factor'])
+        else:
+            # Additive increase while the server is happy
+            bucket.rate = min(settings['max_rate'], bucket.rate + settings['increase_step'])
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff delay for a retry attempt"""
+        ceiling = min(self.settings['backoff_cap'], self.settings['backoff_base'] * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def job_id_from_url(url):
+    """Return the LinkedIn job ID in a job URL, or a normalized URL when there is none"""
+    parts = urlsplit(url)
+    match = re.search(r'(\d+)/?$', parts.path)
+    if match:
+        return match.group(1)
+    return f"{parts.netloc.lower()}{parts.path.rstrip('/')}"
+
+class ResponseCache:
+    """Size-bounded LRU cache of job description pages stored gzip-compressed on disk"""
+
+    def __init__(self, settings=None):
+        settings = {**DEFAULT_CONFIG['cache'], **(settings or {})}
+        self.directory = settings['directory']
+        self.ttl = settings['ttl_days'] * 86400
+        self.max_bytes = settings['max_mb'] * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+        # key -> [size on disk, last use]; recency is persisted through file mtimes
+        self.entries = {}
+        os.makedirs(self.directory, exist_ok=True)
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    stat = entry.stat()
+                    self.entries[entry.name.split('.')[0]] = [stat.st_size, stat.st_mtime]
+        self.total_bytes = sum(size for size, _ in self.entries.values())
+
+    def key(self, url):
+        return hashlib.sha256(f"linkedin-job:{job_id_from_url(url)}".encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def get(self, url):
+        """Return the cached page body for url, or None on a miss"""
+        key = self.key(url)
+        if key in self.entries:
+            try:
+                with gzip.open(self.path(key), 'rt', encoding='utf-8') as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                record = None
+
+            if record and time.time() - record['fetched_at'] <= self.ttl:
+                now = time.time()
+                os.utime(self.path(key), (now, now))
+                self.entries[key][1] = now
+                self.hits += 1
+                self.bytes_saved += len(record['body'])
+                return record['body']
+
+            self.remove(key)
+
+        self.misses += 1
+        return None
+
+    def put(self, url, body):
+        """Store a page body and evict least recently used entries beyond the size limit"""
+        key = self.key(url)
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Shard processes may share the cache directory
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'url': url, 'fetched_at': time.time(), 'body': body}, f)
+        os.replace(tmp_path, path)
+
+        if key in self.entries:
+            self.total_bytes -= self.entries[key][0]
+        size = os.path.getsize(path)
+        self.entries[key] = [size, time.time()]
+        self.total_bytes += size
+
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def remove(self, key):
+        size, _ = self.entries.pop(key)
+        self.total_bytes -= size
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        """Drop least recently used entries until the cache is back under 90% of its limit"""
+        for key in sorted(self.entries, key=lambda k: self.entries[k][1]):
+            if self.total_bytes <= self.max_bytes * 0.9:
+                break
+            self.remove(key)
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        hit_rate = (self.hits / lookups) * 100 if lookups else 0
+        return (f"Response cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate, "
+                f"{self.bytes_saved / 1024 / 1024:.1f} MB not re-downloaded)")
+
+class ExtractionCache:
+    """Size-bounded LRU cache in SQLite of the skills and MinHash signature extracted from each description
+
+    Entries are keyed by description hash and vocabulary version. Each keeps its compressed description
+    and a Bloom filter of its tokens: after a vocabulary change an entry is carried over when none of the
+    changed phrases can occur in it, and re-extracted from the stored text otherwise.
+    """
+
+    def __init__(self, settings=None):
+        import sqlite3
+        settings = {**DEFAULT_CONFIG['extraction_cache'], **(settings or {})}
+        os.makedirs(os.path.dirname(settings['path']) or '.', exist_ok=True)
+        self.max_bytes = settings['max_mb'] * 1024 * 1024
+        # Ingest workers and shard processes write concurrently; WAL lets readers carry on meanwhile
+        self.conn = sqlite3.connect(settings['path'], check_same_thread=False, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                description_hash TEXT,
+                vocabulary TEXT,
+                skills TEXT,
+                signature BLOB,
+                tokens BLOB,
+                description BLOB,
+                size INTEGER,
+                last_used REAL,
+                PRIMARY KEY (description_hash, vocabulary)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS extractions_last_used ON extractions (last_used)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS vocabularies (version TEXT PRIMARY KEY, aliases BLOB)")
+
+        self.version = vocabulary_version()
+        self.conn.execute("INSERT OR IGNORE INTO vocabularies VALUES (?, ?)",
+                          (self.version, zlib.compress(json.dumps(get_taxonomy()['aliases']).encode())))
+        self.conn.commit()
+        self.changes = {}
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+        self.hits = 0
+        self.revalidated = 0
+        self.reextracted = 0
+        self.misses = 0
+        self.not_stored = 0
+
+    def changed_phrases(self, version):
+        """Phrases that match differently under the current vocabulary than under version, or None if unknown"""
+        if version not in self.changes:
+            row = self.conn.execute("SELECT aliases FROM vocabularies WHERE version = ?", (version,)).fetchone()
+            changed = None
+            if row:
+                old, new = json.loads(zlib.decompress(row[0])), get_taxonomy()['aliases']
+                changed = [phrase for phrase in old.keys() | new.keys() if old.get(phrase) != new.get(phrase)]
+            self.changes[version] = changed if changed is None or len(changed) <= MAX_REVALIDATED_PHRASES else None
+        return self.changes[version]
+
+    def get_many(self, hashes, signatures=True):
+        """Map each known description hash to its (skills, signature) under the current vocabulary"""
+        hashes = list(dict.fromkeys(hashes))
+        rows = {}
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start:start + 500]
+            for row in self.conn.execute(
+                    f"SELECT description_hash, vocabulary, skills, signature, tokens, description, size "
+                    f"FROM extractions WHERE description_hash IN ({','.join('?' * len(batch))})", batch):
+                # An entry for the current vocabulary wins over stale ones
+                if row[1] == self.version or row[0] not in rows:
+                    rows[row[0]] = row
+
+        now = time.time()
+        found = {}
+        updates = []
+        for key, vocabulary, skills, signature, tokens, description, size in rows.values():
+            changed = vocabulary != self.version
+            if not changed:
+                self.hits += 1
+                skills = json.loads(skills)
+            else:
+                phrases = self.changed_phrases(vocabulary)
+                if phrases is not None and not any(may_contain(tokens, phrase) for phrase in phrases):
+                    self.revalidated += 1
+                    skills = json.loads(skills)
+                else:
+                    self.reextracted += 1
+                    skills = extract_skills_from_text(zlib.decompress(description).decode())
+            if signatures and not signature:
+                # Ingested without signatures before
+                signature = minhash_signature(zlib.decompress(description).decode())
+                changed = True
+            if changed:
+                updates.append((self.version, json.dumps(skills), signature, now, key, vocabulary))
+            found[key] = (skills, signature)
+
+        self.misses += len(hashes) - len(found)
+        self.conn.executemany(
+            "UPDATE extractions SET vocabulary = ?, skills = ?, signature = ?, last_used = ? "
+            "WHERE description_hash = ? AND vocabulary = ?", updates)
+        self.conn.executemany("UPDATE extractions SET last_used = ? WHERE description_hash = ? AND vocabulary = ?",
+                              [(now, key, self.version) for key in found])
+        return found
+
+    def get(self, key, signatures=True):
+        return self.get_many([key], signatures).get(key)
+
+    def put(self, key, description, skills, signature, tokens=None):
+        """Store what was extracted from a description under the current vocabulary"""
+        tokens = token_filter(tokenize(description) if tokens is None else tokens)
+        compressed = zlib.compress(description.encode(), 1)
+        skills = json.dumps(skills)
+        size = len(key) + len(skills) + len(signature) + len(tokens) + len(compressed)
+        self.conn.execute("DELETE FROM extractions WHERE description_hash = ?", (key,))
+        self.conn.execute("INSERT INTO extractions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                          (key, self.version, skills, signature, tokens, compressed, size, time.time()))
+        self.total_bytes += size
+        return size
+
+    def extract_many(self, descriptions, signatures=True, write_bytes=None):
+        """(skills, signature) for each description, extracting only those not cached
+
+        Once write_bytes of new entries are stored, further misses are extracted without being cached.
+        """
+        keys = [description_hash(description) for description in descriptions]
+        found = self.get_many(keys, signatures)
+        written = 0
+        for key, description in zip(keys, descriptions):
+            if key not in found:
+                # Tokenize once for the matcher, the signature and the token filter
+                tokens = tokenize(description)
+                skills = list(get_skill_matcher().find_tokens(tokens))
+                signature = minhash_signature(description, tokens) if signatures else b''
+                if write_bytes is None or written < write_bytes:
+                    written += self.put(key, description, skills, signature, tokens)
+                else:
+                    self.not_stored += 1
+                found[key] = (skills, signature)
+        return [found[key] for key in keys]
+
+    def commit(self):
+        """Commit and evict least recently used entries until the cache is back under 90% of its limit"""
+        if self.total_bytes > self.max_bytes:
+            target = self.max_bytes * 0.9
+            evicted = []
+            for rowid, size in self.conn.execute("SELECT rowid, size FROM extractions ORDER BY last_used"):
+                if self.total_bytes <= target:
+                    break
+                evicted.append((rowid,))
+                self.total_bytes -= size
+            self.conn.executemany("DELETE FROM extractions WHERE rowid = ?", evicted)
+            self.conn.execute("DELETE FROM vocabularies WHERE version != ? AND version NOT IN "
+                              "(SELECT DISTINCT vocabulary FROM extractions)", (self.version,))
+        self.conn.commit()
+
+    def stats(self):
+        return {'extraction_hits': self.hits, 'extraction_revalidated': self.revalidated,
+                'extraction_reextracted': self.reextracted, 'extraction_misses': self.misses,
+                'extraction_not_stored': self.not_stored}
+
+    def summary(self):
+        return extraction_summary(self.stats())
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+def extraction_summary(stats):
+    """Describe extraction cache counters, summed over the processes that used the cache"""
+    skipped = stats['extraction_hits'] + stats['extraction_revalidated']
+    lookups = skipped + stats['extraction_reextracted'] + stats['extraction_misses']
+    hit_rate = (skipped / lookups) * 100 if lookups else 0
+    return (f"Extraction cache: {skipped} hits ({stats['extraction_revalidated']} carried over to a new vocabulary), "
+            f"{stats['extraction_reextracted']} re-extracted after a vocabulary change, "
+            f"{stats['extraction_misses']} misses ({hit_rate:.1f}% hit rate)"
+            + (f", {stats['extraction_not_stored']} not stored past the ingest write limit"
+               if stats.get('extraction_not_stored') else ""))
+
+class JobStore:
+    """Persistent SQLite store of scraped postings indexed by LinkedIn job ID"""
+
+    def __init__(self, settings=None, extractions=None):
+        import sqlite3
+        settings = {**DEFAULT_CONFIG['store'], **(settings or {})}
+        os.makedirs(os.path.dirname(settings['path']) or '.', exist_ok=True)
+        # The scraper thread writes and the main thread reads, one after the other
+        # Local shard processes share the store, so wait out each other's write transactions
+        self.conn = sqlite3.connect(settings['path'], check_same_thread=False, timeout=60)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS postings (
+                job_id TEXT PRIMARY KEY,
+                role TEXT,
+                title TEXT,
+                company TEXT,
+                location TEXT,
+                date TEXT,
+                url TEXT,
+                skills TEXT,
+                description_hash TEXT,
+                first_seen REAL,
+                last_seen REAL,
+                signature BLOB,
+                vocabulary TEXT
+            )
+        """)
+        # Stores created before near-duplicate detection or the extraction cache lack the newer columns
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(postings)")}
+        if 'signature' not in columns:
+            self.conn.execute("ALTER TABLE postings ADD COLUMN signature BLOB")
+        if 'vocabulary' not in columns:
+            self.conn.execute("ALTER TABLE postings ADD COLUMN vocabulary TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS postings_last_seen ON postings (role, last_seen)")
+        # Skills stored under an older vocabulary are brought up to date through the extraction cache
+        self.extractions = extractions
+        self.refreshed = []
+        self.new_count = 0
+        self.known_count = 0
+        self.refreshed_count = 0
+
+    def row_to_job(self, row):
+        job_id, role, title, company, location, date, url, skills, signature, key, vocabulary = row
+        skills = json.loads(skills)
+        if self.extractions and vocabulary != self.extractions.version:
+            cached = self.extractions.get(key, signatures=False)
+            if cached:
+                skills = cached[0]
+                self.refreshed.append((json.dumps(skills), self.extractions.version, job_id))
+                self.refreshed_count += 1
+        return {
+            'title': title,
+            'company': company,
+            'location': location,
+            'date': date,
+            'skills': skills,
+            'url': url,
+            'job_id': job_id,
+            'role': role,
+            'signature': signature or b''
+        }
+
+    def lookup(self, job_ids):
+        """Return stored postings for the given IDs and mark them as seen again"""
+        if not job_ids:
+            return {}
+        placeholders = ",".join("?" * len(job_ids))
+        rows = self.conn.execute(
+            f"SELECT job_id, role, title, company, location, date, url, skills, signature, description_hash, vocabulary "
+            f"FROM postings WHERE job_id IN ({placeholders})", list(job_ids)
+        ).fetchall()
+        self.conn.execute(f"UPDATE postings SET last_seen = ? WHERE job_id IN ({placeholders})",
+                          [time.time()] + list(job_ids))
+        self.known_count += len(rows)
+        return {row[0]: self.row_to_job(row) for row in rows}
+
+    def add(self, job, description_hash):
+        """Insert a newly scraped posting"""
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO postings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job['job_id'], job['role'], job['title'], job['company'], job['location'], job['date'],
+             job['url'], json.dumps(job['skills']), description_hash, now, now, job['signature'], vocabulary_version())
+        )
+        self.new_count += 1
+
+    def commit(self):
+        self.conn.executemany("UPDATE postings SET skills = ?, vocabulary = ? WHERE job_id = ?", self.refreshed)
+        self.refreshed = []
+        self.conn.commit()
+        if self.extractions:
+            self.extractions.commit()
+
+    def iter_recent_jobs(self, job_roles, active_days, seen_before=None):
+        """Stream postings for the given roles seen within the last active_days (and before seen_before)"""
+        placeholders = ",".join("?" * len(job_roles))
+        rows = self.conn.execute(
+            f"SELECT job_id, role, title, company, location, date, url, skills, signature, description_hash, vocabulary "
+            f"FROM postings WHERE role IN ({placeholders}) AND last_seen >= ? AND last_seen < ? ORDER BY first_seen",
+            list(job_roles) + [time.time() - active_days * 86400, seen_before or float('inf')]
+        )
+        for row in rows:
+            yield self.row_to_job(row)
+
+    def summary(self):
+        return (f"Job store: {self.new_count} new postings fetched, {self.known_count} already known"
+                + (f", {self.refreshed_count} brought up to the current skill vocabulary" if self.refreshed_count else ""))
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+def plan_units(config):
+    """Split the scrape into (role, location, first page, end page) work units"""
+    pages_per_unit = get_settings(config, 'shard')['pages_per_unit'] or config['max_pages']
+    return [
+        (job_role, location, first_page, min(first_page + pages_per_unit, config['max_pages']))
+        for job_role in config['job_roles']
+        for location in config.get('locations') or [config['location']]
+        for first_page in range(0, config['max_pages'], pages_per_unit)
+    ]
+
+def unit_label(unit):
+    job_role, location, first_page, end_page = unit
+    return f"{job_role} in {location}, pages {first_page + 1}-{end_page}"
+
+def scrape_key(config, units):
+    """Identify a scrape by what it fetches, so journals and partials are only combined with the same scrape"""
+    scraper = get_settings(config, 'scraper')
+    scope = [[list(unit) for unit in units], scraper['base_url']]
+    return hashlib.sha256(json.dumps(scope).encode()).hexdigest()[:16]
+
+class ScrapeJournal:
+    """Append-only JSONL journal of completed postings and per-unit page cursors, for resuming a scrape
+
+    Writes are fsynced in batches; after a crash the journal holds a durable prefix of the run.
+    A torn last line is cut off before appending resumes, and a complete last record that only
+    lacks its newline is kept and terminated.
+    """
+
+    def __init__(self, settings=None, run_key=""):
+        settings = {**DEFAULT_CONFIG['journal'], **(settings or {})}
+        self.path = settings['path']
+        self.fsync_every = settings['fsync_every']
+        self.fsync_seconds = settings['fsync_seconds']
+        self.started = time.time()
+        self.postings = []
+        self.next_page = {}
+        self.units_done = set()
+        self.resumed = False
+
+        records, valid_bytes, terminated = self.read() if settings['resume'] else ([], 0, True)
+        header = records[0] if records else {}
+        if (header.get('type') == 'run' and header['key'] == run_key
+                and time.time() - header['started'] <= settings['max_age_hours'] * 3600):
+            self.resumed = True
+            self.started = header['started']
+            for record in records[1:]:
+                if record['type'] == 'posting':
+                    self.postings.append({**record['job'], 'signature': bytes.fromhex(record['job']['signature'])})
+                elif record['type'] == 'page':
+                    self.next_page[record['unit']] = record['page'] + 1
+                elif record['type'] == 'unit':
+                    self.units_done.add(record['unit'])
+            self.file = open(self.path, 'r+')
+            self.file.truncate(valid_bytes)
+            self.file.seek(valid_bytes)
+            if not terminated:
+                self.file.write("\n")
+        else:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self.file = open(self.path, 'w')
+            self.file.write(json.dumps({'type': 'run', 'key': run_key, 'started': self.started}) + "\n")
+
+        self.pending = 0
+        self.sync()
+
+    def read(self):
+        """Return the journal's complete records, the byte length they span and whether the last ends in a newline"""
+        records, valid_bytes, terminated = [], 0, True
+        try:
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+                    valid_bytes += len(line)
+                    terminated = line.endswith(b"\n")
+        except OSError:
+            pass
+        return records, valid_bytes, terminated
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+        self.pending += 1
+        if self.pending >= self.fsync_every or time.monotonic() - self.synced_at >= self.fsync_seconds:
+            self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        self.synced_at = time.monotonic()
+
+    def add_posting(self, job):
+        self.write({'type': 'posting', 'job': {**job, 'signature': job.get('signature', b'').hex()}})
+
+    def page_done(self, unit, page):
+        self.next_page[unit] = page + 1
+        self.write({'type': 'page', 'unit': unit, 'page': page})
+
+    def unit_done(self, unit):
+        self.units_done.add(unit)
+        self.write({'type': 'unit', 'unit': unit})
+        self.sync()
+
+    def close(self):
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+    def complete(self):
+        """The whole scrape finished: nothing is left to resume"""
+        self.close()
+        os.remove(self.path)
+
+    def summary(self):
+        cursors = "; ".join(f"{unit} from page {page + 1}" for unit, page in self.next_page.items()
+                            if unit not in self.units_done)
+        return (f"Resuming interrupted scrape: {len(self.postings)} postings recovered, "
+                f"{len(self.units_done)} work units finished" + (f", continuing {cursors}" if cursors else ""))
+
+class RunMetrics:
+    """Per-stage timings, HTTP counters and resource usage collected during one run"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = {}
+        self.hosts = {}
+        self.retries = Counter()
+        self.errors = Counter()
+        self.counters = Counter()
+        self.timers = Counter()
+        # The scraper thread and the main thread both record
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage's wall-clock and process CPU time; repeated stages accumulate"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            with self.lock:
+                totals = self.stages.setdefault(name, {'wall_s': 0.0, 'cpu_s': 0.0})
+                totals['wall_s'] += time.perf_counter() - wall
+                totals['cpu_s'] += time.process_time() - cpu
+
+    def record_request(self, host, status, latency, size):
+        with self.lock:
+            stats = self.hosts.setdefault(host, {
+                'requests': 0, 'bytes': 0, 'latency_s': 0.0, 'statuses': Counter(),
+                'latency_histogram': Counter()
+            })
+            stats['requests'] += 1
+            stats['bytes'] += size
+            stats['latency_s'] += latency
+            stats['statuses'][str(status)] += 1
+            bucket = next(bound for bound in LATENCY_BUCKETS if latency <= bound)
+            stats['latency_histogram'][f"le_{bound_label(bucket)}"] += 1
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    def record_retry(self, reason):
+        with self.lock:
+            self.retries[reason] += 1
+
+    def record_error(self, kind):
+        with self.lock:
+            self.errors[kind] += 1
+
+    def add_time(self, name, seconds):
+        """Accumulate time spent in something that is not a stage, such as rate limit waits"""
+        with self.lock:
+            self.timers[name] += seconds
+
+    def state(self):
+        """Raw counts and timings as plain JSON data, for merging into another run with merge_state"""
+        with self.lock:
+            return json.loads(json.dumps({
+                'stages': self.stages, 'hosts': self.hosts, 'retries': self.retries, 'errors': self.errors,
+                'counters': self.counters, 'timers': self.timers
+            }))
+
+    def merge_state(self, state):
+        """Fold in the state of a shard run; its stages are kept apart as shard_<stage>
+
+        Shards run in parallel, so a shard stage's wall-clock time is the slowest shard's and its CPU time the sum.
+        """
+        with self.lock:
+            for name, totals in state['stages'].items():
+                merged = self.stages.setdefault(f"shard_{name}", {'wall_s': 0.0, 'cpu_s': 0.0})
+                merged['wall_s'] = max(merged['wall_s'], totals['wall_s'])
+                merged['cpu_s'] += totals['cpu_s']
+            for host, stats in state['hosts'].items():
+                merged = self.hosts.setdefault(host, {
+                    'requests': 0, 'bytes': 0, 'latency_s': 0.0, 'statuses': Counter(),
+                    'latency_histogram': Counter()
+                })
+                for field in ('requests', 'bytes', 'latency_s'):
+                    merged[field] += stats[field]
+                merged['statuses'].update(stats['statuses'])
+                merged['latency_histogram'].update(stats['latency_histogram'])
+            self.retries.update(state['retries'])
+            self.errors.update(state['errors'])
+            self.counters.update(state['counters'])
+            self.timers.update(state['timers'])
+
+    def to_dict(self):
+        # A merged run's postings were scraped by the shards, not while reading their partials
+        scrape = self.stages.get('shard_scrape') or self.stages.get('scrape', {})
+        scrape_s = scrape.get('wall_s', 0)
+        return {
+            'started': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+            'wall_s': time.time() - self.started,
+            'stages': self.stages,
+            'time_breakdown_s': dict(self.timers),
+            'http': {
+                host: {**stats, 'mean_latency_s': stats['latency_s'] / stats['requests'],
+                       'statuses': dict(stats['statuses']), 'latency_histogram': dict(stats['latency_histogram'])}
+                for host, stats in self.hosts.items()
+            },
+            'bytes_downloaded': sum(stats['bytes'] for stats in self.hosts.values()),
+            'retries': dict(self.retries),
+            'errors': dict(self.errors),
+            'counters': dict(self.counters),
+            'postings_per_s': self.counters['postings'] / scrape_s if scrape_s else 0,
+            'peak_rss_mb': self.peak_rss_mb()
+        }
+
+    @staticmethod
+    def peak_rss_mb():
+        """Peak resident set size of this process, or None where the resource module is unavailable (Windows)"""
+        try:
+            import resource
+        except ImportError:
+            return None
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+def bound_label(bound):
+    return "inf" if bound == float('inf') else f"{bound:g}s"
+
+class ScrapeContext:
+    """Shared state for one scraping run"""
+
+    def __init__(self, session, settings, limiter, emit, metrics, cache=None, store=None, parse_pool=None,
+                 journal=None, extractions=None):
+        self.session = session
+        self.settings = settings
+        self.limiter = limiter
+        self.emit = emit
+        self.metrics = metrics
+        self.cache = cache
+        self.store = store
+        self.parse_pool = parse_pool
+        self.journal = journal
+        self.extractions = extractions
+        # Job IDs already taken by a role query this run, or recovered from the journal
+        self.claimed = set()
+        self.resumed = set()
+
+async def run_parser(ctx, func, *args):
+    """Run a parsing step in the worker pool when one is configured, else inline"""
+    import asyncio
+    started = time.perf_counter()
+    try:
+        if ctx.parse_pool is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(ctx.parse_pool, func, *args)
+    finally:
+        ctx.metrics.add_time('parse', time.perf_counter() - started)
+
+async def fetch_text(ctx, url):
+    """Fetch a page through the rate limiter, retrying transient failures"""
+    import asyncio
+    import aiohttp
+    host = urlsplit(url).hostname
+    max_retries = ctx.limiter.settings['max_retries']
+
+    for attempt in range(max_retries + 1):
+        ctx.metrics.add_time('rate_limit_wait', await ctx.limiter.acquire(host))
+        started = time.monotonic()
+        try:
+            headers = {'User-Agent': random.choice(USER_AGENTS)}
+            async with ctx.session.get(url, headers=headers) as response:
+                body = await response.read()
+                text = body.decode(response.get_encoding(), errors='replace')
+                status = response.status
+                retry_after = response.headers.get('Retry-After')
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            latency = time.monotonic() - started
+            ctx.limiter.record(host, None, latency)
+            ctx.metrics.record_request(host, type(e).__name__, latency, 0)
+            ctx.metrics.record_error(type(e).__name__)
+            error = f"{type(e).__name__}: {str(e)}"
+        else:
+            latency = time.monotonic() - started
+            ctx.limiter.record(host, status, latency, retry_after)
+            ctx.metrics.record_request(host, status, latency, len(body))
+            ctx.metrics.add_time('network', latency)
+            if status < 400:
+                if ctx.settings['record_dir']:
+                    record_response(ctx.settings['record_dir'], url, text)
+                return text
+            ctx.metrics.record_error(f"HTTP {status}")
+            if status not in RETRYABLE_STATUSES:
+                raise RuntimeError(f"HTTP {status} for {url}")
+            error = f"HTTP {status}"
+
+        if attempt < max_retries:
+            ctx.metrics.record_retry(error.split(':')[0])
+            delay = ctx.limiter.backoff(attempt)
+            ctx.metrics.add_time('retry_backoff', delay)
+            await asyncio.sleep(delay)
+
+    raise RuntimeError(f"Giving up on {url} after {max_retries + 1} attempts ({error})")
+
+async def scrape_job(ctx, job_role, card):
+    """Fetch one job description and extract its skills"""
+    html = ctx.cache.get(card['url']) if ctx.cache else None
+    if html is None:
+        html = await fetch_text(ctx, card['url'])
+        if ctx.cache:
+            ctx.cache.put(card['url'], html)
+
+    if ctx.extractions:
+        # Skills and signature of a description seen before come from the extraction cache
+        description = await run_parser(ctx, parse_job_description, html, ctx.settings['parser'])
+        key = description_hash(description)
+        cached = ctx.extractions.get(key)
+        if cached:
+            skills, signature = cached
+        else:
+            key, skills, signature = await run_parser(ctx, description_record, description)
+            ctx.extractions.put(key, description, skills, signature)
+    else:
+        key, skills, signature = await run_parser(ctx, extract_job_record, html, ctx.settings['parser'])
+
+    job = {
+        'title': card['title'],
+        'company': card['company'],
+        'location': card['location'],
+        'date': card['date'],
+        'skills': skills,
+        'url': card['url'],
+        'job_id': card['job_id'],
+        'role': job_role,
+        'signature': signature
+    }
+
+    if ctx.store:
+        ctx.store.add(job, key)
+
+    return job
+
+async def fetch_job_cards(ctx, job_role, location, page):
+    """Fetch a listing page, retrying block pages; a page without cards or block signs ends the results"""
+    import asyncio
+    url = build_search_url(job_role, location, page, ctx.settings['base_url'])
+    host = urlsplit(url).hostname
+    retries = ctx.limiter.settings['empty_page_retries']
+
+    for attempt in range(retries + 1):
+        html = await fetch_text(ctx, url)
+        cards = await run_parser(ctx, parse_job_cards, html, ctx.settings['parser'])
+        if cards or not BLOCK_PAGE_PATTERN.search(html):
+            return cards
+        # A sign-in wall or challenge is throttling served with a 200
+        ctx.limiter.record(host, 429, 0.0)
+        ctx.metrics.record_error('block page')
+        if attempt < retries:
+            ctx.metrics.record_retry('block page')
+            delay = ctx.limiter.backoff(attempt)
+            ctx.metrics.add_time('retry_backoff', delay)
+            await asyncio.sleep(delay)
+
+    return []
+
+async def scrape_role(ctx, job_role, location, max_pages, first_page=0):
+    """Scrape the listing pages of one role from first_page up to max_pages, fetching descriptions concurrently"""
+    import asyncio
+    unit = unit_label((job_role, location, first_page, max_pages))
+    if ctx.journal and unit in ctx.journal.units_done:
+        return
+    print(f"Scraping jobs for: {job_role}" + (f" (pages {first_page + 1}-{max_pages})" if first_page else ""))
+
+    start_page = ctx.journal.next_page.get(unit, first_page) if ctx.journal else first_page
+    for page in range(start_page, max_pages):
+        try:
+            cards = await fetch_job_cards(ctx, job_role, location, page)
+        except Exception as e:
+            # The role stays open in the journal, so a rerun retries this page
+            print(f"Error scraping page: {str(e)}")
+            return
+
+        if not cards:
+            break
+
+        # Postings already in the store are reused instead of fetched again
+        known = ctx.store.lookup([card['job_id'] for card in cards]) if ctx.store else {}
+
+        # A posting listed under several role queries is fetched and counted once, for the first role
+        fresh = []
+        for card in cards:
+            if card['job_id'] in ctx.resumed:
+                continue
+            if card['job_id'] in ctx.claimed:
+                ctx.metrics.count('duplicate_listings')
+                if card['job_id'] not in known:
+                    ctx.metrics.count('fetches_avoided')
+            else:
+                ctx.claimed.add(card['job_id'])
+                fresh.append(card)
+        new_cards = [card for card in fresh if card['job_id'] not in known]
+
+        results = await asyncio.gather(*[scrape_job(ctx, job_role, card) for card in new_cards], return_exceptions=True)
+        fetched = dict(zip((card['job_id'] for card in new_cards), results))
+        for card in fresh:
+            result = known.get(card['job_id']) or fetched[card['job_id']]
+            if isinstance(result, Exception):
+                print(f"  Error processing job: {str(result)}")
+                ctx.metrics.record_error(f"job: {type(result).__name__}")
+            else:
+                if ctx.journal:
+                    ctx.journal.add_posting(result)
+                await ctx.emit(result)
+
+        if ctx.store:
+            ctx.store.commit()
+        if ctx.journal:
+            ctx.journal.page_done(unit, page)
+
+        print(f"  {job_role}: page {page+1} complete")
+
+        if ctx.store and fresh and not new_cards:
+            print(f"  {job_role}: page {page+1} only had known postings, stopping early")
+            break
+
+    if ctx.journal:
+        ctx.journal.unit_done(unit)
+
+async def scrape_linkedin_jobs_async(job_roles, location, max_pages, settings=None, limiter=None, cache=None, store=None,
+                                     emit=None, metrics=None, journal=None, units=None, extractions=None):
+    """Scrape job data from LinkedIn with concurrent roles (or work units) and description fetches"""
+    import asyncio
+    import aiohttp
+    settings = settings or DEFAULT_CONFIG['scraper']
+    limiter = limiter or AdaptiveRateLimiter()
+    metrics = metrics or RunMetrics()
+    units = units or [(job_role, location, 0, max_pages) for job_role in job_roles]
+    job_data = []
+
+    async def collect(job):
+        job_data.append(job)
+
+    # One pooled keep-alive session; the connector enforces the global and per-host limits
+    connector = aiohttp.TCPConnector(
+        limit=settings['max_concurrency'],
+        limit_per_host=settings['per_host_concurrency'],
+        ttl_dns_cache=300
+    )
+    timeout = aiohttp.ClientTimeout(total=settings['request_timeout'])
+
+    # Spawned workers parse pages and extract skills off the event loop; fork is unsafe with the scraper thread
+    parse_pool = None
+    if settings['parse_workers']:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        parse_pool = ProcessPoolExecutor(settings['parse_workers'], mp_context=multiprocessing.get_context('spawn'))
+
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            ctx = ScrapeContext(session, settings, limiter, emit or collect, metrics, cache, store, parse_pool,
+                                journal, extractions)
+            if journal and journal.resumed:
+                # Postings completed before the interruption are replayed, not fetched again
+                print(journal.summary())
+                for job in journal.postings:
+                    ctx.claimed.add(job['job_id'])
+                    ctx.resumed.add(job['job_id'])
+                    await ctx.emit(dict(job))
+            await asyncio.gather(*[
+                scrape_role(ctx, job_role, unit_location, end_page, first_page)
+                for job_role, unit_location, first_page, end_page in units
+            ])
+        if journal and {unit_label(unit) for unit in units} <= journal.units_done:
+            journal.complete()
+    finally:
+        if parse_pool:
+            parse_pool.shutdown()
+        if journal:
+            journal.close()
+
+    # Postings arrive in completion order; without an emit callback they are returned as a list
+    return job_data
+
+def scrape_linkedin_jobs(job_roles, location, max_pages, settings=None, limiter=None, cache=None, store=None,
+                         metrics=None, journal=None, units=None, extractions=None):
+    """Scrape job data from LinkedIn"""
+    import asyncio
+    return asyncio.run(scrape_linkedin_jobs_async(job_roles, location, max_pages, settings, limiter, cache, store,
+                                                  metrics=metrics, journal=journal, units=units,
+                                                  extractions=extractions))
+
+def iter_linkedin_jobs(job_roles, location, max_pages, settings=None, limiter=None, cache=None, store=None,
+                       metrics=None, journal=None, units=None, queue_size=100, extractions=None):
+    """Stream scraped postings as they complete through a bounded hand-off queue"""
+    import asyncio
+    postings = queue.Queue(maxsize=queue_size)
+
+    async def emit(job):
+        # Blocks the producing task while the consumer is behind, keeping memory bounded
+        await asyncio.to_thread(postings.put, job)
+
+    def run():
+        try:
+            asyncio.run(scrape_linkedin_jobs_async(job_roles, location, max_pages, settings, limiter, cache, store,
+                                                   emit=emit, metrics=metrics, journal=journal, units=units,
+                                                   extractions=extractions))
+        except BaseException as e:
+            postings.put(e)
+        finally:
+            postings.put(STREAM_END)
+
+    scraper = threading.Thread(target=run, name="scraper", daemon=True)
+    scraper.start()
+
+    while True:
+        item = postings.get()
+        if item is STREAM_END:
+            break
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+    scraper.join()
+
+def replay_key(url):
+    """Key a LinkedIn URL for the fixture corpus, ignoring host and tracking parameters"""
+    parts = urlsplit(url)
+    if '/jobs/view/' in parts.path:
+        return f"view:{job_id_from_url(url)}"
+    return f"{parts.path}?{'&'.join(sorted(parts.query.split('&')))}"
+
+def record_response(record_dir, url, body):
+    """Save a fetched page into a fixture corpus for offline replay"""
+    key = replay_key(url)
+    filename = f"{hashlib.sha1(key.encode()).hexdigest()[:16]}.html"
+    os.makedirs(record_dir, exist_ok=True)
+
+    with open(os.path.join(record_dir, filename), 'w', encoding='utf-8') as f:
+        f.write(body)
+    with open(os.path.join(record_dir, REPLAY_INDEX), 'a') as f:
+        f.write(json.dumps({'key': key, 'url': url, 'file': filename}) + "\n")
+
+def make_replay_server(fixture_dir, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, retry_after=1):
+    """Build a local HTTP server that replays a recorded fixture corpus in place of LinkedIn"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    with open(os.path.join(fixture_dir, REPLAY_INDEX), 'r') as f:
+        index = {record['key']: record['file'] for record in map(json.loads, f)}
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if latency:
+                time.sleep(random.uniform(0, 2 * latency))
+
+            if random.random() < error_rate:
+                self.send_response(429)
+                self.send_header('Retry-After', str(retry_after))
+                self.end_headers()
+                return
+
+            key = replay_key(self.path)
+            if key in index:
+                with open(os.path.join(fixture_dir, index[key]), 'r', encoding='utf-8') as f:
+                    body = f.read()
+                # Point job links back at this server
+                body = LINKEDIN_URL_PATTERN.sub(f"http://{self.server.server_address[0]}:{self.server.server_port}", body)
+            elif key.startswith(LINKEDIN_SEARCH_PATH.split('?')[0]):
+                body = ""  # Past the last recorded page, like LinkedIn itself
+            else:
+                self.send_error(404)
+                return
+
+            payload = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), ReplayHandler)
+    server.daemon_threads = True
+    return server
+
+class SkillMatcher:
+    """Aho-Corasick automaton over word tokens that finds every skill in one pass"""
+
+    def __init__(self, patterns):
+        # patterns maps a lower-case skill phrase to the skill name reported for it
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+
+        for phrase, name in patterns.items():
+            state = 0
+            for token in tokenize(phrase):
+                if token not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(set())
+                    self.goto[state][token] = len(self.goto) - 1
+                state = self.goto[state][token]
+            self.output[state].add(name)
+
+        # Breadth-first pass to link each state to its longest proper suffix state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(token, 0)
+                self.output[child] |= self.output[self.fail[child]]
+
+    @classmethod
+    def from_tables(cls, goto, fail, output):
+        """Rebuild a matcher from the tables of a compiled taxonomy index"""
+        matcher = cls.__new__(cls)
+        matcher.goto = goto
+        matcher.fail = fail
+        matcher.output = output
+        return matcher
+
+    def find(self, text):
+        """Return the set of skill names that occur in text as whole words"""
+        return self.find_tokens(tokenize(text))
+
+    def find_tokens(self, tokens):
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set()
+        state = 0
+
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                found |= output[state]
+
+        return found
+
+def tokenize(text):
+    """Split text into lower-case words and single punctuation tokens"""
+    return text.lower().translate(PUNCTUATION_TABLE).split()
+
+def compile_taxonomy(source=TAXONOMY_FILE, target=TAXONOMY_INDEX):
+    """Validate the skill taxonomy and write a prebuilt matcher index"""
+    with open(source, 'rb') as f:
+        raw = f.read()
+    taxonomy = json.loads(raw)
+
+    # Every name and alias maps to the canonical skill name reported in job data
+    patterns = {}
+    skill_ids = set()
+    for skill in taxonomy['skills']:
+        if skill['id'] in skill_ids:
+            raise ValueError(f"Duplicate skill id in taxonomy: {skill['id']}")
+        if skill['category'] not in SKILL_CATEGORIES:
+            raise ValueError(f"Unknown category '{skill['category']}' for skill {skill['id']}")
+        skill_ids.add(skill['id'])
+
+        for phrase in [skill['name']] + skill.get('aliases', []):
+            phrase = ' '.join(tokenize(phrase))
+            if patterns.get(phrase, skill['name']) != skill['name']:
+                raise ValueError(f"Alias '{phrase}' maps to both {patterns[phrase]} and {skill['name']}")
+            patterns[phrase] = skill['name']
+
+    matcher = SkillMatcher(patterns)
+    index = {
+        'format': TAXONOMY_INDEX_FORMAT,
+        'version': taxonomy['version'],
+        'source_hash': hashlib.sha256(raw).hexdigest(),
+        'skills': taxonomy['skills'],
+        'aliases': patterns,
+        'goto': matcher.goto,
+        'fail': matcher.fail,
+        'output': matcher.output
+    }
+
+    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    # Workers and shard processes may recompile at once after a taxonomy edit
+    tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, target)
+
+    return index
+
+def load_taxonomy(source=TAXONOMY_FILE, target=TAXONOMY_INDEX):
+    """Load the prebuilt taxonomy index, recompiling it when the taxonomy file has changed"""
+    with open(source, 'rb') as f:
+        source_hash = hashlib.sha256(f.read()).hexdigest()
+
+    try:
+        with open(target, 'rb') as f:
+            index = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        index = None
+
+    if not index or index.get('format') != TAXONOMY_INDEX_FORMAT or index['source_hash'] != source_hash:
+        index = compile_taxonomy(source, target)
+
+    index['matcher'] = SkillMatcher.from_tables(index.pop('goto'), index.pop('fail'), index.pop('output'))
+    return index
+
+def get_taxonomy():
+    """Return the shared skill taxonomy, loading it on first use"""
+    global skill_taxonomy
+    if skill_taxonomy is None:
+        skill_taxonomy = load_taxonomy()
+    return skill_taxonomy
+
+def get_skill_matcher():
+    """Return the compiled matcher for the skill taxonomy"""
+    return get_taxonomy()['matcher']
+
+def canonical_skill(name):
+    """Map a skill name or alias onto its canonical taxonomy name"""
+    return get_taxonomy()['aliases'].get(' '.join(tokenize(name)), name)
+
+def extract_skills_from_text(text):
+    """Extract skills using keyword matching"""
+    return list(get_skill_matcher().find(text))
+
+def vocabulary_version():
+    """Hash of the phrase -> skill mapping, which changes exactly when extracted skills can"""
+    taxonomy = get_taxonomy()
+    if 'vocabulary' not in taxonomy:
+        aliases = json.dumps(sorted(taxonomy['aliases'].items()))
+        taxonomy['vocabulary'] = hashlib.sha256(aliases.encode()).hexdigest()[:16]
+    return taxonomy['vocabulary']
+
+def token_filter_positions(token):
+    # Double hashing: the k bit positions are h1 + i * h2
+    data = token.encode()
+    first, second = zlib.crc32(data), zlib.crc32(data, 0x9E3779B9) | 1
+    return [(first + i * second) % TOKEN_FILTER_BITS for i in range(TOKEN_FILTER_HASHES)]
+
+def token_filter(tokens):
+    """Bloom filter of a description's distinct tokens"""
+    bits = bytearray(TOKEN_FILTER_BITS // 8)
+    for token in set(tokens):
+        for position in token_filter_positions(token):
+            bits[position >> 3] |= 1 << (position & 7)
+    return bytes(bits)
+
+def may_contain(bits, phrase):
+    """False when some token of the phrase is certainly missing from the text behind the filter"""
+    return all(bits[position >> 3] >> (position & 7) & 1
+               for token in phrase.split() for position in token_filter_positions(token))
+
+class StringTable:
+    """Interned strings numbered in first-seen order"""
+
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def id(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return self.ids[name]
+
+    def __getitem__(self, i):
+        return self.names[i]
+
+    def __len__(self):
+        return len(self.names)
+
+class Posting:
+    """One row of a PostingBatch, read like the posting dicts the scraper yields"""
+    __slots__ = ('batch', 'row')
+
+    def __init__(self, batch, row):
+        self.batch = batch
+        self.row = row
+
+    def __getitem__(self, key):
+        return self.batch.value(key, self.row)
+
+    def get(self, key, default=None):
+        return self.batch.value(key, self.row) if key in self.batch.fields else default
+
+    def keys(self):
+        return self.batch.fields
+
+    def __contains__(self, key):
+        return key in self.batch.fields
+
+    def __repr__(self):
+        return f"Posting({dict((key, self[key]) for key in self.keys())})"
+
+class PostingBatch:
+    """Append-only columnar corpus: skills as 16-bit IDs into a shared vocabulary, role/company/location/date
+    as IDs into interned string tables and the remaining text as UTF-8 in one buffer per field.
+
+    Postings are deduplicated before batching, so MinHash signatures are not kept. A saved batch is
+    loaded by memory-mapping the file, with every column a zero-copy view of it.
+    """
+    CODED_FIELDS = ('role', 'company', 'location', 'date')
+    TEXT_FIELDS = ('job_id', 'title', 'url')
+    fields = ('title', 'company', 'location', 'date', 'skills', 'url', 'job_id', 'role')
+
+    def __init__(self, skills=None):
+        self.skills = skills if skills is not None else StringTable()
+        self.tables = {field: StringTable() for field in self.CODED_FIELDS}
+        self.codes = {field: array('I') for field in self.CODED_FIELDS}
+        self.text = {field: bytearray() for field in self.TEXT_FIELDS}
+        self.text_ends = {field: array('Q') for field in self.TEXT_FIELDS}
+        self.skill_ids = array('H')
+        self.skill_ends = array('Q')
+        self.mapped = None
+        self.canonical = {}
+
+    @classmethod
+    def from_jobs(cls, jobs, skills=None):
+        batch = cls(skills)
+        for job in jobs:
+            batch.append(job)
+        return batch
+
+    def append(self, job):
+        if self.mapped is not None:
+            raise ValueError("A memory-mapped corpus is read-only")
+        for field in self.CODED_FIELDS:
+            self.codes[field].append(self.tables[field].id(job.get(field) or ('Unknown' if field == 'role' else '')))
+        for field in self.TEXT_FIELDS:
+            self.text[field] += (job.get(field) or '').encode()
+            self.text_ends[field].append(len(self.text[field]))
+        # Same first-seen skill order as SkillMatrix.from_jobs, one ID per canonical skill
+        ids = {}
+        for skill in job['skills']:
+            if skill not in self.canonical:
+                self.canonical[skill] = self.skills.id(canonical_skill(skill))
+            ids.setdefault(self.canonical[skill], None)
+        if len(self.skills) > 0x10000:
+            raise ValueError("A corpus vocabulary holds at most 65536 skills")
+        self.skill_ids.extend(ids)
+        self.skill_ends.append(len(self.skill_ids))
+
+    def __len__(self):
+        return len(self.skill_ends)
+
+    def __getitem__(self, row):
+        return Posting(self, row)
+
+    def __iter__(self):
+        return (Posting(self, row) for row in range(len(self)))
+
+    def span(self, ends, row):
+        return (ends[row - 1] if row else 0), ends[row]
+
+    def value(self, field, row):
+        if field == 'skills':
+            start, end = self.span(self.skill_ends, row)
+            return [self.skills[skill_id] for skill_id in self.skill_ids[start:end]]
+        if field in self.codes:
+            return self.tables[field][self.codes[field][row]]
+        start, end = self.span(self.text_ends[field], row)
+        return bytes(self.text[field][start:end]).decode()
+
+    def skill_matrix(self):
+        """SkillMatrix straight from the ID columns, without a pass over the postings"""
+        import numpy as np
+        from scipy import sparse
+        indices = np.frombuffer(self.skill_ids, dtype=np.uint16).astype(np.int32)
+        indptr = np.concatenate(([0], np.frombuffer(self.skill_ends, dtype=np.uint64).astype(np.int64)))
+        matrix = sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), indices, indptr),
+                                   shape=(len(self), len(self.skills)))
+        groups = {field: sorted_groups(self.tables[field].names, np.frombuffer(self.codes[field], dtype=np.uint32))
+                  for field in ('role', 'location')}
+        return SkillMatrix(matrix, list(self.skills.names), *groups['role'], *groups['location'])
+
+    def columns(self):
+        yield 'skill_ids', self.skill_ids
+        yield 'skill_ends', self.skill_ends
+        for field in self.CODED_FIELDS:
+            yield f"{field}_codes", self.codes[field]
+        for field in self.TEXT_FIELDS:
+            yield f"{field}_text", self.text[field]
+            yield f"{field}_ends", self.text_ends[field]
+
+    def save(self, path):
+        """Write the columns after a JSON header, each 8-byte aligned so a load can map them in place"""
+        sections = []
+        offset = 0
+        for name, column in self.columns():
+            view = memoryview(column)
+            sections.append([name, view.format, offset, view.nbytes])
+            offset += (view.nbytes + 7) // 8 * 8
+        header = json.dumps({
+            'postings': len(self), 'skills': self.skills.names,
+            'tables': {field: table.names for field, table in self.tables.items()}, 'sections': sections
+        }).encode()
+        data_start = (len(CORPUS_MAGIC) + 8 + len(header) + 7) // 8 * 8
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(CORPUS_MAGIC + len(header).to_bytes(8, 'little') + header)
+            for (_, column), (_, _, offset, _) in zip(self.columns(), sections):
+                f.seek(data_start + offset)
+                f.write(memoryview(column).cast('B'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Map a saved corpus; columns are read from the page cache on access rather than copied"""
+        import mmap
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(CORPUS_MAGIC)] != CORPUS_MAGIC:
+            raise ValueError(f"{path} is not a saved posting corpus")
+        header_size = int.from_bytes(mapped[len(CORPUS_MAGIC):len(CORPUS_MAGIC) + 8], 'little')
+        header = json.loads(mapped[len(CORPUS_MAGIC) + 8:len(CORPUS_MAGIC) + 8 + header_size])
+        data_start = (len(CORPUS_MAGIC) + 8 + header_size + 7) // 8 * 8
+
+        batch = cls(StringTable(header['skills']))
+        batch.tables = {field: StringTable(names) for field, names in header['tables'].items()}
+        view = memoryview(mapped)
+        columns = {name: view[data_start + offset:data_start + offset + nbytes].cast(fmt)
+                   for name, fmt, offset, nbytes in header['sections']}
+        batch.skill_ids = columns['skill_ids']
+        batch.skill_ends = columns['skill_ends']
+        batch.codes = {field: columns[f"{field}_codes"] for field in cls.CODED_FIELDS}
+        batch.text = {field: columns[f"{field}_text"] for field in cls.TEXT_FIELDS}
+        batch.text_ends = {field: columns[f"{field}_ends"] for field in cls.TEXT_FIELDS}
+        batch.mapped = mapped
+        return batch
+
+def demand_order(skills, demand):
+    """Skill positions by descending demand, ties by name, along the last axis of demand.
+
+    Skills are numbered in arrival order, which varies between runs, so ties must not fall back on it.
+    """
+    import numpy as np
+    rank = np.empty(len(skills), dtype=np.int64)
+    rank[sorted(range(len(skills)), key=skills.__getitem__)] = np.arange(len(skills))
+    return np.lexsort((np.broadcast_to(rank, np.shape(demand)), -np.asarray(demand)))
+
+def by_demand(item):
+    """Sort key for (skill, demand) pairs: descending demand, ties by name"""
+    return -item[1], item[0]
+
+def sorted_groups(names, codes):
+    """Renumber first-seen group codes so groups come in sorted name order, returning the names and codes"""
+    import numpy as np
+    order = sorted(range(len(names)), key=names.__getitem__)
+    rank = np.empty(len(names), dtype=np.int64)
+    rank[order] = np.arange(len(names))
+    return [names[i] for i in order], rank[np.asarray(codes, dtype=np.int64)]
+
+class SkillMatrix:
+    """Sparse job × skill matrix with role and location codes, built once from the corpus"""
+
+    def __init__(self, matrix, skills, roles, role_codes, locations, location_codes):
+        self.matrix = matrix
+        self.skills = skills
+        self.roles = roles
+        self.role_codes = role_codes
+        self.locations = locations
+        self.location_codes = location_codes
+
+    @classmethod
+    def from_jobs(cls, job_data):
+        """Build the matrix from posting records"""
+        import numpy as np
+        from scipy import sparse
+        if isinstance(job_data, PostingBatch):
+            return job_data.skill_matrix()
+        names = []
+        lengths, roles, locations = [], [], []
+        # Column-wise passes over slices of the postings keep the per-posting work in C without holding them all
+        jobs = iter(job_data)
+        while True:
+            chunk = list(itertools.islice(jobs, 65536))
+            if not chunk:
+                break
+            skill_lists = [job['skills'] for job in chunk]
+            names.extend(itertools.chain.from_iterable(skill_lists))
+            lengths.extend(map(len, skill_lists))
+            roles.extend([job.get('role', 'Unknown') for job in chunk])
+            locations.extend([job['location'] for job in chunk])
+        indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(lengths, dtype=np.int64, count=len(lengths)), out=indptr[1:])
+        role_index = {role: i for i, role in enumerate(dict.fromkeys(roles))}
+        role_codes = np.fromiter(map(role_index.__getitem__, roles), dtype=np.int64, count=len(roles))
+        location_index = {location: i for i, location in enumerate(dict.fromkeys(locations))}
+        location_codes = np.fromiter(map(location_index.__getitem__, locations), dtype=np.int64, count=len(locations))
+
+        # Map each distinct raw name to its canonical skill's column once, then all names in one pass
+        skill_index = {}
+        columns = {name: skill_index.setdefault(canonical_skill(name), len(skill_index))
+                   for name in dict.fromkeys(names)}
+        indices = np.fromiter(map(columns.__getitem__, names), dtype=np.int32, count=len(names))
+        matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), indices, indptr),
+            shape=(len(lengths), len(skill_index))
+        )
+        # A skill listed twice (or under two aliases) still counts once per posting
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return cls(matrix, list(skill_index), *sorted_groups(list(role_index), role_codes),
+                   *sorted_groups(list(location_index), location_codes))
+
+    @property
+    def total_jobs(self):
+        return self.matrix.shape[0]
+
+    def skill_counts(self):
+        """Number of postings requiring each skill"""
+        import numpy as np
+        return np.asarray(self.matrix.sum(axis=0)).ravel()
+
+    def demand(self):
+        """Percentage of postings requiring each skill"""
+        import numpy as np
+        if not self.total_jobs:
+            return np.zeros(len(self.skills))
+        return self.skill_counts() / self.total_jobs * 100
+
+    def group_demand(self, codes, names, top_n=5):
+        """Top skill demand per group, from one sparse group × job indicator product"""
+        import numpy as np
+        from scipy import sparse
+        groups = sparse.csr_matrix(
+            (np.ones(self.total_jobs, dtype=np.int32), (codes, np.arange(self.total_jobs))),
+            shape=(len(names), self.total_jobs)
+        )
+        counts = (groups @ self.matrix).toarray()
+        sizes = np.asarray(groups.sum(axis=1)).ravel()
+        demand = counts / np.maximum(sizes, 1)[:, None] * 100
+        top = demand_order(self.skills, demand)[:, :top_n]
+
+        return {
+            name: {self.skills[j]: float(demand[g, j]) for j in top[g] if counts[g, j]}
+            for g, name in enumerate(names)
+        }
+
+    def role_breakdown(self):
+        return self.group_demand(self.role_codes, self.roles)
+
+    def location_breakdown(self):
+        return self.group_demand(self.location_codes, self.locations)
+
+class SkillAggregator:
+    """Skill counters updated online as postings stream through the pipeline"""
+
+    def __init__(self):
+        self.total_jobs = 0
+        self.skill_counts = Counter()
+        self.group_jobs = {'role': Counter(), 'location': Counter()}
+        self.group_skills = {'role': defaultdict(Counter), 'location': defaultdict(Counter)}
+        self.companies = set()
+        self.canonical = {}
+
+    def add(self, job):
+        """Count one posting"""
+        skills = set()
+        for skill in job['skills']:
+            if skill not in self.canonical:
+                self.canonical[skill] = canonical_skill(skill)
+            skills.add(self.canonical[skill])
+
+        self.total_jobs += 1
+        self.skill_counts.update(skills)
+        if job.get('company'):
+            self.companies.add(job['company'])
+        for group, value in (('role', job.get('role', 'Unknown')), ('location', job['location'])):
+            self.group_jobs[group][value] += 1
+            self.group_skills[group][value].update(skills)
+
+    def counters(self):
+        """Number of keys held, which is what exact counting's memory grows with"""
+        return len(self.skill_counts) + len(self.companies) + sum(
+            len(counts) for groups in self.group_skills.values() for counts in groups.values())
+
+    @property
+    def skills(self):
+        return list(self.skill_counts)
+
+    def demand(self):
+        """Percentage of postings so far requiring each skill"""
+        import numpy as np
+        counts = np.fromiter(self.skill_counts.values(), dtype=float, count=len(self.skill_counts))
+        return counts / self.total_jobs * 100 if self.total_jobs else counts
+
+    def group_demand(self, group, top_n=5):
+        return {
+            value: {skill: count / self.group_jobs[group][value] * 100
+                    for skill, count in heapq.nsmallest(top_n, self.group_skills[group][value].items(), key=by_demand)}
+            for value in sorted(self.group_jobs[group])
+        }
+
+    def role_breakdown(self):
+        return self.group_demand('role')
+
+    def location_breakdown(self):
+        return self.group_demand('location')
+
+def sketch_hash(key):
+    """Deterministic 128-bit hash of a sketch key, as two 64-bit halves"""
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+
+def combine_hashes(outer, inner):
+    """Hash of a compound key from the sketch hashes of its parts, without hashing the joined string"""
+    return ((outer[0] * HASH_MULTIPLIER + inner[0]) & HASH_MASK, (outer[1] * HASH_MULTIPLIER + inner[1]) & HASH_MASK)
+
+class CountMinSketch:
+    """Fixed-size frequency table: estimates overshoot by at most epsilon × total with probability 1 - delta"""
+
+    def __init__(self, epsilon=0.0005, delta=0.01):
+        import math
+        import numpy as np
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = np.zeros(self.depth * self.width, dtype=np.uint32)
+        self.total = 0
+        # Updates are buffered as key hashes and applied to the table in bulk
+        self.pending = []
+        self.pending_counts = []
+
+    def cells(self, hashes):
+        """Flat table index of the key's counter in every row"""
+        # Double hashing gives depth independent-enough columns from one 128-bit hash
+        h1, h2 = hashes
+        return [row * self.width + ((h1 + row * h2) & HASH_MASK) % self.width for row in range(self.depth)]
+
+    def add(self, hashes, count=1):
+        """Count a key given by its sketch_hash"""
+        self.pending.append(hashes)
+        self.pending_counts.append(count)
+        self.total += count
+        if len(self.pending) >= SKETCH_BUFFER_SIZE:
+            self.flush()
+
+    def update(self, hashes):
+        """Count each key in a list of sketch_hash values once"""
+        self.pending.extend(hashes)
+        self.pending_counts.extend([1] * len(hashes))
+        self.total += len(hashes)
+        if len(self.pending) >= SKETCH_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        import numpy as np
+        if not self.pending:
+            return
+        hashes = np.array(self.pending, dtype=np.uint64)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        # uint64 arithmetic wraps like the HASH_MASK in cells
+        cells = rows * np.uint64(self.width) + (hashes[:, 0] + rows * hashes[:, 1]) % np.uint64(self.width)
+        counts = np.tile(np.array(self.pending_counts, dtype=float), self.depth)
+        self.table += np.bincount(cells.ravel().astype(np.intp), counts, minlength=len(self.table)).astype(np.uint32)
+        self.pending.clear()
+        self.pending_counts.clear()
+
+    def estimate(self, hashes):
+        self.flush()
+        return int(self.table[self.cells(hashes)].min())
+
+    def error_bound(self):
+        return self.epsilon * self.total
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Count-Min sketches with different error bounds cannot be merged")
+        self.flush()
+        other.flush()
+        self.table += other.table
+        self.total += other.total
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+class HyperLogLog:
+    """Distinct count estimate in 2^precision one-byte registers, with relative error about 1.04 / sqrt(2^precision)"""
+
+    def __init__(self, error=0.01):
+        import math
+        self.precision = min(max(math.ceil(math.log2((1.04 / error) ** 2)), 4), 18)
+        self.registers = bytearray(1 << self.precision)
+        self.rest_bits = 64 - self.precision
+
+    def add(self, hashes):
+        """Count a key given by its sketch_hash"""
+        value = hashes[0]
+        register = value >> self.rest_bits
+        rank = self.rest_bits - (value & ((1 << self.rest_bits) - 1)).bit_length() + 1
+        if rank > self.registers[register]:
+            self.registers[register] = rank
+
+    def count(self):
+        import numpy as np
+        registers = np.frombuffer(self.registers, dtype=np.uint8)
+        m = len(registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.exp2(-registers.astype(float)))
+        zeros = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are still empty
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other):
+        import numpy as np
+        if self.precision != other.precision:
+            raise ValueError("HyperLogLogs with different precisions cannot be merged")
+        self.registers = bytearray(np.maximum(np.frombuffer(self.registers, dtype=np.uint8),
+                                              np.frombuffer(other.registers, dtype=np.uint8)).tobytes())
+
+    @property
+    def nbytes(self):
+        return len(self.registers)
+
+class SpaceSaving:
+    """Top-k heavy hitters in capacity counters: every item with more than total / capacity occurrences is kept,
+    and each count overshoots by at most its recorded error"""
 
-def load_config():
-    """Load or create configuration file"""
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
-    else:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(DEFAULT_CONFIG, f, indent=2)
-        return DEFAULT_CONFIG
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        # (count, key) per tracked key; counts only grow, so stale entries are refreshed when they surface
+        self.heap = []
 
-def scrape_linkedin_jobs(job_roles, location, max_pages):
-    """Scrape job data from LinkedIn"""
-    job_data = []
-    
-    for job_role in job_roles:
-        print(f"Scraping jobs for: {job_role}")
-        
-        for page in range(max_pages):
-            # Format search URL
-            search_query = f"{job_role} {location}"
-            encoded_query = quote(search_query)
-            url = f"https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={encoded_query}&location={location}&start={page * 25}"
-            
-            try:
-                headers = {'User-Agent': ua.random}
-                response = requests.get(url, headers=headers, timeout=10)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                jobs = soup.find_all('li')
-                
-                if not jobs:
-                    break
-                
-                for job in jobs:
-                    try:
-                        # Extract job details
-                        job_title = job.find('h3', class_='base-search-card__title').text.strip()
-                        company = job.find('h4', class_='base-search-card__subtitle').text.strip()
-                        location = job.find('span', class_='job-search-card__location').text.strip()
-                        meta = job.find('div', class_='base-search-card__metadata')
-                        date = meta.find('time')['datetime'] if meta.find('time') else "N/A"
-                        job_url = job.find('a', class_='base-card__full-link')['href']
-                        
-                        # Get job description
-                        desc_response = requests.get(job_url, headers=headers, timeout=5)
-                        desc_soup = BeautifulSoup(desc_response.text, 'html.parser')
-                        description = desc_soup.find('div', class_='description__text').get_text(separator=' ', strip=True) if desc_soup.find('div', class_='description__text') else ""
-                        
-                        # Extract skills from description
-                        skills = extract_skills_from_text(description)
-                        
-                        job_data.append({
-                            'title': job_title,
-                            'company': company,
-                            'location': location,
-                            'date': date,
-                            'skills': skills,
-                            'url': job_url
-                        })
-                        
-                        # Random delay to avoid blocking
-                        time.sleep(random.uniform(1, 2))
-                        
-                    except Exception as e:
-                        print(f"  Error processing job: {str(e)}")
-                        continue
-                
-                print(f"  Page {page+1} complete")
-                time.sleep(random.uniform(2, 3))  # Delay between pages
-                
-            except Exception as e:
-                print(f"Error scraping page: {str(e)}")
-                break
-    
-    return job_data
+    def add(self, key, count=1):
+        """Count key, returning the key it evicted, if any"""
+        self.total += count
+        if key in self.counts:
+            self.counts[key] += count
+            return None
+        evicted = None
+        floor = 0
+        if len(self.counts) >= self.capacity:
+            evicted = self.pop_min()
+            floor = self.counts.pop(evicted)
+            del self.errors[evicted]
+        self.counts[key] = floor + count
+        self.errors[key] = floor
+        heapq.heappush(self.heap, (floor + count, key))
+        return evicted
 
-def extract_skills_from_text(text):
-    """Extract skills using keyword matching"""
-    tech_skills = [
-        'python', 'r', 'java', 'c++', 'javascript', 'sql', 'scala', 
-        'machine learning', 'deep learning', 'ai', 'artificial intelligence',
-        'tensorflow', 'pytorch', 'keras', 'scikit-learn', 
-        'data analysis', 'data visualization', 'statistics', 
-        'big data', 'hadoop', 'spark', 'hive', 
-        'cloud', 'aws', 'azure', 'gcp', 
-        'docker', 'kubernetes', 
-        'sql', 'nosql', 'mongodb', 'cassandra', 
-        'tableau', 'power bi', 'matplotlib', 'seaborn', 
-        'nlp', 'computer vision', 'reinforcement learning',
-        'git', 'agile', 'scrum', 
-        'excel', 'pandas', 'numpy', 'dask',
-        'linux', 'bash', 'api', 'rest', 'graphql',
-        'spark', 'hadoop', 'kafka', 'airflow',
-        'mlops', 'ci/cd', 'jenkins', 'github actions',
-        'tableau', 'powerbi', 'looker', 'redshift',
-        'snowflake', 'bigquery', 'postgresql', 'mysql'
-    ]
-    
-    soft_skills = [
-        'communication', 'problem solving', 'teamwork', 
-        'leadership', 'time management', 'critical thinking',
-        'adaptability', 'creativity', 'emotional intelligence',
-        'collaboration', 'negotiation', 'conflict resolution'
-    ]
-    
-    found_skills = []
-    text_lower = text.lower()
-    
-    for skill in tech_skills + soft_skills:
-        if skill in text_lower:
-            found_skills.append(skill.title())
-    
-    return list(set(found_skills))
+    def update(self, keys):
+        """Count each of keys once"""
+        counts = self.counts
+        for key in keys:
+            if key in counts:
+                counts[key] += 1
+                self.total += 1
+            else:
+                self.add(key)
+
+    def pop_min(self):
+        while True:
+            count, key = self.heap[0]
+            if self.counts[key] == count:
+                heapq.heappop(self.heap)
+                return key
+            heapq.heapreplace(self.heap, (self.counts[key], key))
+
+    def floor(self):
+        """Upper bound on the count of any item not being tracked"""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def top(self, n=None):
+        return sorted(self.counts.items(), key=by_demand)[:n]
+
+    def merge(self, other):
+        """Combine with another summary; items missing from one side are charged its floor"""
+        own_floor, other_floor = self.floor(), other.floor()
+        counts = {}
+        errors = {}
+        for key in self.counts.keys() | other.counts.keys():
+            counts[key] = self.counts.get(key, own_floor) + other.counts.get(key, other_floor)
+            errors[key] = self.errors.get(key, own_floor) + other.errors.get(key, other_floor)
+        kept = [key for key, _ in sorted(counts.items(), key=by_demand)[:self.capacity]]
+        self.counts = {key: counts[key] for key in kept}
+        self.errors = {key: errors[key] for key in kept}
+        self.heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self.heap)
+        self.total += other.total
+
+class SketchAggregator:
+    """Fixed-memory stand-in for SkillAggregator on corpora too large to count exactly: Count-Min estimates of skill
+    demand, Space-Saving heavy hitters for which skills to report and HyperLogLog counts of distinct postings and companies"""
+
+    def __init__(self, settings=None):
+        settings = {**DEFAULT_CONFIG['sketch'], **(settings or {})}
+        self.settings = settings
+        self.total_jobs = 0
+        self.skill_sketch = CountMinSketch(settings['epsilon'], settings['delta'])
+        self.group_sketch = CountMinSketch(settings['epsilon'], settings['delta'])
+        self.top_skills = SpaceSaving(settings['heavy_hitters'])
+        self.group_jobs = {'role': SpaceSaving(settings['group_capacity']),
+                           'location': SpaceSaving(settings['group_capacity'])}
+        self.group_top = {'role': {}, 'location': {}}
+        self.postings = HyperLogLog(settings['distinct_error'])
+        self.companies = HyperLogLog(settings['distinct_error'])
+        # Postings counted exactly before switching to sketches, see from_exact
+        self.exact_postings = 0
+        self.canonical = {}
+
+    @classmethod
+    def from_exact(cls, exact, settings=None):
+        """Sketch the counts of a SkillAggregator, to continue a stream that outgrew exact counting
+
+        Its job IDs were never kept, so those postings count as distinct: streams are deduplicated upstream.
+        """
+        sketch = cls(settings)
+        sketch.total_jobs = sketch.exact_postings = exact.total_jobs
+        sketch.canonical = {skill: (name, sketch_hash(name)) for skill, name in exact.canonical.items()}
+        # Largest counts first, so Space-Saving only evicts the small ones
+        for skill, count in sorted(exact.skill_counts.items(), key=by_demand):
+            sketch.skill_sketch.add(sketch_hash(skill), count)
+            sketch.top_skills.add(skill, count)
+        for company in exact.companies:
+            sketch.companies.add(sketch_hash(company))
+        for group, jobs in exact.group_jobs.items():
+            for value, count in sorted(jobs.items(), key=by_demand):
+                evicted = sketch.group_jobs[group].add(value, count)
+                if evicted is not None:
+                    sketch.group_top[group].pop(evicted, None)
+                top = sketch.group_top[group].setdefault(value, SpaceSaving(sketch.settings['group_heavy_hitters']))
+                group_hashes = sketch_hash(f"{group}\0{value}")
+                for skill, skill_count in sorted(exact.group_skills[group][value].items(), key=by_demand):
+                    sketch.group_sketch.add(combine_hashes(group_hashes, sketch_hash(skill)), skill_count)
+                    top.add(skill, skill_count)
+        return sketch
+
+    def distinct_postings(self):
+        return self.postings.count() + self.exact_postings
+
+    def add(self, job):
+        """Count one posting"""
+        skills = {}
+        for skill in job['skills']:
+            if skill not in self.canonical:
+                name = canonical_skill(skill)
+                self.canonical[skill] = (name, sketch_hash(name))
+            name, hashes = self.canonical[skill]
+            skills[name] = hashes
+
+        self.total_jobs += 1
+        self.postings.add(sketch_hash(job['job_id']))
+        if job.get('company'):
+            self.companies.add(sketch_hash(job['company']))
+        self.skill_sketch.update(list(skills.values()))
+        self.top_skills.update(skills)
+        for group, value in (('role', job.get('role', 'Unknown')), ('location', job['location'])):
+            evicted = self.group_jobs[group].add(value)
+            if evicted is not None:
+                self.group_top[group].pop(evicted, None)
+            top = self.group_top[group].setdefault(value, SpaceSaving(self.settings['group_heavy_hitters']))
+            group_hashes = sketch_hash(f"{group}\0{value}")
+            self.group_sketch.update([combine_hashes(group_hashes, hashes) for hashes in skills.values()])
+            top.update(skills)
+
+    @property
+    def skills(self):
+        return [skill for skill, _ in self.top_skills.top()]
+
+    def estimate(self, skill):
+        # Both estimates only ever overshoot, so the smaller one is closer
+        return min(self.skill_sketch.estimate(sketch_hash(skill)), self.top_skills.counts.get(skill, self.total_jobs),
+                   self.total_jobs)
+
+    def demand(self):
+        """Estimated percentage of postings requiring each heavy-hitter skill"""
+        import numpy as np
+        counts = np.array([self.estimate(skill) for skill in self.skills], dtype=float)
+        return counts / self.total_jobs * 100 if self.total_jobs else counts
+
+    def group_demand(self, group, top_n=5):
+        result = {}
+        for value in sorted(self.group_top[group]):
+            jobs = self.group_jobs[group].counts[value]
+            group_hashes = sketch_hash(f"{group}\0{value}")
+            estimates = {
+                skill: min(self.group_sketch.estimate(combine_hashes(group_hashes, sketch_hash(skill))), count, jobs)
+                for skill, count in self.group_top[group][value].counts.items()
+            }
+            top = sorted(estimates.items(), key=by_demand)[:top_n]
+            result[value] = {skill: count / jobs * 100 for skill, count in top}
+        return result
+
+    def role_breakdown(self):
+        return self.group_demand('role')
+
+    def location_breakdown(self):
+        return self.group_demand('location')
+
+    def merge(self, other):
+        """Fold in the sketches of another aggregator built with the same settings, e.g. from another shard"""
+        self.total_jobs += other.total_jobs
+        self.skill_sketch.merge(other.skill_sketch)
+        self.group_sketch.merge(other.group_sketch)
+        self.top_skills.merge(other.top_skills)
+        self.postings.merge(other.postings)
+        self.companies.merge(other.companies)
+        self.exact_postings += other.exact_postings
+        for group in self.group_jobs:
+            self.group_jobs[group].merge(other.group_jobs[group])
+            for value, top in other.group_top[group].items():
+                if value in self.group_top[group]:
+                    self.group_top[group][value].merge(top)
+                else:
+                    self.group_top[group][value] = top
+            self.group_top[group] = {value: top for value, top in self.group_top[group].items()
+                                     if value in self.group_jobs[group].counts}
+        return self
+
+    def demand_error_bound(self):
+        """Largest overshoot of any demand estimate, in percentage points, with probability 1 - delta"""
+        return self.skill_sketch.error_bound() / self.total_jobs * 100 if self.total_jobs else 0
+
+    @property
+    def nbytes(self):
+        return self.skill_sketch.nbytes + self.group_sketch.nbytes + self.postings.nbytes + self.companies.nbytes
+
+    def summary(self):
+        counters = len(self.top_skills.counts) + sum(
+            len(top.counts) for tops in self.group_top.values() for top in tops.values())
+        return (f"Sketch aggregation: {self.total_jobs} postings (~{self.distinct_postings()} distinct, "
+                f"~{self.companies.count()} companies) in {self.nbytes / 1024:.0f} KB of sketches and "
+                f"{counters} heavy-hitter counters; demand estimates at most "
+                f"{self.demand_error_bound():.2f} pts high with {1 - self.settings['delta']:.0%} confidence")
+
+class NearDuplicateIndex:
+    """MinHash LSH index: signatures sharing a band are candidates, confirmed by estimated Jaccard similarity
+
+    Each indexed posting costs its 4-byte-per-permutation signature row plus one 64-bit band hash per band
+    in a per-band dict, about 2 KB with the default 128 permutations and 16 bands. The index grows with
+    the postings kept; past max_size postings the oldest are evicted, so a repost is only caught while
+    its original is among the last max_size postings.
+    """
+
+    def __init__(self, threshold=0.8, bands=16, max_size=None):
+        import numpy as np
+        if MINHASH_PERMUTATIONS % bands:
+            raise ValueError(f"bands must divide the {MINHASH_PERMUTATIONS} MinHash permutations")
+        self.threshold = threshold
+        self.bands = bands
+        self.max_size = max_size
+        # Odd multipliers folding each band's rows into one 64-bit hash; collisions only add candidates
+        self.band_mix = np.random.default_rng(0).integers(
+            1, 2**63, size=MINHASH_PERMUTATIONS // bands, dtype=np.uint64) | np.uint64(1)
+        # band hash -> row, or a list of rows when postings share the band
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = np.empty((min(max_size or 1024, 1024), MINHASH_PERMUTATIONS), dtype=np.uint32)
+        self.keys = []
+        self.size = 0
+
+    def band_hashes(self, values):
+        import numpy as np
+        with np.errstate(over='ignore'):
+            return (values.reshape(self.bands, -1).astype(np.uint64) * self.band_mix).sum(axis=1).tolist()
+
+    def query(self, signature):
+        """Return the key of an indexed near-duplicate of signature, or None"""
+        import numpy as np
+        values = np.frombuffer(signature, dtype=np.uint32)
+        rows = []
+        for bucket, band_hash in zip(self.buckets, self.band_hashes(values)):
+            found = bucket.get(band_hash)
+            if found is not None:
+                rows.extend(found) if isinstance(found, list) else rows.append(found)
+        if not rows:
+            return None
+        rows = list(dict.fromkeys(rows))
+        similarity = (self.signatures[rows] == values).mean(axis=1)
+        matches = np.flatnonzero(similarity >= self.threshold)
+        return self.keys[rows[matches[0]]] if len(matches) else None
+
+    def add(self, key, signature):
+        import numpy as np
+        values = np.frombuffer(signature, dtype=np.uint32)
+        if self.max_size and self.size >= self.max_size:
+            row = self.size % self.max_size
+            self.remove(row)
+            self.keys[row] = key
+        else:
+            row = self.size
+            if row == len(self.signatures):
+                grown = len(self.signatures) * 2
+                self.signatures = np.resize(self.signatures, (min(grown, self.max_size or grown), MINHASH_PERMUTATIONS))
+            self.keys.append(key)
+        self.signatures[row] = values
+        self.size += 1
+        for bucket, band_hash in zip(self.buckets, self.band_hashes(values)):
+            found = bucket.get(band_hash)
+            if found is None:
+                bucket[band_hash] = row
+            elif isinstance(found, list):
+                found.append(row)
+            else:
+                bucket[band_hash] = [found, row]
+
+    def remove(self, row):
+        """Drop the band entries of the posting stored in row, before the row is reused"""
+        for bucket, band_hash in zip(self.buckets, self.band_hashes(self.signatures[row])):
+            found = bucket.get(band_hash)
+            if isinstance(found, list):
+                found.remove(row)
+                if len(found) == 1:
+                    bucket[band_hash] = found[0]
+            elif found == row:
+                del bucket[band_hash]
+
+    def __len__(self):
+        return min(self.size, self.max_size or self.size)
+
+class PostingDeduplicator:
+    """Drop repeated postings from a stream: the same job ID again, or a repost with a near-identical description"""
+
+    def __init__(self, settings=None):
+        settings = {**DEFAULT_CONFIG['dedup'], **(settings or {})}
+        self.index = NearDuplicateIndex(
+            settings['threshold'], settings['bands'], settings['max_index_size']
+        ) if settings['near_duplicates'] else None
+        self.job_ids = set()
+        self.exact = 0
+        self.near = 0
+        # Skill counts with and without the dropped copies, to show what deduplication changed
+        self.kept = Counter()
+        self.dropped = Counter()
+        self.canonical = {}
+
+    def count(self, counter, job):
+        for skill in job['skills']:
+            if skill not in self.canonical:
+                self.canonical[skill] = canonical_skill(skill)
+        counter.update({self.canonical[skill] for skill in job['skills']})
+
+    def filter(self, jobs):
+        """Yield the first copy of every posting"""
+        for job in jobs:
+            signature = job.pop('signature', b'')
+            if job['job_id'] in self.job_ids:
+                self.exact += 1
+                self.count(self.dropped, job)
+                continue
+            if self.index is not None and len(signature) == MINHASH_PERMUTATIONS * 4:
+                if self.index.query(signature) is not None:
+                    self.near += 1
+                    self.count(self.dropped, job)
+                    continue
+                self.index.add(job['job_id'], signature)
+            self.job_ids.add(job['job_id'])
+            self.count(self.kept, job)
+            yield job
+
+    def demand_shift(self):
+        """(demand with duplicates, demand without) per skill, largest change first"""
+        total = len(self.job_ids) + self.exact + self.near
+        if not len(self.job_ids) or total == len(self.job_ids):
+            return {}
+        shift = {
+            skill: ((self.kept[skill] + self.dropped[skill]) / total * 100, self.kept[skill] / len(self.job_ids) * 100)
+            for skill in self.kept | self.dropped
+        }
+        return dict(sorted(shift.items(), key=lambda item: abs(item[1][1] - item[1][0]), reverse=True))
+
+    def summary(self):
+        line = (f"Deduplication: {self.exact} repeated job IDs and {self.near} near-duplicate reposts dropped, "
+                f"{len(self.job_ids)} postings kept")
+        shift = self.demand_shift()
+        if shift:
+            skill, (before, after) = next(iter(shift.items()))
+            line += f"; largest demand change {skill} {before:.1f}% -> {after:.1f}%"
+        return line
+
+def market_aggregator(config):
+    """Exact streaming counters, or fixed-memory sketches when sketch.enabled is set and min_counters is 0"""
+    settings = get_settings(config, 'sketch')
+    return SketchAggregator(settings) if settings['enabled'] and not settings['min_counters'] else SkillAggregator()
+
+def sketch_if_large(market, config):
+    """Swap exact counters for sketches once they hold more than sketch.min_counters keys, if sketch.enabled
+
+    Sketches build several times slower than exact counters and only use less memory on high-cardinality
+    corpora, so small and medium runs stay exact.
+    """
+    settings = get_settings(config, 'sketch')
+    if (settings['enabled'] and isinstance(market, SkillAggregator) and market.total_jobs % 1024 == 0
+            and market.counters() > settings['min_counters']):
+        print(f"  Switching to sketch aggregation after {market.total_jobs} postings "
+              f"({market.counters()} exact counters)")
+        return SketchAggregator.from_exact(market, settings)
+    return market
+
+def sketch_summary(market, metrics):
+    if isinstance(market, SketchAggregator):
+        print(market.summary())
+        metrics.counters.update(distinct_postings_est=market.distinct_postings(),
+                                distinct_companies_est=market.companies.count(), sketch_bytes=market.nbytes)
 
 def analyze_skill_gap(user_skills, job_market_data):
     """Analyze gap between user skills and market demands"""
-    # Aggregate required skills from job market
-    all_required_skills = []
-    for job in job_market_data:
-        all_required_skills.extend(job['skills'])
-    
-    skill_frequency = Counter(all_required_skills)
-    total_jobs = len(job_market_data)
+    return analyze_skill_gaps_batch([user_skills], job_market_data)[0]
+
+def analyze_skill_gaps_batch(profiles, job_market_data, breakdowns=True):
+    """Analyze the skill gaps of many users against one market with a single matrix product
+
+    Without breakdowns the per-role and per-location demand, which costs the most on large markets, is left empty.
+    """
+    import numpy as np
+    # Aggregate required skills from job market into a job × skill matrix,
+    # unless it already arrives as a matrix or as streaming counters
+    if isinstance(job_market_data, (SkillMatrix, SkillAggregator, SketchAggregator)):
+        market = job_market_data
+    else:
+        market = SkillMatrix.from_jobs(job_market_data)
     
     # Calculate skill demand percentage
-    skill_demand = {skill: (count/total_jobs)*100 for skill, count in skill_frequency.items()}
-    
-    # Identify missing skills
-    user_skills_lower = [skill.lower() for skill in user_skills]
-    missing_skills = {}
+    demand = market.demand()
+    order = demand_order(market.skills, demand)
+    skill_demand = {market.skills[j]: float(demand[j]) for j in order}
     
-    for skill, demand in skill_demand.items():
-        if skill.lower() not in user_skills_lower:
-            missing_skills[skill] = demand
+    # Profile × skill ownership matrix
+    column = {skill.lower(): j for j, skill in enumerate(market.skills)}
+    owned = np.zeros((len(profiles), len(market.skills)), dtype=bool)
+    for p, user_skills in enumerate(profiles):
+        for skill in user_skills:
+            j = column.get(canonical_skill(skill).lower())
+            if j is not None:
+                owned[p, j] = True
     
-    # Sort by demand
-    missing_skills = dict(sorted(missing_skills.items(), key=lambda item: item[1], reverse=True))
+    # Calculate every profile's skill gap score at once
+    missing = ~owned
+    missing_counts = missing.sum(axis=1)
+    # Summed in demand order so the float result does not depend on column order
+    gap_scores = (missing[:, order] @ demand[order]) / np.maximum(missing_counts, 1)
     
-    # Get top 10 missing skills
-    top_missing = dict(list(missing_skills.items())[:10])
+    role_breakdown = market.role_breakdown() if breakdowns else {}
+    location_breakdown = market.location_breakdown() if breakdowns else {}
+    results = []
+    for p in range(len(profiles)):
+        # Identify missing skills, sorted by demand
+        missing_skills = {market.skills[j]: float(demand[j]) for j in order[missing[p, order]]}
+        
+        results.append({
+            'skill_demand': skill_demand,
+            'missing_skills': missing_skills,
+            'top_missing_skills': dict(list(missing_skills.items())[:10]),
+            'gap_score': float(gap_scores[p]) if missing_counts[p] else 0,
+            'total_jobs_analyzed': market.total_jobs,
+            'role_breakdown': role_breakdown,
+            'location_breakdown': location_breakdown
+        })
     
-    # Calculate skill gap score
-    gap_score = sum(missing_skills.values()) / len(missing_skills) if missing_skills else 0
+    return results
+
+def to_bitset(positions, size):
+    """Python int with the given bit positions set"""
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, 'little')
+
+class DemandIndex:
+    """Per-skill, per-role and per-location bitsets over a deduplicated corpus, so gap analyses (optionally
+    restricted to one role or location) are answered from precomputed demand without touching the postings"""
+
+    def __init__(self, jobs, max_views=256):
+        skill_positions = defaultdict(list)
+        size_positions = defaultdict(list)
+        group_positions = {'role': defaultdict(list), 'location': defaultdict(list)}
+        canonical = {}
+        total = 0
+        for total, job in enumerate(jobs, 1):
+            for skill in job['skills']:
+                if skill not in canonical:
+                    canonical[skill] = canonical_skill(skill)
+            skills = {canonical[skill] for skill in job['skills']}
+            for skill in skills:
+                skill_positions[skill].append(total - 1)
+            size_positions[len(skills)].append(total - 1)
+            group_positions['role'][job.get('role', 'Unknown')].append(total - 1)
+            group_positions['location'][job['location']].append(total - 1)
+
+        self.total_jobs = total
+        self.all_bits = (1 << total) - 1
+        # Skills in first-seen order, like SkillMatrix columns
+        self.skills = list(skill_positions)
+        self.bits = [to_bitset(skill_positions[skill], total) for skill in self.skills]
+        # Postings by number of distinct skills required, for the learning planner
+        self.size_bits = {size: to_bitset(positions, total) for size, positions in size_positions.items() if size}
+        self.group_bits = {
+            group: {value: to_bitset(positions, total) for value, positions in sorted(values.items())}
+            for group, values in group_positions.items()
+        }
+        self.loaded = time.time()
+        self.max_views = max_views
+        self.views = {}
+        self.recommendations = {}
+
+    def group_demand(self, group, universe, top_n=5):
+        result = {}
+        for value, group_bits in self.group_bits[group].items():
+            members = group_bits & universe
+            size = members.bit_count()
+            if not size:
+                continue
+            counts = [(bits & members).bit_count() for bits in self.bits]
+            top = sorted((j for j, count in enumerate(counts) if count), key=lambda j: (-counts[j], self.skills[j]))[:top_n]
+            result[value] = {self.skills[j]: counts[j] / size * 100 for j in top}
+        return result
+
+    def view(self, role=None, location=None):
+        """Demand, ordering and breakdowns of the postings matching the filters, computed once per filter"""
+        key = (role, location)
+        if key not in self.views:
+            universe = self.all_bits
+            if role is not None:
+                universe &= self.group_bits['role'].get(role, 0)
+            if location is not None:
+                universe &= self.group_bits['location'].get(location, 0)
+            size = universe.bit_count()
+            counts = [(bits & universe).bit_count() for bits in self.bits]
+            demand = dict(sorted(((self.skills[j], count / size * 100) for j, count in enumerate(counts) if count),
+                                 key=by_demand))
+            if len(self.views) >= self.max_views:
+                del self.views[next(iter(self.views))]
+            view = self.views[key] = {
+                'universe': universe,
+                'total_jobs': size,
+                'skill_demand': demand,
+                'by_demand': list(demand.items()),
+                'column': {skill.lower(): skill for skill in demand},
+                'role_breakdown': self.group_demand('role', universe),
+                'location_breakdown': self.group_demand('location', universe)
+            }
+            # The parts of a response that do not depend on the profile are serialized once
+            view['json'] = {
+                'skill_demand': json.dumps(demand),
+                'total_jobs_analyzed': json.dumps(size),
+                'role_breakdown': json.dumps(view['role_breakdown']),
+                'location_breakdown': json.dumps(view['location_breakdown'])
+            }
+        return self.views[key]
+
+    def analyze(self, user_skills, role=None, location=None):
+        """analyze_skill_gap for one profile against the indexed corpus"""
+        view = self.view(role, location)
+        owned = {view['column'].get(canonical_skill(skill).lower()) for skill in user_skills}
+        missing_skills = {skill: demand for skill, demand in view['by_demand'] if skill not in owned}
+        return {
+            'skill_demand': view['skill_demand'],
+            'missing_skills': missing_skills,
+            'top_missing_skills': dict(list(missing_skills.items())[:10]),
+            'gap_score': sum(missing_skills.values()) / len(missing_skills) if missing_skills else 0,
+            'total_jobs_analyzed': view['total_jobs'],
+            'role_breakdown': view['role_breakdown'],
+            'location_breakdown': view['location_breakdown']
+        }
+
+    def learning_plan(self, user_skills, steps=10, threshold=0.5, lookahead=3, role=None, location=None):
+        """Greedy learning path: each step picks the missing skill that makes the most new postings a match,
+        where a posting matches once the profile covers at least threshold of its skills.
+
+        Postings are kept as bitsets by how many more skills they need, so a skill's gain is a popcount of
+        its bitset against each level. Ties go to the skill bringing the most postings within 2, 3, ... skills
+        of a match, then to plain demand.
+        """
+        import math
+        if lookahead < 1:
+            raise ValueError("lookahead must be at least 1: the first level is the new matches themselves")
+        view = self.view(role, location)
+        universe = view['universe']
+        levels = [0] * (max(self.size_bits, default=0) + 2)
+        for size, bits in self.size_bits.items():
+            # The epsilon keeps e.g. 0.3 × 10 from rounding up to 4 skills
+            levels[math.ceil(threshold * size - 1e-9)] |= bits & universe
+
+        def learn(levels, bits):
+            """Move every posting requiring the learned skill one level closer to a match"""
+            return ([levels[0] | (levels[1] & bits)] +
+                    [(levels[k] & ~bits) | (levels[k + 1] & bits) for k in range(1, len(levels) - 1)] +
+                    [levels[-1] & ~bits])
+
+        column = {skill.lower(): j for j, skill in enumerate(self.skills)}
+        owned = {column.get(canonical_skill(skill).lower()) for skill in user_skills}
+        for j in owned - {None}:
+            levels = learn(levels, self.bits[j])
+        qualified_before = levels[0].bit_count()
+
+        candidates = [j for j in range(len(self.skills)) if j not in owned and self.bits[j] & universe]
+        plan = []
+        for _ in range(min(steps, len(candidates))):
+            # Deeper levels are only counted for the skills still tied
+            tied = candidates
+            for k in range(1, min(lookahead, len(levels) - 1) + 1):
+                gains = {j: (levels[k] & self.bits[j]).bit_count() for j in tied}
+                top = max(gains.values())
+                tied = [j for j in tied if gains[j] == top]
+                if len(tied) == 1:
+                    break
+            best = min(tied, key=lambda j: (-view['skill_demand'].get(self.skills[j], 0), self.skills[j]))
+            candidates.remove(best)
+            new_jobs = (levels[1] & self.bits[best]).bit_count()
+            levels = learn(levels, self.bits[best])
+            qualified = levels[0].bit_count()
+            plan.append({
+                'skill': self.skills[best],
+                'demand': view['skill_demand'].get(self.skills[best], 0),
+                'new_jobs': new_jobs,
+                'qualified_jobs': qualified,
+                'coverage': qualified / view['total_jobs'] * 100 if view['total_jobs'] else 0
+            })
+        return {'threshold': threshold, 'total_jobs': view['total_jobs'], 'qualified_before': qualified_before,
+                'steps': plan}
+
+    def recommendation_json(self, skill, demand, platforms):
+        key = (skill, demand)
+        if key not in self.recommendations:
+            if len(self.recommendations) >= self.max_views * 10:
+                self.recommendations.clear()
+            self.recommendations[key] = json.dumps(generate_learning_recommendations({skill: demand}, platforms)[0])
+        return self.recommendations[key]
+
+    def response_json(self, user_skills, platforms, role=None, location=None, planner=None):
+        """JSON of the gap analysis and learning recommendations, assembled from pre-serialized parts"""
+        gap_analysis = self.analyze(user_skills, role, location)
+        recommended = gap_analysis['top_missing_skills']
+        plan = None
+        if planner and planner['order'] == 'coverage':
+            plan = self.learning_plan(user_skills, planner['steps'], planner['match_threshold'], planner['lookahead'],
+                                      role, location)
+            recommended = {step['skill']: step['demand'] for step in plan['steps']}
+        parts = {
+            **self.view(role, location)['json'],
+            'missing_skills': json.dumps(gap_analysis['missing_skills']),
+            'top_missing_skills': json.dumps(gap_analysis['top_missing_skills']),
+            'gap_score': json.dumps(gap_analysis['gap_score'])
+        }
+        recommendations = [self.recommendation_json(skill, demand, platforms) for skill, demand in recommended.items()]
+        return (
+            '{"gap_analysis": {' + ', '.join(f'"{key}": {parts[key]}' for key in gap_analysis) + '}, '
+            '"recommendations": [' + ', '.join(recommendations) + '], '
+            + (f'"learning_plan": {json.dumps(plan)}, ' if plan else '') +
+            '"index": ' + json.dumps(self.info()) + '}'
+        )
+
+    def info(self):
+        return {'postings': self.total_jobs, 'skills': len(self.skills),
+                'loaded': datetime.fromtimestamp(self.loaded).isoformat(timespec='seconds')}
+
+class SkillHistory:
+    """Weekly snapshots of skill demand, missing skills and gap score, stored column-wise in a NumPy archive
+
+    Rows are weeks and columns are skills, so trends over years of runs are a few array operations.
+    """
+
+    def __init__(self, path):
+        import numpy as np
+        self.path = path
+        self.timestamps = np.zeros(0)
+        self.skills = []
+        self.demand = np.zeros((0, 0), dtype=np.float32)
+        self.missing = np.zeros((0, 0), dtype=bool)
+        self.gap_scores = np.zeros(0)
+        self.total_jobs = np.zeros(0, dtype=np.int64)
+
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as archive:
+                if int(archive['format']) != HISTORY_FORMAT:
+                    raise ValueError(f"{path} has history format {int(archive['format'])}, expected {HISTORY_FORMAT}")
+                self.timestamps = archive['timestamps']
+                self.skills = archive['skills'].tolist()
+                self.demand = archive['demand']
+                self.missing = archive['missing']
+                self.gap_scores = archive['gap_scores']
+                self.total_jobs = archive['total_jobs']
+        self.column = {skill: j for j, skill in enumerate(self.skills)}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, gap_analysis, timestamp=None):
+        """Add one run's results; a later run in the same ISO week replaces that week's snapshot"""
+        import numpy as np
+        timestamp = time.time() if timestamp is None else timestamp
+
+        new_skills = [skill for skill in gap_analysis['skill_demand'] if skill not in self.column]
+        for skill in new_skills:
+            self.column[skill] = len(self.skills)
+            self.skills.append(skill)
+        if new_skills:
+            self.demand = np.pad(self.demand, ((0, 0), (0, len(new_skills))))
+            self.missing = np.pad(self.missing, ((0, 0), (0, len(new_skills))))
+
+        demand = np.zeros(len(self.skills), dtype=np.float32)
+        missing = np.zeros(len(self.skills), dtype=bool)
+        for skill, value in gap_analysis['skill_demand'].items():
+            demand[self.column[skill]] = value
+        for skill in gap_analysis['missing_skills']:
+            missing[self.column[skill]] = True
+
+        if len(self) and self.week_of(self.timestamps[-1]) == self.week_of(timestamp):
+            self.timestamps, self.demand, self.missing = self.timestamps[:-1], self.demand[:-1], self.missing[:-1]
+            self.gap_scores, self.total_jobs = self.gap_scores[:-1], self.total_jobs[:-1]
+        self.timestamps = np.append(self.timestamps, timestamp)
+        self.demand = np.vstack([self.demand, demand])
+        self.missing = np.vstack([self.missing, missing])
+        self.gap_scores = np.append(self.gap_scores, gap_analysis['gap_score'])
+        self.total_jobs = np.append(self.total_jobs, gap_analysis['total_jobs_analyzed'])
+
+    def save(self):
+        import numpy as np
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f, format=HISTORY_FORMAT, timestamps=self.timestamps, skills=np.array(self.skills, dtype=str),
+                demand=self.demand, missing=self.missing, gap_scores=self.gap_scores, total_jobs=self.total_jobs
+            )
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def week_of(timestamp):
+        year, week, _ = datetime.fromtimestamp(timestamp, timezone.utc).isocalendar()
+        return f"{year}-W{week:02d}"
+
+    def weeks(self):
+        return [self.week_of(timestamp) for timestamp in self.timestamps]
+
+    def series(self, skill):
+        """Weekly demand percentages for one skill"""
+        import numpy as np
+        j = self.column.get(skill)
+        return self.demand[:, j] if j is not None else np.zeros(len(self))
+
+    def moving_average(self, window=4, last=None):
+        """Trailing moving average of every skill's demand over up to window weeks, for the last snapshots"""
+        import numpy as np
+        last = len(self) if last is None else min(last, len(self))
+        # Only the rows that feed the requested snapshots are summed
+        offset = max(len(self) - last - window + 1, 0)
+        sums = np.cumsum(np.vstack([np.zeros((1, len(self.skills))), self.demand[offset:].astype(float)]), axis=0)
+        ends = np.arange(len(self) - last, len(self)) - offset + 1
+        starts = np.maximum(ends - window, 0)
+        return (sums[ends] - sums[starts]) / (ends - starts)[:, None]
+
+    def changes(self, weeks=1, window=1):
+        """Change in (smoothed) demand per skill over the last weeks snapshots"""
+        import numpy as np
+        if len(self) < 2:
+            return np.zeros(len(self.skills))
+        weeks = min(weeks, len(self) - 1)
+        smoothed = self.moving_average(window, weeks + 1)
+        return smoothed[-1] - smoothed[0]
+
+    def week_over_week(self):
+        """Demand change of every skill since the previous snapshot"""
+        return {skill: float(change) for skill, change in zip(self.skills, self.changes())}
+
+    def rising(self, n=5, weeks=4, window=1):
+        """Skills whose demand grew the most over the last weeks snapshots"""
+        changes = self.changes(weeks, window)
+        return [(self.skills[j], float(changes[j])) for j in demand_order(self.skills, changes)[:n] if changes[j] > 0]
+
+    def falling(self, n=5, weeks=4, window=1):
+        """Skills whose demand dropped the most over the last weeks snapshots"""
+        changes = self.changes(weeks, window)
+        return [(self.skills[j], float(changes[j])) for j in demand_order(self.skills, -changes)[:n] if changes[j] < 0]
+
+    def trend_series(self, weeks=26, top_n=6, window=4):
+        """Moving-average demand of the currently most demanded skills over the last weeks snapshots"""
+        if not len(self):
+            return [], {}
+        smoothed = self.moving_average(window, weeks)
+        top = demand_order(self.skills, smoothed[-1])[:top_n]
+        return self.weeks()[-weeks:], {self.skills[j]: smoothed[:, j].tolist() for j in top}
+
+def history_path(settings, name=None):
+    """History file for the main profile, or one per named profile in batch mode"""
+    if name is None:
+        return settings['path']
+    root, ext = os.path.splitext(settings['path'])
+    return root + '_' + re.sub(r'[^\w.-]+', '_', name) + ext
+
+def record_history(config, gap_analysis, name=None):
+    """Append this run to the skill history and return it, or None when history is disabled
+
+    With history.record off the history is only read, so the report still shows the trend.
+    """
+    settings = get_settings(config, 'history')
+    if not settings['enabled']:
+        return None
+    history = SkillHistory(history_path(settings, name))
+    if not settings['record']:
+        print("Not recording an offline run in the skill history")
+        return history
+    history.append(gap_analysis)
+    history.save()
+    return history
+
+def load_profiles(path):
+    """Load user skill profiles from a directory of JSON configs or a JSONL file"""
+    if os.path.isdir(path):
+        profiles = []
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith('.json'):
+                with open(os.path.join(path, filename), 'r') as f:
+                    profile = json.load(f)
+                profile.setdefault('name', os.path.splitext(filename)[0])
+                profiles.append(profile)
+    else:
+        with open(path, 'r') as f:
+            profiles = [json.loads(line) for line in f if line.strip()]
+        for n, profile in enumerate(profiles, 1):
+            profile.setdefault('name', f"profile-{n}")
     
-    return {
-        'skill_demand': skill_demand,
-        'missing_skills': missing_skills,
-        'top_missing_skills': top_missing,
-        'gap_score': gap_score,
-        'total_jobs_analyzed': total_jobs
-    }
+    for profile in profiles:
+        if 'user_skills' not in profile:
+            raise ValueError(f"Profile {profile['name']} has no user_skills")
+    return profiles
 
 def get_free_learning_resources(skill, platforms):
     """Search free learning platforms for resources"""
@@ -247,46 +3020,145 @@ def generate_learning_recommendations(missing_skills, platforms):
     
     return recommendations
 
-def generate_report(config, gap_analysis, recommendations):
-    """Generate visual report of skill gap analysis"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_dir = f"{REPORTS_DIR}/{timestamp}"
-    os.makedirs(report_dir, exist_ok=True)
+def chart_specs(gap_analysis, history=None, history_settings=None):
+    """Describe the report charts as plain data, which also serves as their cache key"""
+    skill_demand = gap_analysis['skill_demand']
+    top_skills = dict(sorted(skill_demand.items(), key=by_demand)[:15])
+    specs = {
+        'top_skills': {
+            'kind': 'barh', 'figsize': [12, 8], 'color': '#2c3e50', 'title': 'Top 15 In-Demand Skills',
+            'labels': list(top_skills), 'values': [round(value, 6) for value in top_skills.values()]
+        }
+    }
     
-    # Generate visualizations
-    plt.style.use('ggplot')
-    plt.rcParams.update({'font.size': 12})
+    if gap_analysis['missing_skills']:
+        top_missing = dict(sorted(gap_analysis['top_missing_skills'].items(), key=by_demand))
+        specs['missing_skills'] = {
+            'kind': 'barh', 'figsize': [12, 6], 'color': '#e74c3c', 'title': 'Your Top Missing Skills',
+            'labels': list(top_missing), 'values': [round(value, 6) for value in top_missing.values()]
+        }
+    else:
+        # Placeholder image if no missing skills
+        specs['missing_skills'] = {'kind': 'message', 'figsize': [6, 1], 'text': "No significant skill gaps found!"}
     
-    # Top demanded skills
-    skill_demand = gap_analysis['skill_demand']
-    top_skills = dict(sorted(skill_demand.items(), key=lambda item: item[1], reverse=True)[:15])
+    if history is not None and len(history) > 1:
+        window = history_settings['moving_average_weeks']
+        weeks, series = history.trend_series(history_settings['trend_weeks'], history_settings['top_n'], window)
+        # A list of pairs rather than a dict, so the legend order is part of the cache key
+        series = [[skill, [round(value, 6) for value in values]] for skill, values in series.items()]
+        series.sort(key=lambda item: (-item[1][-1], item[0]))
+        specs['demand_trend'] = {
+            'kind': 'lines', 'figsize': [12, 6], 'title': f'Skill Demand Trend ({window}-week moving average)',
+            'x': weeks, 'series': series
+        }
     
-    plt.figure(figsize=(12, 8))
-    plt.barh(list(top_skills.keys()), list(top_skills.values()), color='#2c3e50')
-    plt.title('Top 15 In-Demand Skills', fontsize=16)
-    plt.xlabel('Percentage of Jobs Requiring Skill', fontsize=12)
-    plt.tight_layout()
-    plt.savefig(f"{report_dir}/top_skills.png", dpi=100)
-    plt.close()
+    return specs
+
+def render_chart(spec, chart_format, dpi):
+    """Render one chart to PNG or SVG bytes on its own Figure, without pyplot's global state"""
+    from io import BytesIO
+    from matplotlib.figure import Figure
     
-    # Missing skills
-    if gap_analysis['missing_skills']:
-        plt.figure(figsize=(12, 6))
-        plt.barh(list(gap_analysis['top_missing_skills'].keys()), 
-                 list(gap_analysis['top_missing_skills'].values()), color='#e74c3c')
-        plt.title('Your Top Missing Skills', fontsize=16)
-        plt.xlabel('Percentage of Jobs Requiring Skill', fontsize=12)
-        plt.tight_layout()
-        plt.savefig(f"{report_dir}/missing_skills.png", dpi=100)
-        plt.close()
+    figure = Figure(figsize=spec['figsize'])
+    ax = figure.add_subplot()
+    if spec['kind'] == 'barh':
+        ax.barh(spec['labels'], spec['values'], color=spec['color'])
+        ax.set_title(spec['title'], fontsize=16)
+        ax.set_xlabel('Percentage of Jobs Requiring Skill', fontsize=12)
+        figure.tight_layout()
+    elif spec['kind'] == 'lines':
+        for label, values in spec['series']:
+            ax.plot(spec['x'], values, marker='o', markersize=3, label=label)
+        ax.set_title(spec['title'], fontsize=16)
+        ax.set_ylabel('Percentage of Jobs Requiring Skill', fontsize=12)
+        ax.legend(loc='center left', bbox_to_anchor=(1, 0.5), fontsize=10)
+        # Label about a dozen weeks at most
+        step = max(1, len(spec['x']) // 12)
+        ax.set_xticks(range(0, len(spec['x']), step), spec['x'][::step], rotation=45, ha='right')
+        figure.tight_layout()
     else:
-        # Create a placeholder image if no missing skills
-        plt.figure(figsize=(6, 1))
-        plt.text(0.5, 0.5, "No significant skill gaps found!", 
-                 ha='center', va='center', fontsize=16, color='green')
-        plt.axis('off')
-        plt.savefig(f"{report_dir}/missing_skills.png", dpi=100)
-        plt.close()
+        ax.text(0.5, 0.5, spec['text'], ha='center', va='center', fontsize=16, color='green')
+        ax.axis('off')
+    
+    buffer = BytesIO()
+    # Without a date the SVG output is reproducible for the same data
+    figure.savefig(buffer, format=chart_format, dpi=dpi, metadata={'Date': None} if chart_format == 'svg' else None)
+    return buffer.getvalue()
+
+def get_chart(spec, settings):
+    """Return chart bytes from the chart cache, rendering and caching them on a miss"""
+    import matplotlib
+    cache_dir = settings['chart_cache_dir']
+    if not cache_dir:
+        return render_chart(spec, settings['chart_format'], settings['dpi']), False
+    
+    key = hashlib.sha256(json.dumps({
+        'spec': spec, 'format': settings['chart_format'], 'dpi': settings['dpi'],
+        'matplotlib': matplotlib.__version__, 'version': CHART_RENDER_VERSION
+    }, sort_keys=True).encode()).hexdigest()
+    path = os.path.join(cache_dir, f"{key}.{settings['chart_format']}")
+    
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        now = time.time()
+        os.utime(path, (now, now))
+        return data, True
+    except OSError:
+        pass
+    
+    data = render_chart(spec, settings['chart_format'], settings['dpi'])
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return data, False
+
+def prune_chart_cache(settings):
+    """Delete cached charts no report has used for chart_cache_days"""
+    cache_dir = settings['chart_cache_dir']
+    if not cache_dir or not os.path.isdir(cache_dir):
+        return
+    cutoff = time.time() - settings['chart_cache_days'] * 86400
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+def chart_html(name, data, alt, settings, report_dir):
+    """Embed a chart in the report: inline SVG markup, or a PNG saved next to report.html"""
+    if settings['chart_format'] == 'svg':
+        svg = data.decode('utf-8')
+        # Drop the XML prolog and doctype, which are not allowed inside HTML
+        return svg[svg.index('<svg'):].replace('<svg', f'<svg role="img" aria-label="{alt}"', 1)
+    
+    with open(f"{report_dir}/{name}.png", 'wb') as f:
+        f.write(data)
+    return f'<img src="{name}.png" alt="{alt}">'
+
+def generate_report(config, gap_analysis, recommendations, report_dir=None, history=None):
+    """Generate visual report of skill gap analysis"""
+    from concurrent.futures import ThreadPoolExecutor
+    from matplotlib import rcParams, style
+    settings = get_settings(config, 'report')
+    if settings['chart_format'] not in ('png', 'svg'):
+        raise ValueError(f"Unsupported chart format: {settings['chart_format']}")
+    if report_dir is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_dir = f"{REPORTS_DIR}/{timestamp}"
+    os.makedirs(report_dir, exist_ok=True)
+    
+    # Render the charts in the background while the HTML is assembled; each chart
+    # draws on its own Figure with the non-interactive Agg and SVG canvases
+    style.use('ggplot')
+    rcParams.update({'font.size': 12, 'svg.fonttype': 'none'})
+    history_settings = get_settings(config, 'history')
+    specs = chart_specs(gap_analysis, history, history_settings)
+    chart_pool = ThreadPoolExecutor(max_workers=len(specs))
+    charts = {name: chart_pool.submit(get_chart, spec, settings) for name, spec in specs.items()}
     
     # Generate HTML report
     # Generate user skills pills
@@ -329,6 +3201,72 @@ def generate_report(config, gap_analysis, recommendations):
         </div>
         """
     
+    # Generate per-role demand HTML
+    role_breakdown_html = ""
+    for role, role_demand in gap_analysis.get('role_breakdown', {}).items():
+        role_skills_html = "".join([f'<li>{skill} ({demand:.0f}%)</li>' for skill, demand in role_demand.items()])
+        role_breakdown_html += f"""
+        <div class="chart-card">
+            <h3>{role}</h3>
+            <ul class="project-list">
+                {role_skills_html}
+            </ul>
+        </div>
+        """
+    
+    if role_breakdown_html:
+        role_breakdown_html = f"""
+        <section class="summary">
+            <h2>Top Skills by Role</h2>
+            <div class="skill-grid">
+                {role_breakdown_html}
+            </div>
+        </section>
+        """
+    
+    # Collect the rendered charts
+    try:
+        chart_data = {name: future.result() for name, future in charts.items()}
+    finally:
+        chart_pool.shutdown()
+    reused = sum(cached for _, cached in chart_data.values())
+    print(f"Charts: {len(chart_data) - reused} rendered, {reused} reused from cache")
+    prune_chart_cache(settings)
+    top_skills_chart = chart_html('top_skills', chart_data['top_skills'][0], "Top Skills Chart", settings, report_dir)
+    missing_skills_chart = chart_html('missing_skills', chart_data['missing_skills'][0], "Missing Skills Chart",
+                                      settings, report_dir)
+    
+    # Generate demand trend HTML from the skill history
+    trend_html = ""
+    if 'demand_trend' in chart_data:
+        trend_chart = chart_html('demand_trend', chart_data['demand_trend'][0], "Skill Demand Trend Chart",
+                                 settings, report_dir)
+        weeks = history_settings['moving_average_weeks']
+        movers_html = ""
+        for heading, movers in (("Rising", history.rising(weeks=weeks)), ("Falling", history.falling(weeks=weeks))):
+            movers_items = "".join([f'<li>{skill} ({change:+.1f} pts)</li>' for skill, change in movers]) or "<li>None</li>"
+            movers_html += f"""
+                <h4>{heading}</h4>
+                <ul class="project-list">
+                    {movers_items}
+                </ul>
+            """
+        trend_html = f"""
+        <section class="summary">
+            <h2>Skill Demand Trends</h2>
+            <div class="skill-grid">
+                <div class="chart-card">
+                    <h3>Last {min(len(history), history_settings['trend_weeks'])} Weeks</h3>
+                    {trend_chart}
+                </div>
+                <div class="chart-card">
+                    <h3>Biggest Changes Over {weeks} Weeks</h3>
+                    {movers_html}
+                </div>
+            </div>
+        </section>
+        """
+    
     # Get current date
     current_date = datetime.now().strftime("%B %d, %Y at %H:%M")
     
@@ -437,8 +3375,9 @@ def generate_report(config, gap_analysis, recommendations):
                 box-shadow: 0 2px 15px rgba(0,0,0,0.05);
             }}
             
-            .chart-card img {{
+            .chart-card img, .chart-card svg {{
                 width: 100%;
+                height: auto;
                 border-radius: 8px;
             }}
             
@@ -606,15 +3545,19 @@ def generate_report(config, gap_analysis, recommendations):
             <section class="skill-grid">
                 <div class="chart-card">
                     <h3>Top In-Demand Skills</h3>
-                    <img src="top_skills.png" alt="Top Skills Chart">
+                    {top_skills_chart}
                 </div>
                 
                 <div class="chart-card">
                     <h3>Your Skill Gaps</h3>
-                    <img src="missing_skills.png" alt="Missing Skills Chart">
+                    {missing_skills_chart}
                 </div>
             </section>
             
+            {trend_html}
+            
+            {role_breakdown_html}
+            
             <section class="recommendations">
                 <h2>Personalized Learning Recommendations</h2>
                 <p>Based on your skill gaps, here are resources to help you improve:</p>
@@ -638,39 +3581,718 @@ def generate_report(config, gap_analysis, recommendations):
     
     return report_dir
 
-def main():
+def stream_job_market_data(config, metrics=None, postings=None):
+    """Stream deduplicated postings for the configured roles, or for postings merged from shard partials"""
+    metrics = metrics or RunMetrics()
+    settings = get_settings(config, 'dedup')
+    if get_settings(config, 'sketch')['enabled']:
+        # Sketch mode promises bounded memory, so near-duplicates are only looked for among recent postings
+        settings = {**settings, 'max_index_size': min(settings['max_index_size'], settings['sketch_max_index_size'])}
+    deduplicator = PostingDeduplicator(settings)
+    yield from deduplicator.filter(postings if postings is not None else iter_job_postings(config, metrics))
+    
+    print(f"Listing dedup: {metrics.counters['duplicate_listings']} postings listed under more than one role, "
+          f"{metrics.counters['fetches_avoided']} description fetches avoided")
+    print(deduplicator.summary())
+    shift = deduplicator.demand_shift()
+    metrics.counters.update(exact_duplicates=deduplicator.exact, near_duplicates=deduplicator.near)
+    metrics.counters['max_demand_shift_pts'] = max((abs(after - before) for before, after in shift.values()), default=0)
+
+def iter_job_postings(config, metrics, units=None):
+    """Stream postings for the configured roles (or work units): freshly scraped first, then still active stored ones"""
+    units = units or plan_units(config)
+    cache_settings = get_settings(config, 'cache')
+    cache = ResponseCache(cache_settings) if cache_settings['enabled'] else None
+    extraction_settings = get_settings(config, 'extraction_cache')
+    extractions = ExtractionCache(extraction_settings) if extraction_settings['enabled'] else None
+    store_settings = get_settings(config, 'store')
+    store = JobStore(store_settings, extractions) if store_settings['enabled'] else None
+    journal_settings = get_settings(config, 'journal')
+    journal = ScrapeJournal(journal_settings, scrape_key(config, units)) if journal_settings['enabled'] else None
+    # A resumed scrape started when the interrupted run did
+    run_started = journal.started if journal else time.time()
+    
+    job_roles = list(dict.fromkeys(unit[0] for unit in units))
+    print(f"Scraping job market data for: {', '.join(job_roles)}")
+    yield from iter_linkedin_jobs(
+        config['job_roles'], 
+        config['location'], 
+        config['max_pages'],
+        settings=get_settings(config, 'scraper'),
+        limiter=AdaptiveRateLimiter(get_settings(config, 'rate_limit')),
+        cache=cache,
+        store=store,
+        metrics=metrics,
+        journal=journal,
+        units=units,
+        queue_size=get_settings(config, 'pipeline')['queue_size'],
+        extractions=extractions
+    )
+    if cache:
+        print(cache.summary())
+        metrics.counters.update(cache_hits=cache.hits, cache_misses=cache.misses, cache_bytes_saved=cache.bytes_saved)
+    if store:
+        # Postings still active that were not on the pages visited this run, from the shard that owns each role's first page
+        first_page_roles = list(dict.fromkeys(job_role for job_role, _, first_page, _ in units if first_page == 0))
+        yield from store.iter_recent_jobs(first_page_roles, store_settings['active_days'], seen_before=run_started)
+        print(store.summary())
+        metrics.counters.update(store_new=store.new_count, store_known=store.known_count)
+        store.close()
+        # Tells a running query server that the store holds a freshly scraped corpus
+        marker = get_settings(config, 'serve')['marker']
+        os.makedirs(os.path.dirname(marker) or '.', exist_ok=True)
+        with open(marker, 'w') as f:
+            json.dump({'finished': time.time(), 'store': store_settings['path']}, f)
+    if extractions:
+        print(extractions.summary())
+        metrics.counters.update(extractions.stats())
+        extractions.close()
+
+def parse_shard(value):
+    """Parse an I/N shard spec (I counts from 0)"""
+    match = re.fullmatch(r'(\d+)/(\d+)', value)
+    if not match or not int(match.group(1)) < int(match.group(2)):
+        raise ValueError(f"Shard must be I/N with 0 <= I < N, got {value!r}")
+    return int(match.group(1)), int(match.group(2))
+
+def partial_path(partial_dir, shard):
+    index, count = shard
+    return os.path.join(partial_dir, f"shard-{index}-of-{count}.json.gz")
+
+def run_shard(config, shard, partial_dir, metrics=None):
+    """Scrape one shard of the work units and save its postings as a partial aggregate for merge_partials"""
+    metrics = metrics or RunMetrics()
+    index, count = shard
+    plan = plan_units(config)
+    units = plan[index::count]
+    # Each shard resumes only its own journal
+    journal_path, extension = os.path.splitext(get_settings(config, 'journal')['path'])
+    shard_config = {**config, 'journal': {**get_settings(config, 'journal'),
+                                          'path': f"{journal_path}.shard-{index}-of-{count}{extension}"}}
+    
+    print(f"Shard {index}/{count}: {len(units)} of {len(plan)} work units")
+    skill_ids = {}
+    postings = []
+    signatures = bytearray()
+    with metrics.stage('scrape'):
+        if units:
+            for job in iter_job_postings(shard_config, metrics, units):
+                skills = [skill_ids.setdefault(skill, len(skill_ids)) for skill in job['skills']]
+                signature = job.get('signature', b'')
+                signatures += signature
+                postings.append([job['job_id'], job.get('role', 'Unknown'), job['location'], skills, len(signature)])
+    metrics.counters['postings'] = len(postings)
+    
+    # Postings are kept individually so the merge can drop the same posting scraped by two shards
+    partial = {
+        'format': PARTIAL_FORMAT,
+        'key': scrape_key(config, plan),
+        'shard': [index, count],
+        'units': [list(unit) for unit in units],
+        'created': time.time(),
+        'skills': list(skill_ids),
+        'postings': postings,
+        # MinHash signatures back to back, each posting's postings row giving its length
+        'signatures': base64.b64encode(signatures).decode('ascii'),
+        'metrics': metrics.state()
+    }
+    os.makedirs(partial_dir, exist_ok=True)
+    path = partial_path(partial_dir, shard)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wt') as f:
+        json.dump(partial, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    metrics.write(os.path.join(partial_dir, f"metrics-shard-{index}-of-{count}.json"))
+    print(f"Shard {index}/{count}: {len(postings)} postings saved to {path}")
+    return path
+
+def load_partials(config, partial_dir):
+    """Load every shard partial of the configured scrape, checking that none is missing or stale"""
+    paths = sorted(
+        os.path.join(partial_dir, name) for name in os.listdir(partial_dir)
+        if re.fullmatch(r'shard-\d+-of-\d+\.json\.gz', name)
+    ) if os.path.isdir(partial_dir) else []
+    if not paths:
+        raise FileNotFoundError(f"No shard partials found in {partial_dir}")
+    
+    key = scrape_key(config, plan_units(config))
+    partials = []
+    for path in paths:
+        with gzip.open(path, 'rt') as f:
+            partial = json.load(f)
+        if partial.get('format') != PARTIAL_FORMAT:
+            raise ValueError(f"{path} has partial format {partial.get('format')}, expected {PARTIAL_FORMAT}")
+        if partial['key'] != key:
+            raise ValueError(f"{path} was scraped with different roles, locations or pages than the current config")
+        partials.append(partial)
+    
+    counts = {partial['shard'][1] for partial in partials}
+    if len(counts) > 1:
+        raise ValueError(f"Partials in {partial_dir} come from different shard counts: {sorted(counts)}")
+    count = counts.pop()
+    missing = set(range(count)) - {partial['shard'][0] for partial in partials}
+    if missing:
+        raise ValueError(f"Missing partials for shards {', '.join(f'{index}/{count}' for index in sorted(missing))}")
+    return partials
+
+def iter_partial_postings(partials, metrics=None):
+    """Stream the postings of every shard partial in the shape iter_job_postings yields them"""
+    for partial in partials:
+        if metrics:
+            metrics.merge_state(partial['metrics'])
+        skills = partial['skills']
+        signatures = base64.b64decode(partial['signatures'])
+        offset = 0
+        for job_id, role, location, skill_ids, signature_bytes in partial['postings']:
+            yield {'job_id': job_id, 'role': role, 'location': location,
+                   'skills': [skills[skill_id] for skill_id in skill_ids],
+                   'signature': signatures[offset:offset + signature_bytes]}
+            offset += signature_bytes
+
+def merge_partials(config, partial_dir, metrics=None, dumps=()):
+    """Stream deduplicated postings merged from the shard partials in partial_dir and any job dumps"""
+    metrics = metrics or RunMetrics()
+    partials = load_partials(config, partial_dir)
+    print(f"Merging {len(partials)} shard partials from {partial_dir}: "
+          f"{sum(len(partial['postings']) for partial in partials)} postings before deduplication")
+    postings = itertools.chain(iter_partial_postings(partials, metrics),
+                               iter_market_sources(config, metrics, dumps, scrape=False))
+    yield from stream_job_market_data(config, metrics, postings)
+
+def run_local_shards(count, partial_dir, argv=()):
+    """Scrape every shard in its own local process, as a CI matrix would"""
+    import subprocess
+    os.makedirs(partial_dir, exist_ok=True)
+    for name in os.listdir(partial_dir):
+        if re.fullmatch(r'shard-\d+-of-\d+\.json\.gz', name):
+            os.remove(os.path.join(partial_dir, name))
+    
+    processes = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), '--shard', f"{index}/{count}",
+                          '--partial-dir', partial_dir, *argv])
+        for index in range(count)
+    ]
+    failed = [index for index, process in enumerate(processes) if process.wait() != 0]
+    if failed:
+        raise RuntimeError(f"Shards {', '.join(f'{index}/{count}' for index in failed)} failed")
+
+def dump_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    if extension == '.csv':
+        return 'csv'
+    raise ValueError(f"Cannot ingest {path}: expected a .jsonl or .csv job dump")
+
+def dump_record_end(mapped, start, position, quoted):
+    """End of the line holding position, extended past newlines inside the quoted fields of records from start"""
+    def next_line(position):
+        newline = mapped.find(b'\n', position)
+        return len(mapped) if newline < 0 else newline + 1
+
+    end = next_line(position)
+    if quoted:
+        # A newline inside a quoted CSV field is not a record boundary, so extend until the quotes pair up
+        quotes = mapped[start:end].count(b'"')
+        while quotes % 2 and end < len(mapped):
+            line_end = next_line(end)
+            quotes += mapped[end:line_end].count(b'"')
+            end = line_end
+    return end
+
+def plan_dump_chunks(mapped, start, chunk_size, quoted):
+    """Split the mapped dump into byte ranges of whole records, about chunk_size each"""
+    chunks = []
+    while start < len(mapped):
+        end = dump_record_end(mapped, start, min(start + chunk_size, len(mapped)) - 1, quoted)
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+def dump_record(row, settings, default_role):
+    """Turn one dump row into the posting record the scraper produces, still without skills and signature,
+    returned with its description"""
+    def pick(name):
+        for key in settings['fields'][name]:
+            value = row.get(key)
+            if value not in (None, ''):
+                return str(value)
+        return ''
+
+    description = pick('description')
+    title, company = pick('title'), pick('company')
+    job_id = pick('job_id') or "dump-" + hashlib.sha256(f"{title}\0{company}\0{description}".encode()).hexdigest()[:16]
+    return {
+        'title': title,
+        'company': company,
+        'location': pick('location') or 'Unknown',
+        'date': pick('date'),
+        'skills': None,
+        'url': pick('url'),
+        'job_id': job_id,
+        'role': pick('role') or default_role,
+        'signature': b''
+    }, description
+
+def ingest_dump_chunk(path, start, end, dump_type, header, default_role, settings, extraction_settings=None,
+                      cache_write_bytes=None):
+    """Parse one chunk of a job dump into posting records, returning them with the number of unreadable rows
+    and the extraction cache counters"""
+    import csv
+    import io
+    import mmap
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        text = mapped[start:end].decode('utf-8', errors='replace')
+
+    postings = []
+    bad_rows = 0
+    if dump_type == 'jsonl':
+        # Split on newlines only: JSON strings may hold other Unicode line separators
+        rows = []
+        for line in text.split('\n'):
+            if line.strip():
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    bad_rows += 1
+    else:
+        rows = csv.DictReader(io.StringIO(text, newline=''), fieldnames=header)
+    descriptions = []
+    for row in rows:
+        if isinstance(row, dict):
+            posting, description = dump_record(row, settings, default_role)
+            postings.append(posting)
+            descriptions.append(description)
+        else:
+            bad_rows += 1
+
+    stats = {}
+    if extraction_settings and extraction_settings['enabled']:
+        extractions = ExtractionCache(extraction_settings)
+        try:
+            extracted = extractions.extract_many(descriptions, settings['signatures'], cache_write_bytes)
+            stats = extractions.stats()
+        finally:
+            extractions.close()
+    else:
+        extracted = ((extract_skills_from_text(description),
+                      minhash_signature(description) if settings['signatures'] else b'') for description in descriptions)
+    for posting, (skills, signature) in zip(postings, extracted):
+        posting['skills'] = skills
+        posting['signature'] = signature
+    return postings, bad_rows, stats
+
+def iter_dump_postings(path, settings=None, metrics=None, extraction_settings=None):
+    """Stream posting records from a JSONL or CSV job dump, parsing memory-mapped chunks in worker processes"""
+    import mmap
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    settings = {**DEFAULT_CONFIG['ingest'], **(settings or {})}
+    metrics = metrics or RunMetrics()
+    dump_type = dump_format(path)
+    size = os.path.getsize(path)
+    if not size:
+        return
+    default_role = settings['role'] or os.path.splitext(os.path.basename(path))[0]
+
+    header = None
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        start = 0
+        if dump_type == 'csv':
+            import csv
+            start = dump_record_end(mapped, 0, 0, quoted=True)
+            header = next(csv.reader([mapped[:start].decode('utf-8-sig')]))
+        chunks = plan_dump_chunks(mapped, start, int(settings['chunk_mb'] * 1024 * 1024), quoted=dump_type == 'csv')
+
+    workers = settings['workers'] or os.cpu_count() or 1
+    # The cache write budget is shared evenly between the chunks
+    cache_write_bytes = settings['cache_write_mb'] * 1024 * 1024 / max(len(chunks), 1)
+    print(f"Ingesting {path}: {size / 1024 / 1024:.1f} MB in {len(chunks)} chunks on {workers} workers")
+    started = time.perf_counter()
+    count = 0
+    bad_rows = 0
+    extraction = Counter()
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        def submit(chunk):
+            pending.append(pool.submit(ingest_dump_chunk, path, *chunk, dump_type, header, default_role, settings,
+                                       extraction_settings, cache_write_bytes))
+
+        # A bounded read-ahead keeps memory flat however large the dump is
+        pending = deque()
+        chunk_iter = iter(chunks)
+        for chunk in chunk_iter:
+            submit(chunk)
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            postings, bad, stats = pending.popleft().result()
+            for chunk in chunk_iter:
+                submit(chunk)
+                break
+            count += len(postings)
+            bad_rows += bad
+            extraction.update(stats)
+            yield from postings
+
+    elapsed = time.perf_counter() - started
+    metrics.add_time('ingest', elapsed)
+    metrics.counters.update(ingested_postings=count, ingest_bad_rows=bad_rows, ingest_bytes=size)
+    print(f"Ingested {count} postings from {path} in {elapsed:.1f} s ({size / 1024 / 1024 / max(elapsed, 1e-9):.1f} MB/s)"
+          + (f", {bad_rows} unreadable rows skipped" if bad_rows else ""))
+    if extraction:
+        metrics.counters.update(extraction)
+        print(extraction_summary(extraction))
+
+def iter_market_sources(config, metrics, dumps=(), scrape=True):
+    """Live scraping and offline job dumps as one stream of posting records"""
+    if scrape:
+        yield from iter_job_postings(config, metrics)
+    for path in dumps:
+        yield from iter_dump_postings(path, get_settings(config, 'ingest'), metrics,
+                                      get_settings(config, 'extraction_cache'))
+
+def start_profiler(kind):
+    """Start a cProfile or tracemalloc profiler for the whole run"""
+    import tracemalloc
+    if kind == 'cprofile':
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    if kind == 'tracemalloc':
+        tracemalloc.start(25)
+        return tracemalloc
+    return None
+
+def stop_profiler(profiler, output_dir):
+    """Stop the profiler and save its results into output_dir"""
+    import pstats
+    import tracemalloc
+    if profiler is None:
+        return
+    if profiler is tracemalloc:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        with open(os.path.join(output_dir, 'tracemalloc.txt'), 'w') as f:
+            f.write(f"Current: {current / 1024 / 1024:.1f} MB, peak: {peak / 1024 / 1024:.1f} MB\n\n")
+            for stat in snapshot.statistics('lineno')[:50]:
+                f.write(f"{stat}\n")
+        print(f"Allocation profile saved to: {output_dir}/tracemalloc.txt")
+        return
+    profiler.disable()
+    profiler.dump_stats(os.path.join(output_dir, 'profile.prof'))
+    with open(os.path.join(output_dir, 'profile.txt'), 'w') as f:
+        pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(50)
+    print(f"CPU profile saved to: {output_dir}/profile.prof (summary in profile.txt)")
+
+def run_batch(config, profiles_path, metrics=None, postings=None):
+    """Analyze many skill profiles against one scrape of the job market"""
+    metrics = metrics or RunMetrics()
+    profiles = load_profiles(profiles_path)
+    print(f"Loaded {len(profiles)} skill profiles from {profiles_path}")
+    
+    # Scrape and index the market once for every profile
+    with metrics.stage('scrape'):
+        jobs = postings if postings is not None else stream_job_market_data(config, metrics)
+        planner = get_settings(config, 'planner')
+        index = None
+        if planner['order'] == 'coverage':
+            jobs = jobs if isinstance(jobs, PostingBatch) else PostingBatch.from_jobs(jobs)
+            index = DemandIndex(jobs)
+        if get_settings(config, 'sketch')['enabled']:
+            market = market_aggregator(config)
+            for job in jobs:
+                market.add(job)
+                market = sketch_if_large(market, config)
+        else:
+            market = SkillMatrix.from_jobs(jobs)
+    sketch_summary(market, metrics)
+    metrics.counters['postings'] = market.total_jobs
+    print(f"Found {market.total_jobs} relevant job postings")
+    
+    print("Analyzing skill gaps...")
+    with metrics.stage('analyze_skill_gap'):
+        analyses = analyze_skill_gaps_batch([profile['user_skills'] for profile in profiles], market)
+    
+    print("Generating reports...")
+    batch_dir = f"{REPORTS_DIR}/{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    os.makedirs(batch_dir, exist_ok=True)
+    for profile, gap_analysis in zip(profiles, analyses):
+        profile_config = {**config, **profile}
+        with metrics.stage('generate_learning_recommendations'):
+            recommendations = generate_learning_recommendations(
+                recommended_skills(gap_analysis, profile['user_skills'], planner, index),
+                profile_config['platforms']
+            )
+        report_dir = os.path.join(batch_dir, re.sub(r'[^\w.-]+', '_', profile['name']))
+        with metrics.stage('record_history'):
+            history = record_history(profile_config, gap_analysis, profile['name'])
+        with metrics.stage('generate_report'):
+            generate_report(profile_config, gap_analysis, recommendations, report_dir, history)
+        print(f"  {profile['name']}: gap score {gap_analysis['gap_score']:.1f}, report in {report_dir}/report.html")
+    
+    metrics.write(os.path.join(batch_dir, 'metrics.json'))
+    return batch_dir
+
+def recommended_skills(gap_analysis, user_skills, planner, index=None):
+    """Missing skills to recommend: the most demanded, or the learning plan's picks in order of marginal job coverage"""
+    if planner['order'] != 'coverage' or index is None:
+        return gap_analysis['top_missing_skills']
+    plan = index.learning_plan(user_skills, planner['steps'], planner['match_threshold'], planner['lookahead'])
+    path = ", ".join(f"{step['skill']} (+{step['new_jobs']})" for step in plan['steps'])
+    print(f"Learning path, matching postings at {plan['threshold']:.0%} of their skills: "
+          f"{plan['qualified_before']} of {plan['total_jobs']} matched now; {path}")
+    return {step['skill']: step['demand'] for step in plan['steps']}
+
+def load_demand_index(config):
+    """Index the deduplicated, still active postings of the job store"""
+    store_settings = get_settings(config, 'store')
+    extraction_settings = get_settings(config, 'extraction_cache')
+    extractions = ExtractionCache(extraction_settings) if extraction_settings['enabled'] else None
+    store = JobStore(store_settings, extractions)
+    try:
+        jobs = PostingDeduplicator(get_settings(config, 'dedup')).filter(
+            store.iter_recent_jobs(config['job_roles'], store_settings['active_days']))
+        return DemandIndex(jobs, get_settings(config, 'serve')['max_views'])
+    finally:
+        store.close()
+        if extractions:
+            extractions.close()
+
+def make_query_app(config):
+    """aiohttp application answering gap analyses from a DemandIndex, rebuilt whenever a scrape finishes"""
+    import asyncio
+    from aiohttp import web
+    settings = get_settings(config, 'serve')
+
+    def marker_mtime():
+        try:
+            return os.path.getmtime(settings['marker'])
+        except OSError:
+            return None
+
+    state = {'index': load_demand_index(config), 'marker': marker_mtime()}
+    print(f"Demand index: {state['index'].total_jobs} postings, {len(state['index'].skills)} skills")
+
+    async def analyze(request):
+        started = time.perf_counter()
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="Expected a JSON body")
+        user_skills = payload.get('user_skills') if isinstance(payload, dict) else None
+        if not isinstance(user_skills, list) or not all(isinstance(skill, str) for skill in user_skills):
+            raise web.HTTPBadRequest(text='Expected {"user_skills": [...]}, optionally with "role" and "location"')
+        for field in ('role', 'location'):
+            if payload.get(field) is not None and not isinstance(payload[field], str):
+                raise web.HTTPBadRequest(text=f'Expected "{field}" to be a string')
+        if payload.get('order', 'demand') not in PLANNER_ORDERS:
+            raise web.HTTPBadRequest(text=f'Expected "order" to be one of {", ".join(PLANNER_ORDERS)}')
+
+        planner = {**get_settings(config, 'planner'), **({'order': payload['order']} if 'order' in payload else {})}
+        body = state['index'].response_json(user_skills, config['platforms'], payload.get('role'), payload.get('location'),
+                                            planner)
+        response = web.Response(text=body, content_type='application/json')
+        response.headers['X-Analysis-Ms'] = f"{(time.perf_counter() - started) * 1000:.3f}"
+        return response
+
+    async def status(request):
+        return web.json_response(state['index'].info())
+
+    async def reload_on_scrape():
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(settings['reload_seconds'])
+            mtime = marker_mtime()
+            if mtime == state['marker']:
+                continue
+            state['marker'] = mtime
+            try:
+                # Requests keep using the old index while the new one is built
+                state['index'] = await loop.run_in_executor(None, load_demand_index, config)
+            except Exception as e:
+                print(f"Error reloading demand index: {e}")
+                continue
+            print(f"Reloaded demand index: {state['index'].total_jobs} postings")
+
+    async def watch(app):
+        task = asyncio.create_task(reload_on_scrape())
+        yield
+        task.cancel()
+
+    app = web.Application()
+    app.router.add_post('/analyze', analyze)
+    app.router.add_get('/status', status)
+    app.cleanup_ctx.append(watch)
+    return app
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Automated skill gap analysis against LinkedIn job postings")
+    parser.add_argument('--compile-taxonomy', action='store_true',
+                        help=f"Compile {TAXONOMY_FILE} into {TAXONOMY_INDEX} and exit")
+    parser.add_argument('--batch', metavar='PROFILES',
+                        help="Analyze every skill profile in a directory of JSON configs or a JSONL file")
+    parser.add_argument('--record', metavar='DIR',
+                        help="Save every fetched listing and description page into a replayable fixture corpus")
+    parser.add_argument('--serve-fixtures', metavar='DIR',
+                        help="Serve a recorded fixture corpus as a local stand-in for LinkedIn")
+    parser.add_argument('--serve', action='store_true',
+                        help="Answer POST /analyze requests from an in-memory index of the job store")
+    parser.add_argument('--port', type=int, help="Port for --serve-fixtures (default 8765) or --serve (default serve.port)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Mean injected latency in seconds for --serve-fixtures")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of 429 responses for --serve-fixtures")
+    parser.add_argument('--chart-format', choices=('png', 'svg'),
+                        help="Write PNG charts next to the report, or inline SVG for a single self-contained file")
+    parser.add_argument('--no-resume', action='store_true',
+                        help="Start the scrape over instead of resuming an interrupted one")
+    parser.add_argument('--profile', choices=('cprofile', 'tracemalloc'),
+                        help="Profile the run and save the results next to the report")
+    parser.add_argument('--order', choices=PLANNER_ORDERS,
+                        help="Recommend missing skills by demand, or by how many new postings each one makes a match")
+    parser.add_argument('--sketch', action='store_true',
+                        help="Count skills with fixed-memory approximate sketches instead of exact counters")
+    parser.add_argument('--shard', metavar='I/N',
+                        help="Scrape only shard I (from 0) of N and save a partial aggregate to --partial-dir")
+    # Where the postings come from when not scraping them here
+    sources = parser.add_mutually_exclusive_group()
+    sources.add_argument('--merge', metavar='DIR',
+                        help="Analyze the merged shard partials in DIR instead of scraping")
+    sources.add_argument('--local-shards', type=int, metavar='N',
+                        help="Scrape N shards in parallel local processes, then merge them")
+    parser.add_argument('--partial-dir', help="Directory for shard partials (default: shard.partial_dir)")
+    parser.add_argument('--ingest', metavar='FILE', action='append',
+                        help="Also analyze the postings of a JSONL or CSV job dump (repeatable)")
+    parser.add_argument('--no-scrape', action='store_true', help="Analyze only the --ingest dumps, without scraping")
+    parser.add_argument('--save-corpus', metavar='FILE', help="Save the deduplicated postings as a compact corpus file")
+    sources.add_argument('--corpus', metavar='FILE', help="Analyze a corpus saved with --save-corpus instead of scraping")
+    args = parser.parse_args(argv)
+    if args.corpus and (args.ingest or args.no_scrape):
+        parser.error("--corpus is already a finished corpus: it cannot take --ingest or --no-scrape")
+
+    if args.compile_taxonomy:
+        index = compile_taxonomy()
+        print(f"Compiled {len(index['skills'])} skills ({len(index['aliases'])} phrases), "
+              f"taxonomy version {index['version']}, to {TAXONOMY_INDEX}")
+        return
+
+    if args.serve_fixtures:
+        server = make_replay_server(args.serve_fixtures, port=args.port or 8765, latency=args.latency,
+                                    error_rate=args.error_rate)
+        print(f"Replaying {args.serve_fixtures} on http://127.0.0.1:{server.server_port} "
+              f"(set scraper.base_url to use it)")
+        server.serve_forever()
+        return
+
     print("Starting Skill Gap Analysis...")
     
     # Load configuration
     config = load_config()
+    if args.record:
+        config['scraper'] = {**config.get('scraper', {}), 'record_dir': args.record}
+    if args.chart_format:
+        config['report'] = {**config.get('report', {}), 'chart_format': args.chart_format}
+    if args.no_resume:
+        config['journal'] = {**config.get('journal', {}), 'resume': False}
+    if args.sketch:
+        config['sketch'] = {**config.get('sketch', {}), 'enabled': True}
+    if args.order:
+        config['planner'] = {**config.get('planner', {}), 'order': args.order}
+    if args.corpus or args.no_scrape and not (args.merge or args.local_shards):
+        # A week's snapshot holds live market data: re-analysing saved postings or dumps must not replace it
+        config['history'] = {**config.get('history', {}), 'record': False}
+    
+    partial_dir = args.merge or args.partial_dir or get_settings(config, 'shard')['partial_dir']
+    
+    if args.serve:
+        from aiohttp import web
+        serve = get_settings(config, 'serve')
+        web.run_app(make_query_app(config), host=serve['host'], port=args.port or serve['port'])
+        return
+    
+    metrics = RunMetrics()
+    profiler = start_profiler(args.profile)
+    
+    if args.shard:
+        run_shard(config, parse_shard(args.shard), partial_dir, metrics)
+        stop_profiler(profiler, partial_dir)
+        return
+    
+    postings = None
+    if args.local_shards:
+        with metrics.stage('scrape_shards'):
+            run_local_shards(args.local_shards, partial_dir, ['--no-resume'] if args.no_resume else [])
+    if args.merge or args.local_shards:
+        postings = merge_partials(config, partial_dir, metrics, args.ingest or [])
+    if args.corpus:
+        postings = PostingBatch.load(args.corpus)
+        print(f"Loaded {len(postings)} postings from {args.corpus}")
+    if postings is None and (args.ingest or args.no_scrape):
+        postings = stream_job_market_data(config, metrics,
+                                          iter_market_sources(config, metrics, args.ingest or [], not args.no_scrape))
+    
+    if args.batch:
+        batch_dir = run_batch(config, args.batch, metrics, postings)
+        stop_profiler(profiler, batch_dir)
+        print(f"Batch analysis complete! Reports saved under: {batch_dir}")
+        return
+    
     print(f"Loaded configuration for {len(config['user_skills'])} skills")
     
-    # Step 1: Scrape job market data
-    print(f"Scraping job market data for: {', '.join(config['job_roles'])}")
-    job_market_data = scrape_linkedin_jobs(
-        config['job_roles'], 
-        config['location'], 
-        config['max_pages']
-    )
-    print(f"Found {len(job_market_data)} relevant job postings")
+    # Step 1: Scrape job market data, counting skills as postings arrive
+    pipeline = get_settings(config, 'pipeline')
+    market = market_aggregator(config)
+    planner = get_settings(config, 'planner')
+    # Planning by job coverage needs every posting's skill set, not just the counts
+    corpus = PostingBatch() if planner['order'] == 'coverage' or args.save_corpus else None
+    next_progress = pipeline['progress_every']
+    with metrics.stage('scrape'):
+        for job in postings if postings is not None else stream_job_market_data(config, metrics):
+            market.add(job)
+            market = sketch_if_large(market, config)
+            if corpus is not None:
+                corpus.append(job)
+            if market.total_jobs >= next_progress:
+                # Reports get sparser as the corpus grows: their number grows with the log of the corpus size
+                next_progress = max(market.total_jobs + pipeline['progress_every'], int(market.total_jobs * 1.25))
+                partial = analyze_skill_gaps_batch([config['user_skills']], market, breakdowns=False)[0]
+                top = ", ".join(f"{skill} ({demand:.0f}%)" for skill, demand in list(partial['top_missing_skills'].items())[:3])
+                print(f"  Partial results after {market.total_jobs} postings: gap score {partial['gap_score']:.1f}, top gaps: {top}")
+    sketch_summary(market, metrics)
+    metrics.counters['postings'] = market.total_jobs
+    print(f"Found {market.total_jobs} relevant job postings")
+    if args.save_corpus:
+        corpus.save(args.save_corpus)
+        print(f"Corpus saved to: {args.save_corpus} ({os.path.getsize(args.save_corpus) / 1024:.0f} KB)")
     
     # Step 2: Analyze skill gap
     print("Analyzing skill gap...")
-    gap_analysis = analyze_skill_gap(config['user_skills'], job_market_data)
+    with metrics.stage('analyze_skill_gap'):
+        gap_analysis = analyze_skill_gap(config['user_skills'], market)
+    with metrics.stage('record_history'):
+        history = record_history(config, gap_analysis)
     
     # Step 3: Generate recommendations
     print("Generating learning recommendations...")
-    recommendations = generate_learning_recommendations(
-        gap_analysis['top_missing_skills'],
-        config['platforms']
-    )
+    with metrics.stage('generate_learning_recommendations'):
+        index = DemandIndex(corpus) if planner['order'] == 'coverage' else None
+        recommendations = generate_learning_recommendations(
+            recommended_skills(gap_analysis, config['user_skills'], planner, index),
+            config['platforms']
+        )
     
     # Step 4: Generate report
     print("Generating report...")
-    report_dir = generate_report(config, gap_analysis, recommendations)
+    with metrics.stage('generate_report'):
+        report_dir = generate_report(config, gap_analysis, recommendations, history=history)
+    
+    metrics.write(os.path.join(report_dir, 'metrics.json'))
+    stop_profiler(profiler, report_dir)
     
     print("\n" + "="*50)
     print(f"Analysis complete! Report saved to: {report_dir}/report.html")
+    print(f"Run metrics saved to: {report_dir}/metrics.json")
     print("="*50)
 
 if __name__ == "__main__":
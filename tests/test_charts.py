@@ -0,0 +1,53 @@
+import skill_gap_analyzer as sga
+
+
+def gap_analysis(skill_demand, missing):
+    return {
+        'skill_demand': skill_demand,
+        'missing_skills': missing,
+        'top_missing_skills': missing,
+    }
+
+
+def chart_settings(tmp_path):
+    return {'chart_cache_dir': str(tmp_path), 'chart_format': 'svg', 'dpi': 50}
+
+
+def test_reordered_input_reuses_cached_chart(tmp_path):
+    demand = {'python': 40.0, 'sql': 25.0, 'docker': 25.0, 'aws': 25.0, 'git': 10.0}
+    missing = {'docker': 25.0, 'aws': 25.0, 'git': 10.0}
+    first = sga.chart_specs(gap_analysis(demand, missing))
+    second = sga.chart_specs(gap_analysis(dict(reversed(demand.items())), dict(reversed(missing.items()))))
+    assert first == second
+    assert first['top_skills']['labels'] == ['python', 'aws', 'docker', 'sql', 'git']
+
+    settings = chart_settings(tmp_path)
+    for name in first:
+        data, cached = sga.get_chart(first[name], settings)
+        assert not cached
+        assert sga.get_chart(second[name], settings) == (data, True)
+
+
+class FakeHistory:
+    def __init__(self, series):
+        self.series = series
+
+    def __len__(self):
+        return 2
+
+    def trend_series(self, weeks, top_n, window):
+        return ['2026-W01', '2026-W02'], self.series
+
+
+def test_reordered_trend_series_reuses_cached_chart(tmp_path):
+    series = {'python': [30.0, 40.0], 'sql': [20.0, 25.0], 'aws': [30.0, 25.0]}
+    history_settings = {'moving_average_weeks': 4, 'trend_weeks': 26, 'top_n': 6}
+    analysis = gap_analysis({'python': 40.0}, {})
+    first = sga.chart_specs(analysis, FakeHistory(series), history_settings)['demand_trend']
+    second = sga.chart_specs(analysis, FakeHistory(dict(reversed(series.items()))), history_settings)['demand_trend']
+    assert [label for label, _ in first['series']] == ['python', 'aws', 'sql']
+
+    settings = chart_settings(tmp_path)
+    data, cached = sga.get_chart(first, settings)
+    assert not cached
+    assert sga.get_chart(second, settings) == (data, True)
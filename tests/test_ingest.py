@@ -0,0 +1,75 @@
+import csv
+import io
+
+import pytest
+
+import skill_gap_analyzer as sga
+
+ROWS = [
+    ['job_id', 'title', 'description'],
+    ['1', 'Data Analyst', 'Python and SQL'],
+    ['2', 'Data Engineer', 'Line one\nline two\n\nline four'],
+    ['3', 'ML Engineer', 'Says "hello"\nand, with commas,\r\nspans lines'],
+    ['4', 'Analyst, Senior', ''],
+    ['5', 'Scientist', '"\n"'],
+    ['6', 'Développeur', 'Données\nà traiter'],
+]
+
+
+def csv_dump(rows=ROWS):
+    out = io.StringIO(newline='')
+    csv.writer(out, lineterminator='\n').writerows(rows)
+    return out.getvalue().encode('utf-8')
+
+
+def parse(data):
+    return list(csv.reader(io.StringIO(data.decode('utf-8'), newline='')))
+
+
+def test_record_end_skips_quoted_newlines():
+    data = csv_dump()
+    header_end = sga.dump_record_end(data, 0, 0, quoted=True)
+    assert parse(data[:header_end]) == [ROWS[0]]
+
+    second = data.index(b'2,')
+    end = sga.dump_record_end(data, second, second, quoted=True)
+    assert parse(data[second:end]) == [ROWS[2]]
+    # Starting from a position inside the quoted field still ends at the record's last line
+    assert sga.dump_record_end(data, second, data.index(b'line two'), quoted=True) == end
+
+
+def test_record_end_without_quoting_stops_at_newline():
+    data = b'{"a": "x"}\n{"b": "y"}\n{"c": "z"}'
+    assert sga.dump_record_end(data, 0, 3, quoted=False) == 11
+    assert sga.dump_record_end(data, 11, 11, quoted=False) == 22
+    assert sga.dump_record_end(data, 22, 25, quoted=False) == len(data)
+
+
+def test_unterminated_quote_runs_to_end_of_file():
+    data = b'1,"open\nfield\n2,closed\n'
+    assert sga.dump_record_end(data, 0, 0, quoted=True) == len(data)
+
+
+@pytest.mark.parametrize('trailing_newline', [True, False])
+def test_chunks_never_split_records(trailing_newline):
+    data = csv_dump(ROWS + [[str(i), f"Role {i}", f"Line\n{i}"] for i in range(7, 20)])
+    if not trailing_newline:
+        data = data.rstrip(b'\n')
+    start = sga.dump_record_end(data, 0, 0, quoted=True)
+    expected = parse(data[start:])
+
+    for chunk_size in range(1, len(data) + 2):
+        chunks = sga.plan_dump_chunks(data, start, chunk_size, quoted=True)
+        # Chunks are contiguous and cover everything after the header
+        assert chunks[0][0] == start and chunks[-1][1] == len(data)
+        assert all(left[1] == right[0] for left, right in zip(chunks, chunks[1:]))
+        assert all(chunk_start < chunk_end for chunk_start, chunk_end in chunks)
+        assert [row for chunk in chunks for row in parse(data[slice(*chunk)])] == expected
+
+
+def test_jsonl_chunks_follow_lines():
+    lines = [f'{{"job_id": "{i}", "description": "a\\nb {i}"}}'.encode() for i in range(30)]
+    data = b'\n'.join(lines) + b'\n'
+    for chunk_size in (1, 7, 50, len(data)):
+        chunks = sga.plan_dump_chunks(data, 0, chunk_size, quoted=False)
+        assert [line for chunk in chunks for line in data[slice(*chunk)].splitlines()] == lines
@@ -0,0 +1,45 @@
+import json
+
+import skill_gap_analyzer as sga
+
+
+def journal(tmp_path):
+    return sga.ScrapeJournal({'path': str(tmp_path / 'journal.jsonl')}, run_key='run')
+
+
+def posting(job_id):
+    return {'job_id': job_id, 'title': 'Data Analyst', 'skills': ['SQL'], 'signature': b'\x01\x02'}
+
+
+def test_crash_before_newline_keeps_last_record(tmp_path):
+    first = journal(tmp_path)
+    first.add_posting(posting('a'))
+    # Crash after write() reached the file but before its newline did
+    first.file.write(json.dumps({'type': 'posting', 'job': {**posting('b'), 'signature': '0102'}}))
+    first.close()
+
+    resumed = journal(tmp_path)
+    assert resumed.resumed
+    assert [job['job_id'] for job in resumed.postings] == ['a', 'b']
+    resumed.add_posting(posting('c'))
+    resumed.close()
+
+    again = journal(tmp_path)
+    assert [job['job_id'] for job in again.postings] == ['a', 'b', 'c']
+    assert again.postings[1]['signature'] == b'\x01\x02'
+    again.close()
+
+
+def test_torn_last_line_is_cut_off(tmp_path):
+    first = journal(tmp_path)
+    first.add_posting(posting('a'))
+    first.file.write('{"type": "posting", "job": {"job_')
+    first.close()
+
+    resumed = journal(tmp_path)
+    assert [job['job_id'] for job in resumed.postings] == ['a']
+    resumed.add_posting(posting('b'))
+    resumed.close()
+
+    with open(tmp_path / 'journal.jsonl') as f:
+        assert [json.loads(line)['type'] for line in f] == ['run', 'posting', 'posting']
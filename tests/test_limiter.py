@@ -0,0 +1,83 @@
+import asyncio
+import json
+import random
+import threading
+
+import pytest
+
+import skill_gap_analyzer as sga
+
+aiohttp = pytest.importorskip('aiohttp')
+
+PAGE = '<html><body><div class="description__text">Python and SQL</div></body></html>'
+FAST = {'initial_rate': 50.0, 'min_rate': 5.0, 'max_rate': 100.0, 'burst': 1, 'backoff_base': 0.01}
+
+
+@pytest.fixture
+def replay(tmp_path):
+    (tmp_path / 'page.html').write_text(PAGE)
+    (tmp_path / sga.REPLAY_INDEX).write_text(json.dumps({'key': 'view:123', 'file': 'page.html'}) + "\n")
+    servers = []
+
+    def start(**options):
+        server = sga.make_replay_server(str(tmp_path), **options)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/jobs/view/123"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def fetch(url, limiter, metrics, count=1):
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            ctx = sga.ScrapeContext(session, {**sga.DEFAULT_CONFIG['scraper'], 'record_dir': None}, limiter, None,
+                                    metrics)
+            return [await sga.fetch_text(ctx, url) for _ in range(count)]
+    return asyncio.run(run())
+
+
+def test_healthy_server_raises_rate_additively(replay):
+    url = replay()
+    limiter, metrics = sga.AdaptiveRateLimiter(FAST), sga.RunMetrics()
+
+    assert fetch(url, limiter, metrics, count=10) == [PAGE] * 10
+    assert limiter.bucket('127.0.0.1').rate == pytest.approx(50.0 + 10 * limiter.settings['increase_step'])
+    assert not metrics.retries
+
+
+def test_throttling_halves_rate_and_honours_retry_after(replay):
+    url = replay(error_rate=1.0, retry_after=0.3)
+    limiter, metrics = sga.AdaptiveRateLimiter({**FAST, 'max_retries': 1}), sga.RunMetrics()
+
+    with pytest.raises(RuntimeError, match='after 2 attempts'):
+        fetch(url, limiter, metrics)
+
+    assert limiter.bucket('127.0.0.1').rate == pytest.approx(50.0 * 0.5 ** 2)
+    assert metrics.hosts['127.0.0.1']['statuses'] == {'429': 2}
+    assert metrics.retries == {'HTTP 429': 1}
+    # The retry waited out the Retry-After window, not just the 10 ms backoff
+    assert metrics.timers['rate_limit_wait'] >= 0.25
+
+
+def test_intermittent_throttling_is_retried(replay):
+    random.seed(7)
+    url = replay(error_rate=0.4, retry_after=0)
+    limiter, metrics = sga.AdaptiveRateLimiter({**FAST, 'min_rate': 25.0, 'max_retries': 10}), sga.RunMetrics()
+
+    assert fetch(url, limiter, metrics, count=20) == [PAGE] * 20
+    statuses = metrics.hosts['127.0.0.1']['statuses']
+    assert statuses['200'] == 20
+    assert statuses['429'] == metrics.retries['HTTP 429'] > 0
+    assert limiter.settings['min_rate'] <= limiter.bucket('127.0.0.1').rate <= limiter.settings['max_rate']
+
+
+def test_parse_retry_after():
+    assert sga.parse_retry_after('2.5') == 2.5
+    assert sga.parse_retry_after('-1') == 0.0
+    assert sga.parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert sga.parse_retry_after('soon') is None
+    assert sga.parse_retry_after(None) is None
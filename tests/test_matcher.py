@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+import skill_gap_analyzer as sga
+
+TAXONOMY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), sga.TAXONOMY_FILE)
+
+
+@pytest.fixture(scope='module')
+def matcher(tmp_path_factory):
+    index = sga.load_taxonomy(TAXONOMY, str(tmp_path_factory.mktemp('taxonomy') / 'skill_taxonomy.idx'))
+    return index['matcher']
+
+
+@pytest.mark.parametrize('text', [
+    'Experience with JavaScript and TypeScript',
+    'Javanese speakers welcome',
+    'Scalable systems, Rust and Go',
+    'Our Rapid Response team',
+])
+def test_no_match_inside_longer_words(matcher, text):
+    assert not matcher.find(text) & {'Java', 'Scala', 'R'}
+
+
+@pytest.mark.parametrize('text, skill', [
+    ('Java, Python.', 'Java'),
+    ('(Java)', 'Java'),
+    ('C++/Java', 'C++'),
+    ('skills: R; SQL', 'R'),
+    ('Strong SQL!', 'SQL'),
+])
+def test_match_at_punctuation_boundaries(matcher, text, skill):
+    assert skill in matcher.find(text)
+
+
+def test_multi_word_names_and_aliases(matcher):
+    found = matcher.find('We use machine learning on Amazon Web Services and Google Cloud Platform')
+    assert {'Machine Learning', 'AWS', 'GCP'} <= found
+    assert 'AI' in matcher.find('Artificial\nIntelligence research')
+    assert 'Problem Solving' in matcher.find('great problem-solving skills')
+
+
+def test_multi_word_phrase_needs_every_word(matcher):
+    assert 'Machine Learning' not in matcher.find('machine shop learning curve')
+    assert 'AWS' not in matcher.find('amazon web')
+
+
+def test_overlapping_phrases_all_reported():
+    matcher = sga.SkillMatcher({'data': 'Data', 'data analysis': 'Analysis', 'analysis tools': 'Tools'})
+    assert matcher.find('big data analysis tools') == {'Data', 'Analysis', 'Tools'}
+    # A failed partial match falls back to the suffix state instead of the root
+    assert matcher.find('data data analysis') == {'Data', 'Analysis'}
+
+
+def test_compiled_tables_match_fresh_matcher(tmp_path):
+    index = sga.load_taxonomy(TAXONOMY, str(tmp_path / 'skill_taxonomy.idx'))
+    reloaded = sga.load_taxonomy(TAXONOMY, str(tmp_path / 'skill_taxonomy.idx'))
+    text = 'Python, SQL and Apache Spark with Power BI dashboards on Microsoft Azure'
+    assert reloaded['matcher'].find(text) == index['matcher'].find(text) == {'Python', 'SQL', 'Spark', 'Power BI',
+                                                                          'Azure'}
@@ -0,0 +1,32 @@
+import pytest
+
+import skill_gap_analyzer as sga
+
+pytest.importorskip('lxml')
+
+DESCRIPTION = '<div class="show-more description__text mt-4">{}</div>'
+
+PAGES = {
+    'plain': DESCRIPTION.format('<p>Python and <b>SQL</b></p><div>Nested <div>Docker</div></div>'),
+    'comment': '<!-- <div class="description__text"> -->' + DESCRIPTION.format(
+        'Python <!-- <div> --> and SQL'),
+    'textarea': DESCRIPTION.format('<textarea>paste <div> here</textarea> Python and SQL'),
+    'script': DESCRIPTION.format('Python <script>document.write("<div>")</script> and SQL'),
+    'style': '<style>.x:before { content: "<div" }</style>' + DESCRIPTION.format('Python and SQL'),
+    'data decoy': '<div data-role="description__text">Decoy</div>' + DESCRIPTION.format('Python and SQL'),
+    'other class': '<div class="description__text-hidden">Decoy</div>' + DESCRIPTION.format('Python and SQL'),
+    'single quotes': "<div class='description__text'>Python and SQL</div>",
+    'unbalanced': '<div class="description__text">Python <div>and SQL',
+    'missing': '<div class="job">Python and SQL</div>',
+}
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_lxml_description_matches_bs4(name):
+    html = '<html><body><div class="top-card">Data Analyst</div>' + PAGES[name] + '<footer>Apply</footer></body></html>'
+    assert sga.LxmlParser().parse_job_description(html) == sga.SoupParser().parse_job_description(html)
+
+
+def test_lxml_description_skips_decoys():
+    html = PAGES['data decoy'] + PAGES['comment']
+    assert sga.LxmlParser().parse_job_description(html) == 'Python and SQL'
@@ -0,0 +1,103 @@
+import random
+from collections import Counter
+
+import pytest
+
+import skill_gap_analyzer as sga
+
+pytest.importorskip('numpy')
+
+
+def zipf_stream(size, keys, seed=1):
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, keys + 1)]
+    return [f"skill-{key}" for key in rng.choices(range(keys), weights, k=size)]
+
+
+def test_count_min_bounds():
+    stream = zipf_stream(50000, 5000)
+    exact = Counter(stream)
+    sketch = sga.CountMinSketch(epsilon=0.002, delta=0.01)
+    for key in stream:
+        sketch.add(sga.sketch_hash(key))
+
+    bound = sketch.error_bound()
+    assert bound == pytest.approx(0.002 * len(stream))
+    overshoots = [sketch.estimate(sga.sketch_hash(key)) - count for key, count in exact.items()]
+    assert min(overshoots) >= 0
+    # Each estimate stays within the bound with probability 1 - delta
+    assert sum(overshoot > bound for overshoot in overshoots) <= 2 * 0.01 * len(exact)
+
+
+def test_count_min_merge_equals_single_sketch():
+    stream = zipf_stream(20000, 2000)
+    whole, left, right = (sga.CountMinSketch(epsilon=0.005) for _ in range(3))
+    whole.update([sga.sketch_hash(key) for key in stream])
+    left.update([sga.sketch_hash(key) for key in stream[:7000]])
+    for key in stream[7000:]:
+        right.add(sga.sketch_hash(key))
+
+    left.merge(right)
+    assert left.total == whole.total == len(stream)
+    assert (left.table == whole.table).all()
+    with pytest.raises(ValueError):
+        left.merge(sga.CountMinSketch(epsilon=0.01))
+
+
+def check_space_saving(summary, exact, total):
+    for key, count in exact.items():
+        if count > total / summary.capacity:
+            assert key in summary.counts
+    for key, count in summary.counts.items():
+        # Counts overshoot by at most their recorded error and never undershoot
+        assert count - summary.errors[key] <= exact[key] <= count
+
+
+def test_space_saving_bounds():
+    stream = zipf_stream(50000, 5000)
+    summary = sga.SpaceSaving(100)
+    summary.update(stream)
+
+    assert summary.total == len(stream)
+    assert len(summary.counts) == 100
+    check_space_saving(summary, Counter(stream), len(stream))
+    exact_top = [key for key, _ in Counter(stream).most_common(5)]
+    assert [key for key, _ in summary.top(5)] == exact_top
+
+
+def test_space_saving_merge_bounds():
+    stream = zipf_stream(40000, 3000, seed=2)
+    left, right = sga.SpaceSaving(100), sga.SpaceSaving(100)
+    left.update(stream[:25000])
+    right.update(stream[25000:])
+
+    left.merge(right)
+    assert left.total == len(stream)
+    check_space_saving(left, Counter(stream), len(stream))
+
+
+@pytest.mark.parametrize('distinct', [50, 3000, 100000])
+def test_hyperloglog_error(distinct):
+    counter = sga.HyperLogLog(error=0.02)
+    for i in range(distinct):
+        counter.add(sga.sketch_hash(f"job-{i}"))
+        if i % 3 == 0:
+            counter.add(sga.sketch_hash(f"job-{i}"))
+
+    standard_error = 1.04 / len(counter.registers) ** 0.5
+    assert abs(counter.count() - distinct) <= 4 * standard_error * distinct + 1
+
+
+def test_hyperloglog_merge_is_union():
+    left, right, union = (sga.HyperLogLog(error=0.02) for _ in range(3))
+    for i in range(20000):
+        hashes = sga.sketch_hash(f"job-{i}")
+        (left if i < 12000 else right).add(hashes)
+        if 8000 <= i < 12000:
+            right.add(hashes)
+        union.add(hashes)
+
+    left.merge(right)
+    assert left.registers == union.registers
+    with pytest.raises(ValueError):
+        left.merge(sga.HyperLogLog(error=0.1))